@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜尋效能測試腳本
+以模擬資料比較「每次重新 str().lower()」與「預先正規化搜尋字串 / 倒排索引」的搜尋耗時
+（不需連線資料庫）
+
+用法: python benchmark_search.py [記錄數量]
+"""
+
+import os
+import random
+import sys
+import time
+
+# 將當前目錄加入 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cmdtools_gui.database import TABLE_DEFINITIONS
+from cmdtools_gui.record_store import RecordStore
+from cmdtools_gui.search_index import SearchIndex
+
+WORDS = ["git", "docker", "Compose", "kubectl", "Python", "pip", "install", "MySQL",
+         "命令", "提示", "工具", "網站", "程式", "執行", "備份", "資料庫", "設定", "查詢"]
+TYPED_KEYWORD = "docker compose"
+KEYWORDS = ["d", "do", "doc", "dock", "docker", "命", "命令", "資料庫", "install", "SQL", "不存在的字"]
+REPEAT = 5
+
+
+def make_records(count: int):
+    """產生模擬的 CmdTools 記錄"""
+    random.seed(42)
+    records = []
+    for seq_no in range(1, count + 1):
+        records.append({
+            'iSeqNo': seq_no,
+            'cmd': " ".join(random.choices(WORDS, k=4)) + f" --id {seq_no}",
+            'example': " ".join(random.choices(WORDS, k=8)),
+            'remark1': " ".join(random.choices(WORDS, k=3)),
+            'Classification': random.choice(WORDS),
+        })
+    return records
+
+
+def linear_search(records, fields, keyword):
+    """原本的搜尋方式：每次搜尋都重新轉小寫"""
+    keyword_lower = keyword.lower()
+    return [record for record in records
+            if any(keyword_lower in str(record.get(field, "")).lower() for field in fields)]
+
+
+def linear_filter(records, filters):
+    """原本的單一欄位篩選方式"""
+    filtered_data = list(records)
+    for field, keyword in filters.items():
+        if keyword.strip():
+            keyword_lower = keyword.lower()
+            filtered_data = [record for record in filtered_data
+                             if keyword_lower in str(record.get(field, "")).lower()]
+    return filtered_data
+
+
+def measure(func):
+    """回傳多次執行的平均耗時（毫秒）與最後一次結果"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / REPEAT, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    fields = TABLE_DEFINITIONS['CmdTools']['columns'][1:]
+    store = RecordStore(make_records(count))
+
+    print(f"=== 搜尋效能測試（{count} 筆記錄）===")
+    indexes = {}
+    for name, inverted in (("搜尋字串", False), ("倒排索引", True)):
+        index = SearchIndex(fields, inverted=inverted)
+        start = time.perf_counter()
+        index.build(store)
+        indexes[name] = index
+        print(f"建立{name}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"\n{'關鍵字':<10}{'符合筆數':>10}{'逐筆轉小寫':>14}{'搜尋字串':>12}{'倒排索引':>12}")
+    for keyword in KEYWORDS:
+        baseline_ms, expected = measure(lambda: linear_search(store, fields, keyword))
+        row = f"{keyword:<10}{len(expected):>10}{baseline_ms:>12.1f}ms"
+        for index in indexes.values():
+            # 每次量測前清除結果快取，只比較單次搜尋本身
+            elapsed_ms, result = measure(lambda: index.clear_cache() or index.search(keyword, store))
+            if result != expected:
+                print(f"FAIL 關鍵字 {keyword} 的搜尋結果不一致")
+                return False
+            row += f"{elapsed_ms:>10.1f}ms"
+        print(row)
+
+    # 模擬逐字輸入再逐字刪除（使用結果快取與逐步縮小搜尋範圍）
+    typed = [TYPED_KEYWORD[:i] for i in range(1, len(TYPED_KEYWORD) + 1)]
+    typed += typed[-2::-1]
+    index = indexes["倒排索引"]
+    index.clear_cache()
+    start = time.perf_counter()
+    expected = [linear_search(store, fields, keyword) for keyword in typed]
+    baseline_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    results = [index.search(keyword, store) for keyword in typed]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if results != expected:
+        print("FAIL 逐字輸入的搜尋結果不一致")
+        return False
+    print(f"\n逐字輸入/刪除 \"{TYPED_KEYWORD}\"（{len(typed)} 次搜尋）: "
+          f"逐筆轉小寫 {baseline_ms:.0f} ms，倒排索引 + 結果快取 {elapsed_ms:.0f} ms")
+
+    filters = {'cmd': 'docker', 'Classification': '命令'}
+    baseline_ms, expected = measure(lambda: linear_filter(store, filters))
+    elapsed_ms, result = measure(lambda: indexes["搜尋字串"].filter(filters, store))
+    if result != expected:
+        print("FAIL 單一欄位篩選結果不一致")
+        return False
+    print(f"\n單一欄位篩選 {filters}: {len(expected)} 筆，"
+          f"逐筆轉小寫 {baseline_ms:.1f} ms，搜尋字串 {elapsed_ms:.1f} ms")
+
+    print("\n=== 所有搜尋結果一致 ===")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
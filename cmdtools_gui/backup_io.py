@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+備份檔讀寫模組
+以串流方式逐筆讀寫備份檔中各資料表的記錄，不需將整個備份載入記憶體：
+- compact：與原本相同的 {"export_time", "tables": {...}} JSON 結構，每筆記錄一行
+- ndjson：每行一個 JSON 值（檔頭、資料表區段標記、記錄，最後為各資料表筆數與校驗碼的 manifest）
+副檔名加上 .gz（或安裝 zstandard 後的 .zst）時壓縮；
+讀取時自動判斷壓縮方式與格式，並依已讀取的位元組數回報進度
+"""
+
+import codecs
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import zstandard  # 選用：安裝後可讀寫 .zst 壓縮備份
+except ImportError:
+    zstandard = None
+
+# 每次自檔案讀取的位元組數
+READ_CHUNK_SIZE = 256 * 1024
+# 單一 JSON 值（例如一筆記錄）的長度上限（字元數），超過時視為格式錯誤而不繼續讀取
+MAX_VALUE_SIZE = 16 * 1024 * 1024
+# 解碼錯誤位於緩衝區結尾這幾個字元內時，視為內容被截斷（最長為不完整的 \uXXXX 跳脫字元）
+_TRUNCATION_MARGIN = 6
+
+# 進度回報: (已讀取位元組數, 檔案總位元組數)
+ProgressCallback = Callable[[int, int], None]
+
+# NDJSON 備份檔頭的格式名稱與版本、資料表區段與 manifest 標記的鍵
+NDJSON_FORMAT = 'cmdtools-ndjson'
+NDJSON_VERSION = 1
+TABLE_MARKER = '__table__'
+MANIFEST_MARKER = '__manifest__'
+# 判斷是否為 NDJSON 時最多讀取的檔頭長度
+HEADER_PROBE_SIZE = 4096
+
+# 壓縮格式的檔頭與壓縮等級
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# 可匯入的備份檔副檔名與匯出對話框的檔案類型（未安裝 zstandard 時不提供 .zst）
+BACKUP_EXTENSIONS = ('.json', '.ndjson', '.json.gz', '.ndjson.gz') + (
+    ('.json.zst', '.ndjson.zst') if zstandard is not None else ())
+BACKUP_EXPORT_FILTERS = [
+    "JSON 檔案 (*.json)",
+    "NDJSON 檔案（每行一筆記錄） (*.ndjson)",
+    "壓縮 NDJSON 備份（gzip） (*.ndjson.gz)",
+] + (["壓縮 NDJSON 備份（zstd） (*.ndjson.zst)"] if zstandard is not None else [])
+
+# 解壓縮損毀或不完整的壓縮檔時可能發生的例外
+_DECOMPRESS_ERRORS = (EOFError, OSError, zlib.error) + (
+    (zstandard.ZstdError,) if zstandard is not None else ())
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class BackupFormatError(ValueError):
+    """備份檔格式不正確"""
+
+
+class JsonStreamReader:
+    """
+    JSON 串流讀取器
+
+    只保留尚未解析的內容，逐一讀取物件的鍵與陣列元素；
+    每個值（例如一筆記錄）以 json.JSONDecoder.raw_decode 解碼，內容在緩衝區結尾被截斷時再讀取下一段；
+    錯誤位於緩衝區中間或單一值超過 MAX_VALUE_SIZE 時立即拋出 BackupFormatError。
+    """
+
+    def __init__(self, file_obj, total_bytes: int = 0, progress_callback: Optional[ProgressCallback] = None,
+                 position: Optional[Callable[[], int]] = None):
+        """
+        初始化串流讀取器
+
+        Args:
+            file_obj: 以二進位模式開啟的檔案（或解壓縮串流）
+            total_bytes: 檔案大小（進度回報用）
+            progress_callback: 每讀取一段內容後呼叫 (已讀取位元組數, 檔案總位元組數)
+            position: 取得檔案實際讀取位置的函式（壓縮檔以壓縮後的位元組數回報進度）
+        """
+        self._file = file_obj
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+        self.total_bytes = total_bytes
+        self.progress_callback = progress_callback
+        self._position = position
+
+    def _fill(self) -> bool:
+        """讀取下一段內容並捨棄已解析的部分（已到檔案結尾時回傳 False）"""
+        if self._eof:
+            return False
+        chunk = self._file.read(READ_CHUNK_SIZE)
+        self.bytes_read += len(chunk)
+        try:
+            if chunk:
+                text = self._text_decoder.decode(chunk)
+            else:
+                self._eof = True
+                text = self._text_decoder.decode(b'', final=True)
+        except UnicodeDecodeError as e:
+            raise BackupFormatError(f"備份檔不是有效的 UTF-8：第 {self.bytes_read} 位元組附近（{e.reason}），"
+                                    f"檔案可能已損毀或不完整") from e
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        if self.progress_callback:
+            self.progress_callback(self._position() if self._position else self.bytes_read, self.total_bytes)
+        return True
+
+    def peek(self) -> str:
+        """略過空白並回傳下一個字元（檔案結尾時回傳空字串）"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        """讀取指定的分隔字元"""
+        found = self.peek()
+        if found != char:
+            raise BackupFormatError(f"JSON 格式不正確：第 {self.bytes_read} 位元組附近預期 '{char}'，"
+                                    f"實際為 '{found or '檔案結尾'}'")
+        self._pos += 1
+
+    def read_value(self):
+        """解碼下一個完整的 JSON 值"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._truncated(e) and self._fill_value():
+                    continue
+                hint = "，檔案可能不完整" if self._eof else ""
+                raise BackupFormatError(f"JSON 格式不正確：第 {self.bytes_read} 位元組附近無法解析"
+                                        f"（{e.msg}）{hint}") from e
+            # 緩衝區結尾的數字可能被截斷，需讀取下一段確認
+            if end == len(self._buffer) and self._fill_value():
+                continue
+            self._pos = end
+            return value
+
+    def _truncated(self, error: json.JSONDecodeError) -> bool:
+        """解碼錯誤是否因值在緩衝區結尾被截斷（而非內容本身有誤）"""
+        if error.msg.startswith('Unterminated string'):
+            return True  # 錯誤位置為字串開頭，結尾的引號可能在下一段
+        return error.pos >= len(self._buffer) - _TRUNCATION_MARGIN
+
+    def _fill_value(self) -> bool:
+        """為尚未解碼完成的值讀取下一段（超過 MAX_VALUE_SIZE 時拋出 BackupFormatError）"""
+        if len(self._buffer) - self._pos > MAX_VALUE_SIZE:
+            raise BackupFormatError(f"JSON 格式不正確：第 {self.bytes_read} 位元組附近的值超過 "
+                                    f"{MAX_VALUE_SIZE // (1024 * 1024)} MB，檔案可能已損毀")
+        return self._fill()
+
+    def _next_separator(self, closing: str) -> bool:
+        """讀取元素之間的逗號，遇到結尾字元時回傳 False"""
+        char = self.peek()
+        if char == closing:
+            self._pos += 1
+            return False
+        self._expect(',')
+        return True
+
+    def iter_object(self) -> Iterator[str]:
+        """逐一讀取物件的鍵（呼叫端須在取得下一個鍵前讀取或略過對應的值）"""
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise BackupFormatError("JSON 格式不正確：物件的鍵必須是字串")
+            self._expect(':')
+            yield key
+            if not self._next_separator('}'):
+                return
+
+    def iter_array(self) -> Iterator:
+        """逐一讀取陣列元素"""
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if not self._next_separator(']'):
+                return
+
+
+def compression_for_path(file_path: str) -> Optional[str]:
+    """依副檔名決定壓縮方式（.gz 為 gzip、.zst 為 zstd，其餘不壓縮）"""
+    lowered = file_path.lower()
+    if lowered.endswith('.gz'):
+        return 'gzip'
+    if lowered.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def framing_for_path(file_path: str) -> str:
+    """依副檔名決定匯出格式（.ndjson 與其壓縮檔為 NDJSON，其餘為 compact JSON）"""
+    lowered = file_path.lower()
+    for suffix in ('.gz', '.zst'):
+        if lowered.endswith(suffix):
+            lowered = lowered[:-len(suffix)]
+    return 'ndjson' if lowered.endswith('.ndjson') else 'compact'
+
+
+@contextmanager
+def open_backup_for_write(file_path: str, compression: Optional[str] = None):
+    """以二進位模式開啟要寫入的備份檔（依 compression 壓縮）"""
+    if compression == 'gzip':
+        with gzip.open(file_path, 'wb', compresslevel=GZIP_LEVEL) as f:
+            yield f
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise BackupFormatError("匯出 .zst 備份需要安裝 zstandard 套件（pip install zstandard）")
+        with open(file_path, 'wb') as raw:
+            with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as f:
+                yield f
+    else:
+        with open(file_path, 'wb') as f:
+            yield f
+
+
+def _open_decompressed(raw):
+    """依檔頭判斷壓縮方式，回傳 (可讀取的串流, 是否壓縮)"""
+    magic = raw.read(len(ZSTD_MAGIC))
+    raw.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=raw, mode='rb'), True
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise BackupFormatError("讀取 .zst 備份需要安裝 zstandard 套件（pip install zstandard）")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)), True
+    return raw, False
+
+
+def _dumps(value) -> str:
+    """以最精簡的分隔字元序列化（保留中文字元）"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class BackupWriter:
+    """
+    備份檔串流寫入器
+
+    依序呼叫 begin()、每張資料表的 begin_table() / write_rows() / end_table()，最後呼叫 finish()；
+    記錄寫入後即不再保留。NDJSON 會在最後寫入 manifest，記錄各資料表的筆數與記錄行的 SHA-256，
+    匯入前可據此確認備份完整。
+    """
+
+    def __init__(self, file_obj, framing: str = 'compact'):
+        """
+        初始化寫入器
+
+        Args:
+            file_obj: 以二進位模式開啟的檔案（或壓縮串流）
+            framing: 'compact' 或 'ndjson'
+        """
+        if framing not in ('compact', 'ndjson'):
+            raise ValueError(f"不支援的匯出格式: {framing}")
+        self._file = file_obj
+        self.framing = framing
+        self.bytes_written = 0  # 未壓縮的位元組數
+        self.table_rows = 0  # 目前資料表已寫入的筆數
+        self.manifest: Dict[str, Dict] = {}  # 資料表名稱 -> {'rows', 'sha256'}
+        self._table_name = None
+        self._digest = None
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def begin(self, export_time: str):
+        """寫入檔頭"""
+        if self.framing == 'ndjson':
+            header = {'format': NDJSON_FORMAT, 'version': NDJSON_VERSION,
+                      'export_time': export_time, 'manifest': True}
+            self._write((_dumps(header) + '\n').encode('utf-8'))
+        else:
+            self._write(f'{{"export_time":{_dumps(export_time)},"tables":{{'.encode('utf-8'))
+
+    def begin_table(self, table_name: str):
+        """開始寫入一張資料表"""
+        if self.framing == 'ndjson':
+            self._write((_dumps({TABLE_MARKER: table_name}) + '\n').encode('utf-8'))
+            self._digest = hashlib.sha256()
+        else:
+            separator = ',' if self._table_name is not None else ''
+            self._write(f'{separator}\n{_dumps(table_name)}:['.encode('utf-8'))
+        self._table_name = table_name
+        self.table_rows = 0
+
+    def write_rows(self, rows: Iterable[Dict]):
+        """寫入一批記錄"""
+        lines = [_dumps(row) for row in rows]
+        if not lines:
+            return
+        if self.framing == 'ndjson':
+            data = ('\n'.join(lines) + '\n').encode('utf-8')
+            self._digest.update(data)
+        else:
+            data = (('\n' if self.table_rows == 0 else ',\n') + ',\n'.join(lines)).encode('utf-8')
+        self._write(data)
+        self.table_rows += len(lines)
+
+    def end_table(self):
+        """結束目前的資料表"""
+        if self.framing == 'ndjson':
+            self.manifest[self._table_name] = {'rows': self.table_rows, 'sha256': self._digest.hexdigest()}
+        else:
+            self._write(b'\n]' if self.table_rows else b']')
+
+    def finish(self):
+        """寫入檔尾（NDJSON 為 manifest）"""
+        if self.framing == 'ndjson':
+            self._write((_dumps({MANIFEST_MARKER: {'tables': self.manifest}}) + '\n').encode('utf-8'))
+        else:
+            self._write(b'\n}}\n')
+
+
+def _read_ndjson_header(f) -> Optional[Dict]:
+    """讀取 NDJSON 檔頭（不是 NDJSON 備份檔時回傳 None）"""
+    line = f.readline(HEADER_PROBE_SIZE)
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(header, dict) and header.get('format') == NDJSON_FORMAT:
+        return header
+    return None
+
+
+def _verify_manifest(manifest, computed: Dict[str, Dict]):
+    """比對 manifest 與實際讀取的筆數與校驗碼"""
+    tables = manifest.get('tables') if isinstance(manifest, dict) else None
+    if not isinstance(tables, dict):
+        raise BackupFormatError("備份檔 manifest 格式不正確")
+    for table_name in set(tables) | set(computed):
+        expected = tables.get(table_name, {'rows': 0})
+        actual = computed.get(table_name)
+        actual_rows = actual['rows'] if actual else 0
+        if expected.get('rows') != actual_rows:
+            raise BackupFormatError(f"備份檔校驗失敗：{table_name} 應有 {expected.get('rows')} 筆，"
+                                    f"實際讀取 {actual_rows} 筆")
+        if actual and expected.get('sha256') != actual['digest'].hexdigest():
+            raise BackupFormatError(f"備份檔校驗失敗：{table_name} 的校驗碼不符，檔案可能已損毀")
+
+
+def _iter_ndjson_rows(f, header: Dict, header_bytes: int, total_bytes: int,
+                      progress_callback: Optional[ProgressCallback],
+                      position: Callable[[], int]) -> Iterator[Tuple[str, Dict]]:
+    """逐行讀取 NDJSON 備份檔的記錄並驗證 manifest（f 已位於檔頭之後）"""
+    table_name = None
+    computed: Dict[str, Dict] = {}  # 資料表名稱 -> {'rows', 'digest'}
+    current = None
+    manifest_found = False
+    bytes_read = reported = header_bytes
+    for line_number, line in enumerate(f, start=2):
+        bytes_read += len(line)
+        if progress_callback and bytes_read - reported >= READ_CHUNK_SIZE:
+            reported = bytes_read
+            progress_callback(position(), total_bytes)
+        if not line.strip():
+            continue
+        if manifest_found:
+            raise BackupFormatError(f"NDJSON 格式不正確：第 {line_number} 行位於 manifest 之後")
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            raise BackupFormatError(f"NDJSON 格式不正確：第 {line_number} 行無法解析（{e}）") from e
+        if not isinstance(value, dict):
+            raise BackupFormatError(f"NDJSON 格式不正確：第 {line_number} 行必須是物件")
+        if TABLE_MARKER in value:
+            table_name = value[TABLE_MARKER]
+            current = computed.setdefault(table_name, {'rows': 0, 'digest': hashlib.sha256()})
+            continue
+        if MANIFEST_MARKER in value:
+            _verify_manifest(value[MANIFEST_MARKER], computed)
+            manifest_found = True
+            continue
+        if table_name is None:
+            raise BackupFormatError(f"NDJSON 格式不正確：第 {line_number} 行之前缺少資料表區段")
+        current['rows'] += 1
+        current['digest'].update(line.rstrip(b'\r\n') + b'\n')
+        yield table_name, value
+
+    if header.get('manifest') and not manifest_found:
+        raise BackupFormatError("備份檔不完整：缺少 manifest")
+    if progress_callback:
+        progress_callback(position(), total_bytes)
+
+
+def _iter_json_rows(f, total_bytes: int, progress_callback: Optional[ProgressCallback],
+                    position: Callable[[], int]) -> Iterator[Tuple[str, Dict]]:
+    """逐筆讀取 JSON 備份檔 tables 區塊中的記錄"""
+    reader = JsonStreamReader(f, total_bytes, progress_callback, position)
+    if reader.peek() != '{':
+        raise BackupFormatError("JSON 格式不正確，最外層必須是物件")
+
+    found_tables = False
+    for key in reader.iter_object():
+        if key != 'tables' or reader.peek() != '{':
+            reader.read_value()
+            continue
+        found_tables = True
+        for table_name in reader.iter_object():
+            if reader.peek() != '[':
+                reader.read_value()
+                continue
+            for row in reader.iter_array():
+                if not isinstance(row, dict):
+                    raise BackupFormatError(f"JSON 格式不正確，{table_name} 的記錄必須是物件")
+                yield table_name, row
+
+    if reader.peek():
+        raise BackupFormatError("JSON 格式不正確，檔案結尾有多餘的內容")
+    if not found_tables:
+        raise BackupFormatError("JSON 格式不正確，缺少 'tables' 區塊")
+
+
+def iter_backup_rows(file_path: str, progress_callback: Optional[ProgressCallback] = None
+                     ) -> Iterator[Tuple[str, Dict]]:
+    """
+    逐筆讀取備份檔中的記錄（自動判斷壓縮方式與 JSON / NDJSON 格式）
+
+    JSON 備份檔格式：{"export_time": "...", "tables": {"CmdTools": [...], ...}}，
+    tables 以外的鍵與非陣列的資料表內容會被略過。
+
+    Yields:
+        (資料表名稱, 記錄)，依檔案中的順序
+    """
+    total_bytes = os.path.getsize(file_path)
+    with open(file_path, 'rb') as raw:
+        stream, compressed = _open_decompressed(raw)
+        try:
+            header = _read_ndjson_header(stream)
+            if header is not None:
+                if header.get('version', 0) > NDJSON_VERSION:
+                    raise BackupFormatError(f"不支援的備份檔版本: {header.get('version')}")
+                yield from _iter_ndjson_rows(stream, header, stream.tell(), total_bytes,
+                                             progress_callback, raw.tell)
+                return
+
+            if compressed:
+                raw.seek(0)
+                stream, _ = _open_decompressed(raw)
+            else:
+                stream.seek(0)
+            yield from _iter_json_rows(stream, total_bytes, progress_callback, raw.tell)
+        except _DECOMPRESS_ERRORS as e:
+            if not compressed:
+                raise
+            raise BackupFormatError(f"壓縮備份檔損毀或不完整: {e}") from e
+
+
+def scan_backup(file_path: str, progress_callback: Optional[ProgressCallback] = None) -> Dict[str, int]:
+    """
+    完整讀過備份檔確認格式正確（不保留記錄）
+
+    Returns:
+        {資料表名稱: 記錄數}
+    """
+    counts: Dict[str, int] = {}
+    for table_name, _ in iter_backup_rows(file_path, progress_callback):
+        counts[table_name] = counts.get(table_name, 0) + 1
+    return counts
+
+
+def format_bytes(size: int) -> str:
+    """格式化位元組數"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
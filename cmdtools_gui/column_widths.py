@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+欄寬計算模組
+以表頭與抽樣記錄估算欄寬並依表格類型快取，
+取代每次重新填入資料都量測所有儲存格的 resizeColumnsToContents
+"""
+
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+# 最多量測的記錄數（平均分布在整份資料中）
+SAMPLE_ROWS = 200
+# 每個儲存格最多量測的字元數（超過最大欄寬的部分不需量測）
+MEASURE_CHARS = 120
+# 欄寬上下限與儲存格左右留白（像素）
+MIN_COLUMN_WIDTH = 40
+MAX_COLUMN_WIDTH = 400
+CELL_PADDING = 16
+
+
+def text_width(metrics, text: str) -> int:
+    """以字型度量取得文字寬度（相容 Qt 5.11 之前的版本）"""
+    if hasattr(metrics, 'horizontalAdvance'):
+        return metrics.horizontalAdvance(text)
+    return metrics.width(text)
+
+
+def sample_records(records: Collection[Dict], limit: int = SAMPLE_ROWS) -> List[Dict]:
+    """
+    平均抽樣記錄（資料量不超過 limit 時全部使用）
+
+    依序走訪一次取出平均分布位置的記錄，不以索引取值（RecordStore 以索引取值需逐筆走訪）
+    """
+    total = len(records)
+    if total <= limit:
+        return list(records)
+    step = total / limit
+    positions = {int(i * step) for i in range(limit)}
+    return [record for position, record in enumerate(records) if position in positions]
+
+
+class ColumnWidthEngine:
+    """
+    欄寬計算與快取
+
+    欄寬依表格類型快取，只有在資料規模改變（記錄數跨越 2 的次方）時才重新抽樣量測，
+    因此篩選、刷新等重新填入資料的操作不需再量測字型。
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[int, List[int]]] = {}  # 表格類型 -> (資料規模, 欄寬)
+
+    @staticmethod
+    def data_shape(records: Collection[Dict]) -> int:
+        """資料規模（記錄數的二進位位數，0 表示沒有資料）"""
+        return len(records).bit_length()
+
+    def get_widths(self, table_type: str, records: Collection[Dict], fields: Sequence[str],
+                   headers: Sequence[str], cell_metrics, header_metrics=None) -> List[int]:
+        """
+        取得欄寬（資料規模未改變時直接使用快取）
+
+        Args:
+            table_type: 表格類型
+            records: 完整資料（以完整資料估算，篩選時欄寬不會跳動）
+            fields: 各欄對應的記錄欄位
+            headers: 各欄標題
+            cell_metrics: 儲存格字型度量（QFontMetrics）
+            header_metrics: 表頭字型度量（預設同儲存格）
+        """
+        shape = self.data_shape(records)
+        cached = self._cache.get(table_type)
+        if cached is not None and cached[0] == shape and len(cached[1]) == len(fields):
+            return cached[1]
+
+        widths = self.measure(records, fields, headers, cell_metrics, header_metrics or cell_metrics)
+        self._cache[table_type] = (shape, widths)
+        return widths
+
+    @staticmethod
+    def measure(records: Sequence[Dict], fields: Sequence[str], headers: Sequence[str],
+                cell_metrics, header_metrics) -> List[int]:
+        """以表頭與抽樣記錄量測欄寬"""
+        samples = sample_records(records)
+        widths = []
+        for column, field in enumerate(fields):
+            header = headers[column] if column < len(headers) else field
+            width = text_width(header_metrics, header)
+            # 相同內容只量測一次（分類等欄位常有重複值）
+            seen = set()
+            for record in samples:
+                text = str(record.get(field, ''))[:MEASURE_CHARS]
+                if text in seen:
+                    continue
+                seen.add(text)
+                width = max(width, text_width(cell_metrics, text))
+                if width >= MAX_COLUMN_WIDTH:
+                    break
+            widths.append(max(MIN_COLUMN_WIDTH, min(width + CELL_PADDING, MAX_COLUMN_WIDTH)))
+        return widths
+
+    def invalidate(self, table_type: Optional[str] = None):
+        """清除快取（未指定表格類型時清除全部）"""
+        if table_type is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(table_type, None)
+
+
+# 所有表格共用的欄寬快取
+column_width_engine = ColumnWidthEngine()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+資料庫連線池模組
+自行保存 mysql.connector 連線，提供逾時等待、斷線重連、取得連線耗時統計，
+關閉時以連線的公開 API 中斷所有連線（使用中的連線於歸還時中斷）
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import mysql.connector
+from mysql.connector import Error
+
+# 連線池大小上限（與 mysql.connector.pooling 相同）
+MAX_POOL_SIZE = 32
+
+
+class ConnectionUnavailable(Exception):
+    """無法連線到資料庫（連線逾時或重連失敗，而非連線池用盡）"""
+
+
+class PooledConnection:
+    """
+    連線池交出的連線
+
+    close() 時歸還連線池（連線池已關閉時改為中斷連線），其餘屬性與方法轉給實際的 MySQL 連線。
+    """
+
+    def __init__(self, pool: 'ConnectionPool', connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        """歸還連線池（重複呼叫無作用）"""
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool._release(connection)
+
+
+class ConnectionPool:
+    """MySQL 連線池"""
+
+    def __init__(self, db_config: Dict, pool_size: int = 5, checkout_timeout: float = 10.0,
+                 pool_name: str = "cmdtools_pool"):
+        """
+        初始化連線池（會立即建立 pool_size 條連線）
+
+        Args:
+            db_config: mysql.connector 連線參數
+            pool_size: 連線數量（1 ~ 32）
+            checkout_timeout: 連線池用盡時等待可用連線的秒數
+            pool_name: 連線池名稱
+        """
+        self.pool_size = max(1, min(int(pool_size), MAX_POOL_SIZE))
+        self.checkout_timeout = checkout_timeout
+        self.pool_name = pool_name
+        self._idle = queue.Queue(self.pool_size)  # 閒置的連線
+        self._closed = False
+        for _ in range(self.pool_size):
+            try:
+                self._idle.put(mysql.connector.connect(**db_config))
+            except Error:
+                self.close()
+                raise
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'checkouts': 0,  # 成功取得連線次數
+            'failures': 0,  # 取得連線失敗次數（逾時或重連失敗）
+            'total_wait': 0.0,  # 累計取得連線耗時（秒）
+            'max_wait': 0.0,  # 單次最長取得連線耗時（秒）
+        }
+
+    def get_connection(self, timeout: Optional[float] = None, fail_fast: bool = False):
+        """
+        取得連線（使用完畢請呼叫 close() 歸還）
+
+        連線池在交出連線前會檢查連線狀態，已中斷的連線會自動重新連線；
+        重連失敗或連線池用盡時會在逾時前持續重試。
+
+        Args:
+            timeout: 等待秒數（None 表示使用 checkout_timeout）
+            fail_fast: 重連失敗時立即拋出 ConnectionUnavailable，不重試
+                （例如寫入可改寫離線日誌時，不需等到逾時）
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        last_error = None
+        disconnected = False  # 最後一次失敗是否為無法連線
+
+        while True:
+            if self._closed:
+                raise ConnectionUnavailable("連線池已關閉")
+            try:
+                connection = self._idle.get(block=False)
+            except queue.Empty:
+                # 連線池已用盡，等待其他使用者歸還
+                last_error, disconnected = "連線池已用盡", False
+            else:
+                try:
+                    if not connection.is_connected():
+                        connection.reconnect(attempts=1, delay=0)
+                    self._record_checkout(time.perf_counter() - start)
+                    return PooledConnection(self, connection)
+                except Error as e:
+                    # 斷線後重新連線失敗，連線放回連線池，稍後再試
+                    self._idle.put(connection)
+                    last_error, disconnected = e, True
+
+            if time.perf_counter() >= deadline or (disconnected and fail_fast):
+                with self._metrics_lock:
+                    self._metrics['failures'] += 1
+                if disconnected:
+                    raise ConnectionUnavailable(f"無法從連線池取得連線: {last_error}")
+                raise Exception(f"無法從連線池取得連線: {last_error}")
+            time.sleep(0.05)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None, fail_fast: bool = False):
+        """以 with 區塊使用連線，離開時自動歸還連線池"""
+        connection = self.get_connection(timeout, fail_fast)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def health_check(self) -> bool:
+        """檢查資料庫是否可用（取得連線並 ping）"""
+        try:
+            with self.connection() as connection:
+                connection.ping(reconnect=True, attempts=2, delay=0)
+            return True
+        except Exception:
+            return False
+
+    def _release(self, connection):
+        """歸還連線：重設工作階段後放回連線池；連線池已關閉時中斷連線"""
+        if self._closed:
+            self._disconnect(connection)
+            return
+        try:
+            connection.reset_session()
+        except Error:
+            # 連線已中斷，下次取用時重新連線
+            pass
+        self._idle.put(connection)
+        if self._closed:
+            # close() 與歸還同時發生：確保連線不會留在已關閉的連線池
+            self._drain()
+
+    def close(self):
+        """關閉連線池：立即中斷閒置連線，使用中的連線於歸還時中斷"""
+        self._closed = True
+        self._drain()
+
+    def _drain(self):
+        """中斷所有閒置連線"""
+        while True:
+            try:
+                connection = self._idle.get(block=False)
+            except queue.Empty:
+                return
+            self._disconnect(connection)
+
+    @staticmethod
+    def _disconnect(connection):
+        """中斷連線（連線已中斷時忽略錯誤）"""
+        try:
+            connection.disconnect()
+        except Error:
+            pass
+
+    def _record_checkout(self, elapsed: float):
+        """記錄取得連線的耗時"""
+        with self._metrics_lock:
+            self._metrics['checkouts'] += 1
+            self._metrics['total_wait'] += elapsed
+            self._metrics['max_wait'] = max(self._metrics['max_wait'], elapsed)
+
+    def get_metrics(self) -> Dict:
+        """取得連線池統計資訊（耗時單位為毫秒）"""
+        with self._metrics_lock:
+            checkouts = self._metrics['checkouts']
+            return {
+                'pool_size': self.pool_size,
+                'checkouts': checkouts,
+                'failures': self._metrics['failures'],
+                'avg_wait_ms': self._metrics['total_wait'] * 1000 / checkouts if checkouts else 0.0,
+                'max_wait_ms': self._metrics['max_wait'] * 1000,
+            }
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+背景資料載入模組
+在工作執行緒中連線資料庫並載入所有資料表、執行備份匯入與匯出，避免阻塞 GUI 執行緒
+"""
+
+from typing import Callable, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class DataLoadThread(QThread):
+    """背景資料載入執行緒"""
+
+    # 定義信號
+    connection_checked = pyqtSignal(bool)  # 連線結果
+    progress_changed = pyqtSignal(int, str)  # 載入進度: (百分比, 訊息)
+    rows_loaded = pyqtSignal(str, list, int)  # 讀取一批記錄: (資料表名稱, 此批記錄, 已讀取筆數)
+    load_finished = pyqtSignal(bool, str, dict)  # 載入完成: (是否成功, 訊息, {資料表名稱: 資料})
+    sync_finished = pyqtSignal(bool, str, dict)  # 增量同步完成: (是否成功, 訊息, {資料表名稱: 變動})
+    replay_finished = pyqtSignal(bool, str)  # 離線變更重送完成: (是否成功, 訊息)
+
+    def __init__(self, db_manager, parent=None, incremental=False):
+        """
+        初始化背景載入執行緒
+
+        Args:
+            db_manager: DatabaseManager 實例
+            parent: 父物件
+            incremental: 是否只同步變動的記錄（尚無同步狀態時自動改為完整載入）
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.incremental = incremental
+
+    def run(self):
+        """執行緒主體：連線並讀取所有資料表（或只讀取變動）"""
+        try:
+            if not self.db_manager.is_connected():
+                connected = self.db_manager.connect()
+                self.connection_checked.emit(connected)
+                if not connected:
+                    self.load_finished.emit(False, "無法連線到資料庫，請檢查連線設定", {})
+                    return
+
+            # 先重送離線變更，之後讀取的資料才包含這些變更
+            if self.db_manager.has_pending_writes():
+                self.progress_changed.emit(0, "正在同步離線變更...")
+                success, message = self.db_manager.replay_journal(self.on_replay_progress)
+                self.replay_finished.emit(success, message)
+
+            if self.incremental and self.db_manager.can_sync_incrementally():
+                self.progress_changed.emit(0, "正在同步資料...")
+                try:
+                    deltas = self.db_manager.fetch_all_deltas(self.on_table_loaded)
+                    self.sync_finished.emit(True, "資料同步完成", deltas)
+                except Exception as e:
+                    self.sync_finished.emit(False, f"同步資料時發生錯誤: {e}", {})
+                return
+
+            self.progress_changed.emit(0, "正在載入資料...")
+            results = self.db_manager.fetch_all_tables(self.on_table_loaded, rows_callback=self.on_rows_loaded)
+            self.load_finished.emit(True, "資料載入成功", results)
+
+        except Exception as e:
+            self.load_finished.emit(False, f"載入資料時發生錯誤: {e}", {})
+
+    def on_replay_progress(self, message: str, done: int, total: int):
+        """重送離線變更時回報進度"""
+        self.progress_changed.emit(int(done * 100 / total) if total else 100, message)
+
+    def on_table_loaded(self, table_name: str, loaded: int, total: int):
+        """單一資料表載入完成時回報進度"""
+        percent = int(loaded * 100 / total) if total else 100
+        self.progress_changed.emit(percent, f"已載入 {table_name} ({loaded}/{total})")
+
+    def on_rows_loaded(self, table_name: str, rows: list, loaded: int):
+        """讀取一批記錄時通知 GUI 執行緒（記錄已轉換完成，之後不再修改）"""
+        self.rows_loaded.emit(table_name, rows, loaded)
+
+
+class BackupThread(QThread):
+    """背景備份作業執行緒（匯入或匯出整個資料庫）"""
+
+    # 定義信號
+    progress_changed = pyqtSignal(int, str)  # 作業進度: (百分比, 訊息)
+    operation_finished = pyqtSignal(bool, str)  # 作業完成: (是否成功, 訊息)
+
+    def __init__(self, operation: Callable[[Callable[[str, int, int], None]], Tuple[bool, str]], parent=None):
+        """
+        初始化背景備份執行緒
+
+        Args:
+            operation: 傳入進度回報函式 (進度說明, 已完成量, 總量)、回傳 (是否成功, 訊息) 的作業
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.operation = operation
+
+    def run(self):
+        """執行緒主體：執行備份作業並回報結果"""
+        try:
+            success, message = self.operation(self.on_progress)
+        except Exception as e:
+            success, message = False, f"備份作業發生錯誤: {e}"
+        self.operation_finished.emit(success, message)
+
+    def on_progress(self, message: str, done: int, total: int):
+        """回報進度（百分比依已完成量計算）"""
+        percent = int(done * 100 / total) if total else 0
+        self.progress_changed.emit(min(percent, 100), message)
@@ -5,10 +5,90 @@ MySQL 資料庫連線和管理模組
 """
 
 import json
-import mysql.connector
+import threading
+import time
 from mysql.connector import Error
-from typing import List, Dict, Optional, Tuple
+from mysql.connector.errors import InterfaceError, OperationalError
+from typing import List, Dict, Iterable, Optional, Tuple, Callable
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from itertools import groupby, islice
+from operator import itemgetter
+
+from .backup_io import (BackupFormatError, BackupWriter, compression_for_path, format_bytes,
+                        framing_for_path, iter_backup_rows, open_backup_for_write, scan_backup)
+from .connection_pool import ConnectionPool, ConnectionUnavailable
+from .record_store import RecordStore, make_record_class, record_to_json
+from .search_index import SearchIndex
+from .snapshot import DEFAULT_SNAPSHOT_FILE, CacheSnapshot, SnapshotError
+from .write_journal import DEFAULT_JOURNAL_FILE, WriteJournal
+
+# 伺服器端查詢每頁預設筆數
+SERVER_SIDE_PAGE_SIZE = 500
+# 載入資料表時每次自資料庫讀取的筆數
+LOAD_BATCH_SIZE = 1000
+# 匯入備份時每個多列 INSERT 包含的筆數
+IMPORT_BATCH_SIZE = 1000
+# 關鍵字至少幾個字元才使用 FULLTEXT 索引（ngram 解析器預設以二元組斷詞）
+FULLTEXT_MIN_LENGTH = 2
+# 離線寫入日誌每次重送的筆數（同一交易）
+REPLAY_BATCH_SIZE = 500
+# 建立資料庫連線的預設逾時秒數
+CONNECT_TIMEOUT = 5
+# 批次新增、更新、刪除時每個 executemany（或 IN 條件）包含的預設筆數
+BATCH_WRITE_SIZE = 1000
+
+
+# 資料表定義：資料表名稱 -> 分頁類型、本地快取屬性、顯示名稱與欄位清單（CmdTools 已移除 remark2 欄位）
+# 第一個欄位固定為主鍵 iSeqNo，其餘為可寫入欄位；defaults 為未提供值時的預設值
+TABLE_DEFINITIONS = {
+    'CmdTools': {
+        'table_type': 'cmd',
+        'attr': 'cmd_tools_data',
+        'label': '命令工具',
+        'columns': ["iSeqNo", "cmd", "example", "remark1", "Classification"],
+    },
+    'PromptTools': {
+        'table_type': 'prompt',
+        'attr': 'prompt_tools_data',
+        'label': '提示工具',
+        'columns': ["iSeqNo", "Prompt", "Prompt_Eng", "Classification"],
+    },
+    'WinProgram': {
+        'table_type': 'winprogram',
+        'attr': 'win_program_data',
+        'label': 'Windows 程式',
+        'columns': ["iSeqNo", "remark1", "ProgramPathAndName", "ClickEndRun"],
+        'defaults': {'ClickEndRun': 0},
+    },
+    'WebSite': {
+        'table_type': 'website',
+        'attr': 'web_site_data',
+        'label': '網站',
+        'columns': ["iSeqNo", "Remark", "Classification", "Website", "account",
+                    "account_webid", "password", "password_webid"],
+        'secret_columns': ["password"],  # 不寫入本機快照
+    },
+}
+
+
+def like_pattern(keyword: str) -> str:
+    """產生「包含關鍵字」的 LIKE 樣式（跳脫萬用字元）"""
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def is_connection_error(error: Exception) -> bool:
+    """是否為無法連線或連線中斷（而非 SQL 本身的錯誤）"""
+    return isinstance(error, (ConnectionUnavailable, InterfaceError, OperationalError))
+
+
+def format_rate(rows: int, seconds: float) -> str:
+    """格式化匯入速度"""
+    if seconds <= 0:
+        return f"{seconds:.2f} 秒"
+    return f"{seconds:.2f} 秒（{rows / seconds:,.0f} 筆/秒）"
 
 
 class DatabaseManager:
@@ -17,11 +97,44 @@ class DatabaseManager:
     def __init__(self, config_file: str = 'config.json'):
         """初始化資料庫管理器"""
         self.config = self._load_config(config_file)
-        self.connection = None
-        self.cmd_tools_data = []
-        self.prompt_tools_data = []
-        self.win_program_data = []
-        self.web_site_data = []
+        self.config_file = config_file
+        self.pool = None  # 連線池（connect() 時建立）
+        self._pool_lock = threading.RLock()  # 避免多個執行緒同時建立連線池
+        self.cmd_tools_data = self._new_store('CmdTools')
+        self.prompt_tools_data = self._new_store('PromptTools')
+        self.win_program_data = self._new_store('WinProgram')
+        self.web_site_data = self._new_store('WebSite')
+        self.last_load_timings = {}  # 最近一次載入各資料表耗時（秒）
+        self.sync_state = {}  # 增量同步狀態: {資料表名稱: {'checksum', 'max_seq', 'row_hashes'}}
+        self._staged_sync_state = {}  # 已讀取但尚未套用到快取的同步狀態
+        # 搜尋索引：預先正規化的搜尋字串與倒排索引（設定 SearchIndex 為 false 時不建立倒排索引）
+        self.search_indexes = {table_name: self._new_search_index(table_name) for table_name in TABLE_DEFINITIONS}
+        self._staged_search_indexes = {}  # 已在背景建立但尚未套用的搜尋索引
+        # 本地快取與搜尋索引的鎖（背景搜尋執行緒與 GUI 執行緒共用），每次變動遞增 data_version
+        self.cache_lock = threading.RLock()
+        self.data_version = 0
+        # 伺服器端查詢模式：記錄數超過 ServerSideThreshold 的資料表不載入本地快取，改為分頁查詢資料庫
+        self.server_side_tables = {}  # 資料表名稱 -> 載入時的記錄數
+        self._staged_server_side = {}  # 已判定但尚未套用的伺服器端資料表
+        self._fulltext_columns = {}  # 資料表名稱 -> FULLTEXT 索引涵蓋的欄位（空清單表示沒有）
+        self.last_import_stats = {}  # 最近一次匯入各資料表的 (筆數, 耗時秒數)
+        self.page_size = int(self.config.get('ServerSidePageSize', SERVER_SIDE_PAGE_SIZE)) or SERVER_SIDE_PAGE_SIZE
+        # 本機快照：啟動時先顯示上次的快取內容（設定 LocalSnapshot 為 false 時不使用）
+        self.snapshot = None
+        if self.config.get('LocalSnapshot', True):
+            snapshot_file = self.config.get('SnapshotFile', DEFAULT_SNAPSHOT_FILE)
+            self.snapshot = CacheSnapshot(os.path.join(os.path.dirname(os.path.abspath(config_file)), snapshot_file))
+        self.snapshot_version = None  # 最近一次儲存或載入快照時的 data_version
+        self.secrets_pending = set()  # 從快照載入、機密欄位尚未自資料庫讀取的資料表
+        # 離線寫入：無法連線時編輯先套用到快取並寫入日誌，恢復連線後重送（設定 OfflineWrites 為 false 時不使用）
+        self.journal = None
+        if self.config.get('OfflineWrites', True):
+            journal_file = self.config.get('JournalFile', DEFAULT_JOURNAL_FILE)
+            self.journal = WriteJournal(os.path.join(os.path.dirname(os.path.abspath(config_file)), journal_file))
+        self.offline = False  # 最近一次寫入是否因無法連線而改寫入日誌
+        self.seq_aliases = {}  # 已重送的暫時序號 -> 資料庫序號（畫面上可能仍持有暫時序號）
+        self.last_replay_issues = []  # 最近一次重送時因衝突或錯誤而略過的變更說明
+        self._replay_lock = threading.Lock()  # 同一時間只有一個執行緒重送日誌
         
     def _load_config(self, config_file: str) -> Dict:
         """載入資料庫配置"""
@@ -34,554 +147,1514 @@ class DatabaseManager:
         except Exception as e:
             raise Exception(f"無法載入配置文件: {e}")
     
+    def _connection_config(self) -> Dict:
+        """取得 mysql.connector 連線參數"""
+        return {
+            'host': self.config['DBServer'],
+            'port': self.config['DBPort'],
+            'user': self.config['DBUser'],
+            'password': self.config['DBPassword'],
+            'database': self.config['DataBase'],
+            'charset': 'utf8mb4',
+            'use_unicode': True,
+            # 無法連線時不等待作業系統的 TCP 逾時
+            'connection_timeout': int(self.config.get('ConnectTimeout', CONNECT_TIMEOUT)),
+        }
+    
     def connect(self) -> bool:
-        """連線到資料庫"""
-        try:
-            self.connection = mysql.connector.connect(
-                host=self.config['DBServer'],
-                port=self.config['DBPort'],
-                user=self.config['DBUser'],
-                password=self.config['DBPassword'],
-                database=self.config['DataBase'],
-                charset='utf8mb4',
-                use_unicode=True
-            )
-            return True
-        except Error as e:
-            print(f"資料庫連線錯誤: {e}")
-            return False
+        """建立資料庫連線池（先關閉既有的連線池，不留下未關閉的連線）"""
+        with self._pool_lock:
+            self.disconnect()
+            try:
+                self.pool = ConnectionPool(
+                    self._connection_config(),
+                    pool_size=self.config.get('PoolSize', 5),
+                    checkout_timeout=float(self.config.get('PoolTimeout', 10))
+                )
+                return True
+            except Error as e:
+                print(f"資料庫連線錯誤: {e}")
+                return False
     
     def disconnect(self):
-        """中斷資料庫連線"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """中斷資料庫連線（使用中的連線於歸還時中斷）"""
+        with self._pool_lock:
+            if self.pool:
+                self.pool.close()
+                self.pool = None
+    
+    def is_connected(self) -> bool:
+        """檢查連線池是否已建立（已中斷的連線會在取用時自動重連）"""
+        return self.pool is not None
+    
+    def check_connection(self) -> bool:
+        """實際檢查資料庫是否可用"""
+        return bool(self.pool and self.pool.health_check())
+    
+    def get_pool_metrics(self) -> Dict:
+        """取得連線池統計資訊"""
+        return self.pool.get_metrics() if self.pool else {}
+    
+    @contextmanager
+    def _connection(self, fail_fast: bool = False):
+        """
+        從連線池取得連線，離開 with 區塊時自動歸還
+        
+        Args:
+            fail_fast: 重連失敗時立即拋出 ConnectionUnavailable，不等到 PoolTimeout
+        """
+        with self._pool_lock:
+            if not self.pool and not self.connect():
+                raise ConnectionUnavailable("無法連線到資料庫")
+            pool = self.pool
+        
+        with pool.connection(fail_fast=fail_fast) as connection:
+            yield connection
+    
+    def _write_connection(self):
+        """
+        取得寫入用的連線：啟用離線日誌時重連失敗立即改寫日誌，
+        之後維持離線狀態（寫入直接進入日誌），直到重送成功
+        """
+        return self._connection(fail_fast=self.journal is not None)
     
     def load_all_data(self) -> Tuple[bool, str]:
         """載入所有資料到記憶體"""
-        if not self.connection or not self.connection.is_connected():
+        if not self.is_connected():
             if not self.connect():
                 return False, "無法連線到資料庫"
         
         try:
-            # 載入 CmdTools 資料（已移除 remark2 欄位）
-            self.cmd_tools_data = self._load_table_data("CmdTools", [
-                "iSeqNo", "cmd", "example", "remark1", "Classification"
-            ])
-            
-            # 載入 PromptTools 資料
-            self.prompt_tools_data = self._load_table_data("PromptTools", [
-                "iSeqNo", "Prompt", "Prompt_Eng", "Classification"
-            ])
-            
-            # 載入 WinProgram 資料
-            self.win_program_data = self._load_table_data("WinProgram", [
-                "iSeqNo", "remark1", "ProgramPathAndName", "ClickEndRun"
-            ])
-            
-            # 載入 WebSite 資料
-            self.web_site_data = self._load_table_data("WebSite", [
-                "iSeqNo", "Remark", "Classification", "Website", "account", "account_webid", "password", "password_webid"
-            ])
-            
+            self.apply_loaded_data(self.fetch_all_tables())
             return True, "資料載入成功"
             
         except Exception as e:
             return False, f"載入資料時發生錯誤: {e}"
     
-    def _load_table_data(self, table_name: str, columns: List[str]) -> List[Dict]:
-        """載入指定資料表的資料"""
-        if not self.connection:
-            raise Exception("未建立資料庫連線")
+    def fetch_all_tables(self, progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                         parallel: Optional[bool] = None,
+                         rows_callback: Optional[Callable[[str, List[Dict], int], None]] = None) -> Dict[str, List[Dict]]:
+        """
+        讀取所有資料表（不更新本地快取）
+        
+        Args:
+            progress_callback: 每載入完一張資料表後呼叫 (資料表名稱, 已完成數, 總數)
+            parallel: 是否以多條連線並行載入，預設依設定檔 ParallelLoad（預設啟用）
+            rows_callback: 每讀取一批記錄後呼叫 (資料表名稱, 此批記錄, 已讀取筆數)
+        
+        Returns:
+            {資料表名稱: 資料清單}
+        """
+        if parallel is None:
+            parallel = bool(self.config.get('ParallelLoad', True))
         
+        # 上次讀取失敗或結果未套用時留下的暫存狀態不可沿用到這次的結果
+        self._clear_staged()
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            return self._fetch_all_tables(progress_callback, parallel, rows_callback)
+        except Exception:
+            self._clear_staged()
+            raise
+    
+    def _fetch_all_tables(self, progress_callback: Optional[Callable[[str, int, int], None]], parallel: bool,
+                          rows_callback: Optional[Callable[[str, List[Dict], int], None]]) -> Dict[str, List[Dict]]:
+        """讀取所有資料表並暫存同步狀態與搜尋索引（由 fetch_all_tables 呼叫）"""
+        results = {}
+        timings = {}
+        total = len(TABLE_DEFINITIONS)
+        
+        if parallel:
+            # 每張資料表各自從連線池取得連線並行查詢，總耗時約等於最慢的一張表
+            with ThreadPoolExecutor(max_workers=self._parallel_workers(total)) as executor:
+                futures = {
+                    executor.submit(self._load_table_timed, table_name, definition['columns'], rows_callback): table_name
+                    for table_name, definition in TABLE_DEFINITIONS.items()
+                }
+                for index, future in enumerate(as_completed(futures), start=1):
+                    table_name = futures[future]
+                    results[table_name], timings[table_name] = future.result()
+                    if progress_callback:
+                        progress_callback(table_name, index, total)
+        else:
+            with self._connection() as connection:
+                for index, (table_name, definition) in enumerate(TABLE_DEFINITIONS.items(), start=1):
+                    start = time.perf_counter()
+                    results[table_name] = self._load_table_data(table_name, definition['columns'], connection,
+                                                                rows_callback)
+                    timings[table_name] = time.perf_counter() - start
+                    if progress_callback:
+                        progress_callback(table_name, index, total)
+        
+        self.last_load_timings = timings
+        
+        # 搜尋索引在讀取資料的執行緒中建立，避免套用資料時阻塞 GUI
+        for table_name, rows in results.items():
+            index = self._new_search_index(table_name)
+            index.build(rows)
+            self._staged_search_indexes[table_name] = index
+        
+        return results
+    
+    def _clear_staged(self):
+        """清除已讀取但尚未套用的同步狀態、搜尋索引與伺服器端資料表"""
+        self._staged_sync_state.clear()
+        self._staged_search_indexes.clear()
+        self._staged_server_side.clear()
+    
+    def _parallel_workers(self, total: int) -> int:
+        """
+        並行查詢的執行緒數：不超過連線池大小，並保留一條連線給搜尋與使用者寫入
+        （執行緒多於連線時，等待中的執行緒會因 PoolTimeout 逾時而使整個載入失敗）
+        """
+        pool_size = self.pool.pool_size if self.pool else total
+        return max(1, min(total, pool_size - 1))
+    
+    def _load_table_timed(self, table_name: str, columns: List[str],
+                          rows_callback: Optional[Callable[[str, List[Dict], int], None]] = None
+                          ) -> Tuple[List[Dict], float]:
+        """以連線池中的獨立連線載入單一資料表，回傳 (資料, 耗時秒數)"""
+        start = time.perf_counter()
+        rows = self._load_table_data(table_name, columns, rows_callback=rows_callback)
+        return rows, time.perf_counter() - start
+    
+    def get_load_timings(self) -> Dict[str, float]:
+        """取得最近一次載入各資料表的耗時（秒）"""
+        return dict(self.last_load_timings)
+    
+    def apply_loaded_data(self, results: Dict[str, List[Dict]]):
+        """將讀取結果寫入本地快取"""
+        with self.cache_lock:
+            for table_name, rows in results.items():
+                definition = TABLE_DEFINITIONS.get(table_name)
+                if definition:
+                    store = self.get_store(table_name)
+                    store.reset(rows)
+                    self.secrets_pending.discard(table_name)
+                    
+                    row_count = self._staged_server_side.pop(table_name, None)
+                    if row_count is None:
+                        self.server_side_tables.pop(table_name, None)
+                    else:
+                        self.server_side_tables[table_name] = row_count
+                    
+                    index = self._staged_search_indexes.pop(table_name, None)
+                    if index is None:
+                        index = self._new_search_index(table_name)
+                        index.build(store)
+                    self.search_indexes[table_name] = index
+                    
+                    # 同步狀態需與快取內容一致
+                    state = self._staged_sync_state.pop(table_name, None)
+                    if state is not None:
+                        self.sync_state[table_name] = state
+                    else:
+                        self.sync_state.pop(table_name, None)
+            # 不在這次結果中的暫存狀態已無對應的資料
+            self._clear_staged()
+            # 尚未重送的離線變更仍顯示在快取中
+            self._overlay_journal(results)
+            self.data_version += 1
+    
+    def _new_store(self, table_name: str) -> RecordStore:
+        """建立資料表快取（設定 CompactCache 時以精簡記錄保存）"""
+        record_class = None
+        if self.config.get('CompactCache', False):
+            record_class = make_record_class(table_name, TABLE_DEFINITIONS[table_name]['columns'])
+        return RecordStore(record_class=record_class)
+    
+    def _new_search_index(self, table_name: str) -> SearchIndex:
+        """建立資料表的搜尋索引（可搜尋欄位為主鍵以外的所有欄位）"""
+        return SearchIndex(TABLE_DEFINITIONS[table_name]['columns'][1:],
+                           inverted=bool(self.config.get('SearchIndex', True)))
+    
+    def get_store(self, table_name: str) -> RecordStore:
+        """取得指定資料表的本地快取"""
+        return getattr(self, TABLE_DEFINITIONS[table_name]['attr'])
+    
+    def memory_report(self) -> Dict[str, Dict]:
+        """取得各資料表快取的記憶體用量估算"""
+        report = {}
+        for table_name in TABLE_DEFINITIONS:
+            store = self.get_store(table_name)
+            report[table_name] = {
+                'records': len(store),
+                'bytes': store.memory_usage(),
+                'compact': store.record_class is not None,
+            }
+        return report
+    
+    # 本機快照
+    
+    def _snapshot_identity(self) -> str:
+        """快照對應的資料庫（主機、連接埠與資料庫名稱）"""
+        return f"{self.config.get('DBServer')}:{self.config.get('DBPort')}/{self.config.get('DataBase')}"
+    
+    def load_snapshot(self) -> Tuple[bool, str]:
+        """
+        載入本機快照到本地快取（快照中的同步狀態一併還原，之後可直接增量同步）
+        
+        伺服器端查詢的資料表只還原校驗碼與記錄數；沒有同步狀態的資料表之後需完整重新載入。
+        快照不含機密欄位（如網站密碼），這些資料表的每列雜湊值視為未知，
+        增量同步時會重新讀取完整記錄，在此之前不允許更新。
+        """
+        if self.snapshot is None:
+            return False, "未啟用本機快照"
+        
+        try:
+            tables, saved_at = self.snapshot.load(self._snapshot_identity())
+        except SnapshotError as e:
+            return False, str(e)
+        
+        self._clear_staged()
+        incremental = self.config.get('IncrementalSync', True)
+        threshold = int(self.config.get('ServerSideThreshold', 0))
+        results = {}
+        secret_tables = set()
+        for table_name, (records, state) in tables.items():
+            if table_name not in TABLE_DEFINITIONS:
+                continue
+            if state is not None and state.get('server_side'):
+                # 門檻已調整或未啟用增量同步時，伺服器端資料表改由完整載入重新判定
+                if incremental and 0 < threshold < state['row_count']:
+                    self._staged_server_side[table_name] = state['row_count']
+                    self._staged_sync_state[table_name] = {'checksum': state['checksum'], 'server_side': True}
+                    results[table_name] = []
+                continue
+            
+            secret_columns = TABLE_DEFINITIONS[table_name].get('secret_columns', [])
+            if secret_columns:
+                for record in records:
+                    for field in secret_columns:
+                        record.setdefault(field, '')
+                if state is not None:
+                    # 本地記錄缺少機密欄位，校驗碼與每列雜湊值都不可信，同步時重新讀取每一列
+                    state = dict(state, checksum=None, row_hashes=dict.fromkeys(state['row_hashes']))
+                secret_tables.add(table_name)
+            results[table_name] = records
+            if state is not None and incremental:
+                self._staged_sync_state[table_name] = state
+        self.apply_loaded_data(results)
+        with self.cache_lock:
+            self.secrets_pending.update(secret_tables)
+        self.snapshot_version = self.data_version
+        
+        total = sum(len(records) for records in results.values())
+        return True, f"已載入本機快照（{saved_at[:19].replace('T', ' ')}，共 {total} 筆）"
+    
+    def snapshot_dirty(self) -> bool:
+        """本地快取是否在上次儲存（或載入）快照後有變動"""
+        return self.snapshot is not None and self.snapshot_version != self.data_version
+    
+    def save_snapshot(self) -> Tuple[bool, str]:
+        """
+        將本地快取與同步狀態儲存為本機快照（可在背景執行緒呼叫）
+        
+        在快取鎖內複製記錄與同步狀態，寫入 SQLite 時不阻塞 GUI 執行緒的搜尋與編輯。
+        機密欄位（如網站密碼）不寫入快照；伺服器端資料表只儲存校驗碼與記錄數。
+        """
+        if self.snapshot is None:
+            return False, "未啟用本機快照"
+        
+        with self.cache_lock:
+            version = self.data_version
+            tables = {}
+            for table_name, definition in TABLE_DEFINITIONS.items():
+                state = self.sync_state.get(table_name)
+                if table_name in self.server_side_tables:
+                    # 伺服器端資料表沒有本地快取，只保存同步狀態供下次增量同步
+                    if state is not None:
+                        tables[table_name] = ([], dict(state, row_count=self.server_side_tables[table_name]))
+                    continue
+                if state is not None:
+                    state = dict(state, row_hashes=dict(state['row_hashes']))
+                secret_columns = definition.get('secret_columns', [])
+                records = []
+                for record in self.get_store(table_name):
+                    record = record.copy()
+                    for field in secret_columns:
+                        record.pop(field, None)
+                    records.append(record)
+                tables[table_name] = (records, state)
+        
+        try:
+            total = self.snapshot.save(self._snapshot_identity(), tables)
+        except Exception as e:
+            return False, f"儲存本機快照時發生錯誤: {e}"
+        
+        self.snapshot_version = version
+        return True, f"已儲存本機快照（共 {total} 筆）"
+    
+    def _load_table_data(self, table_name: str, columns: List[str], connection=None,
+                         rows_callback: Optional[Callable[[str, List[Dict], int], None]] = None) -> List[Dict]:
+        """
+        載入指定資料表的資料（未指定連線時自連線池取得）
+        
+        以非緩衝游標每次讀取 LoadBatchSize 筆，逐批轉換後加入結果並呼叫 rows_callback，
+        不會先將整張資料表的原始結果讀入記憶體再轉換；啟用 CompactCache 時逐批轉為精簡記錄。
+        """
+        if connection is None:
+            with self._connection() as pooled_connection:
+                return self._load_table_data(table_name, columns, pooled_connection, rows_callback)
+        
+        try:
+            # 同時記錄增量同步所需的資料表校驗碼與每列雜湊值
+            track_changes = bool(self.config.get('IncrementalSync', True))
+            checksum = self._table_checksum(connection, table_name) if track_changes else None
+            
+            # 記錄數超過門檻的資料表不載入，之後以伺服器端查詢分頁讀取
+            threshold = int(self.config.get('ServerSideThreshold', 0))
+            if threshold > 0:
+                row_count = self._table_row_count(connection, table_name)
+                if row_count > threshold:
+                    self._staged_server_side[table_name] = row_count
+                    if track_changes:
+                        self._staged_sync_state[table_name] = {'checksum': checksum, 'server_side': True}
+                    return []
+            
+            cursor = connection.cursor(dictionary=True, buffered=False)
             
             # 構建查詢 SQL
             columns_str = ", ".join(columns)
+            if track_changes:
+                columns_str += f", {self._row_hash_expression(table_name)} AS _row_hash"
             query = f"SELECT {columns_str} FROM {table_name} ORDER BY iSeqNo"
             
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            # 轉換 None 值為空字串
-            for row in results:
-                for key, value in row.items():
-                    if value is None:
-                        row[key] = ""
-            
+            record_class = self.get_store(table_name).record_class
+            results = []
+            row_hashes = {}
+            try:
+                cursor.execute(query)
+                for batch in self._iter_row_batches(cursor):
+                    if track_changes:
+                        for row in batch:
+                            row_hashes[row['iSeqNo']] = row.pop('_row_hash')
+                    if record_class is not None:
+                        batch = [record_class.from_dict(row) for row in batch]
+                    
+                    results.extend(batch)
+                    if rows_callback:
+                        rows_callback(table_name, batch, len(results))
+            except Exception:
+                self._abandon_cursor(connection, cursor)
+                raise
             cursor.close()
+            
+            if track_changes:
+                self._staged_sync_state[table_name] = {
+                    'checksum': checksum,
+                    'max_seq': max(row_hashes, default=0),
+                    'row_hashes': row_hashes,
+                }
             return results
             
         except Exception as e:
             raise Exception(f"載入 {table_name} 資料時發生錯誤: {e}")
     
-    # CmdTools CRUD 操作
+    @staticmethod
+    def _abandon_cursor(connection, cursor):
+        """
+        讀取中途失敗時關閉非緩衝游標：先捨棄尚未讀取的結果，無法捨棄時中斷連線
+        （連線歸還後不會殘留未讀取的結果，下次取用時自動重新連線）
+        """
+        try:
+            connection.consume_results()
+            cursor.close()
+        except Exception:
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
     
-    def add_cmd_tool(self, data: Dict) -> Tuple[bool, str]:
-        """新增命令工具記錄"""
+    def _iter_row_batches(self, cursor):
+        """自已執行查詢的（非緩衝）游標逐批讀取記錄，並將 None 值轉為空字串"""
+        batch_size = int(self.config.get('LoadBatchSize', LOAD_BATCH_SIZE)) or LOAD_BATCH_SIZE
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                for key, value in row.items():
+                    if value is None:
+                        row[key] = ""
+            yield batch
+    
+    # 增量同步（只讀取新增、修改、刪除的記錄）
+    
+    def _row_hash_expression(self, table_name: str) -> str:
+        """產生計算單列雜湊值的 SQL 運算式"""
+        fields = TABLE_DEFINITIONS[table_name]['columns'][1:]
+        parts = ", ".join(f"IFNULL({field}, '')" for field in fields)
+        return f"MD5(CONCAT_WS(CHAR(31), {parts}))"
+    
+    def _table_checksum(self, connection, table_name: str) -> Optional[int]:
+        """取得資料表校驗碼（CHECKSUM TABLE），資料未變動時校驗碼不變"""
+        cursor = connection.cursor()
+        cursor.execute(f"CHECKSUM TABLE {table_name}")
+        row = cursor.fetchone()
+        cursor.close()
+        return row[1] if row else None
+    
+    def _table_row_count(self, connection, table_name: str) -> int:
+        """取得資料表記錄數"""
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[0]) if row else 0
+    
+    def _fetch_rows_where(self, connection, table_name: str, condition: str, params: tuple) -> List[Dict]:
+        """依條件讀取指定資料表的完整記錄"""
+        columns_str = ", ".join(TABLE_DEFINITIONS[table_name]['columns'])
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"SELECT {columns_str} FROM {table_name} WHERE {condition} ORDER BY iSeqNo", params)
+        rows = cursor.fetchall()
+        cursor.close()
+        
+        for row in rows:
+            for key, value in row.items():
+                if value is None:
+                    row[key] = ""
+        return rows
+    
+    def can_sync_incrementally(self) -> bool:
+        """是否所有資料表都已有同步狀態（可進行增量同步）"""
+        return all(table_name in self.sync_state for table_name in TABLE_DEFINITIONS)
+    
+    def fetch_all_deltas(self, progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Dict]:
+        """
+        讀取所有資料表自上次載入後的變動（不更新本地快取）
+        
+        Returns:
+            {資料表名稱: {'inserted': [...], 'updated': [...], 'deleted': [iSeqNo...], ...}}
+        """
+        deltas = {}
+        total = len(TABLE_DEFINITIONS)
+        parallel = bool(self.config.get('ParallelLoad', True))
+        
+        with ThreadPoolExecutor(max_workers=self._parallel_workers(total) if parallel else 1) as executor:
+            futures = {executor.submit(self._fetch_table_delta, table_name): table_name
+                       for table_name in TABLE_DEFINITIONS}
+            for index, future in enumerate(as_completed(futures), start=1):
+                table_name = futures[future]
+                deltas[table_name] = future.result()
+                if progress_callback:
+                    progress_callback(table_name, index, total)
+        
+        return deltas
+    
+    def _fetch_table_delta(self, table_name: str) -> Dict:
+        """比對校驗碼與每列雜湊值，只讀取有變動的記錄"""
+        state = self.sync_state[table_name]
+        delta = {'inserted': [], 'updated': [], 'deleted': [], 'checksum': None, 'row_hashes': None}
+        
         try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                INSERT INTO CmdTools (cmd, example, remark1, Classification)
-                VALUES (%s, %s, %s, %s)
-            """
-            values = (
-                data.get('cmd', ''),
-                data.get('example', ''),
-                data.get('remark1', ''),
-                data.get('Classification', '')
-            )
+            with self._connection() as connection:
+                delta['checksum'] = self._table_checksum(connection, table_name)
+                if delta['checksum'] is not None and delta['checksum'] == state['checksum']:
+                    return delta  # 資料表未變動
+                
+                if state.get('server_side'):
+                    # 伺服器端資料表沒有本地快取，只需通知畫面重新查詢
+                    delta['refresh'] = True
+                    delta['row_count'] = self._table_row_count(connection, table_name)
+                    return delta
+                
+                cursor = connection.cursor()
+                cursor.execute(f"SELECT iSeqNo, {self._row_hash_expression(table_name)} FROM {table_name}")
+                server_hashes = dict(cursor.fetchall())
+                cursor.close()
+                
+                local_hashes = state['row_hashes']
+                delta['deleted'] = [seq_no for seq_no in local_hashes if seq_no not in server_hashes]
+                changed = [seq_no for seq_no, row_hash in server_hashes.items()
+                           if seq_no <= state['max_seq'] and local_hashes.get(seq_no) != row_hash]
+                
+                # 高水位以上為新增記錄，其餘只讀取雜湊值不同的記錄
+                rows = self._fetch_rows_where(connection, table_name, "iSeqNo > %s", (state['max_seq'],))
+                for start in range(0, len(changed), 1000):
+                    chunk = changed[start:start + 1000]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    rows.extend(self._fetch_rows_where(
+                        connection, table_name, f"iSeqNo IN ({placeholders})", tuple(chunk)))
+                
+                for row in rows:
+                    if row['iSeqNo'] in local_hashes:
+                        delta['updated'].append(row)
+                    else:
+                        delta['inserted'].append(row)
+                delta['row_hashes'] = server_hashes
+                
+            return delta
             
-            cursor.execute(sql, values)
-            self.connection.commit()
+        except Exception as e:
+            raise Exception(f"同步 {table_name} 資料時發生錯誤: {e}")
+    
+    def apply_deltas(self, deltas: Dict[str, Dict]) -> Dict[str, List[int]]:
+        """
+        將增量變動套用到本地快取
+        
+        Returns:
+            {資料表名稱: 有變動的 iSeqNo 清單}（未變動的資料表不列出；
+            有變動的伺服器端資料表為空清單，表示需重新查詢）
+        """
+        changed_tables = {}
+        
+        for table_name, delta in deltas.items():
+            self._apply_table_delta(table_name, delta, changed_tables)
+        
+        return changed_tables
+    
+    def _apply_table_delta(self, table_name: str, delta: Dict, changed_tables: Dict[str, List[int]]):
+        """套用單一資料表的變動（同步狀態與快取在同一次鎖定中更新，快照不會讀到不一致的狀態）"""
+        with self.cache_lock:
+            state = self.sync_state.get(table_name)
+            if state is not None:
+                state['checksum'] = delta['checksum']
+                if delta['row_hashes'] is not None:
+                    state['row_hashes'] = delta['row_hashes']
+                    state['max_seq'] = max(delta['row_hashes'], default=state['max_seq'])
+                    # 雜湊值不同的記錄都已重新讀取，機密欄位已補齊
+                    self.secrets_pending.discard(table_name)
+            
+            if delta.get('refresh'):
+                self.server_side_tables[table_name] = delta['row_count']
+                self.data_version += 1
+                changed_tables[table_name] = []
+                return
+            
+            changed_rows = delta['updated'] + delta['inserted']
+            if not changed_rows and not delta['deleted']:
+                return
+            
+            store = self.get_store(table_name)
+            store.remove_many(delta['deleted'])
+            # 以 upsert 方式套用，避免重複加入已存在的記錄
+            store.upsert_many(changed_rows)
+            
+            index = self.search_indexes[table_name]
+            for seq_no in delta['deleted']:
+                index.remove(seq_no)
+            for row in changed_rows:
+                index.add(store.get(row['iSeqNo']))
+            self.data_version += 1
+        
+        changed_tables[table_name] = [row['iSeqNo'] for row in changed_rows] + list(delta['deleted'])
+    
+    # 本地快取與搜尋索引維護
+    
+    def _cache_add(self, table_name: str, record: Dict):
+        """將新記錄加入快取與搜尋索引"""
+        self._cache_add_many(table_name, [record])
+    
+    def _cache_update(self, table_name: str, seq_no: int, values: Dict):
+        """更新快取中的記錄並重建其搜尋字串"""
+        self._cache_update_many(table_name, [(seq_no, values)])
+    
+    def _cache_remove(self, table_name: str, seq_no: int):
+        """自快取與搜尋索引移除記錄"""
+        self._cache_remove_many(table_name, [seq_no])
+    
+    def _cache_add_many(self, table_name: str, records: List[Dict]):
+        """將多筆新記錄加入快取與搜尋索引（一次鎖定，資料版本只遞增一次）"""
+        with self.cache_lock:
+            if table_name in self.server_side_tables:
+                self.server_side_tables[table_name] += len(records)
+                self.data_version += 1
+                return
+            store = self.get_store(table_name)
+            index = self.search_indexes[table_name]
+            for record in records:
+                store.add(record)
+                index.add(store.get(record['iSeqNo']))
+            self.data_version += 1
+    
+    def _cache_update_many(self, table_name: str, changes: List[Tuple[int, Dict]]):
+        """更新快取中的多筆記錄並重建其搜尋字串"""
+        with self.cache_lock:
+            if table_name not in self.server_side_tables:
+                store = self.get_store(table_name)
+                index = self.search_indexes[table_name]
+                for seq_no, values in changes:
+                    if store.update(seq_no, values):
+                        index.add(store.get(seq_no))
+            self.data_version += 1
+    
+    def _cache_remove_many(self, table_name: str, seq_nos: List[int]):
+        """自快取與搜尋索引移除多筆記錄"""
+        with self.cache_lock:
+            if table_name in self.server_side_tables:
+                self.server_side_tables[table_name] = max(0, self.server_side_tables[table_name] - len(seq_nos))
+                self.data_version += 1
+                return
+            self.get_store(table_name).remove_many(seq_nos)
+            index = self.search_indexes[table_name]
+            for seq_no in seq_nos:
+                index.remove(seq_no)
+            self.data_version += 1
+    
+    def search_records(self, table_name: str, keyword: str) -> List[Dict]:
+        """
+        全域搜尋：找出任一可搜尋欄位包含關鍵字的記錄（不分大小寫）
+        
+        Args:
+            table_name: 資料表名稱
+            keyword: 搜尋關鍵字
+        
+        Returns:
+            依序號排序的符合記錄（伺服器端資料表只回傳第一頁）
+        """
+        if self.is_server_side(table_name):
+            return self.query_records(table_name, keyword)
+        with self.cache_lock:
+            store = self.get_store(table_name)
+            if not keyword:
+                return store.to_list()
+            return self.search_indexes[table_name].search(keyword, store)
+    
+    def filter_records(self, table_name: str, filters: Dict[str, str],
+                       records: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        單一欄位篩選（比對預先正規化的搜尋字串）
+        
+        Args:
+            table_name: 資料表名稱
+            filters: {欄位名稱: 關鍵字}，所有非空條件皆須符合
+            records: 要篩選的記錄（預設為整張資料表；伺服器端資料表查詢資料庫並只回傳第一頁）
+        """
+        if records is None and self.is_server_side(table_name):
+            return self.query_records(table_name, filters=filters)
+        with self.cache_lock:
+            if records is None:
+                records = self.get_store(table_name)
+            return self.search_indexes[table_name].filter(filters, records)
+    
+    # 伺服器端查詢（資料表過大時不使用本地快取）
+    
+    def is_server_side(self, table_name: str) -> bool:
+        """資料表是否以伺服器端查詢模式存取"""
+        return table_name in self.server_side_tables
+    
+    def get_total_count(self, table_name: str) -> int:
+        """取得資料表的記錄總數（伺服器端資料表為載入或同步時的記錄數）"""
+        if self.is_server_side(table_name):
+            return self.server_side_tables[table_name]
+        return len(self.get_store(table_name))
+    
+    def query_records(self, table_name: str, keyword: str = "", filters: Optional[Dict[str, str]] = None,
+                      after_seq_no: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """
+        以參數化 SQL 查詢一頁記錄（依 iSeqNo 排序）
+        
+        以 iSeqNo > after_seq_no 取得下一頁（keyset 分頁），
+        不使用 OFFSET，越後面的頁面也不必讓資料庫略過前面的記錄。
+        
+        Args:
+            table_name: 資料表名稱
+            keyword: 全域搜尋關鍵字（任一可搜尋欄位包含即符合）
+            filters: {欄位名稱: 關鍵字} 單一欄位篩選
+            after_seq_no: 上一頁最後一筆的序號（第一頁為 0）
+            limit: 每頁筆數（預設為 ServerSidePageSize）
+        """
+        with self._connection() as connection:
+            conditions, params = self._query_conditions(connection, table_name, keyword, filters)
+            conditions.insert(0, "iSeqNo > %s")
+            params.insert(0, after_seq_no)
+            params.append(limit or self.page_size)
+            columns_str = ", ".join(TABLE_DEFINITIONS[table_name]['columns'])
+            
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"SELECT {columns_str} FROM {table_name} WHERE {' AND '.join(conditions)} "
+                           f"ORDER BY iSeqNo LIMIT %s", tuple(params))
+            rows = cursor.fetchall()
+            cursor.close()
+        
+        for row in rows:
+            for key, value in row.items():
+                if value is None:
+                    row[key] = ""
+        return rows
+    
+    def iter_server_records(self, table_name: str):
+        """逐頁讀取伺服器端資料表的所有記錄（匯出用）"""
+        after_seq_no = 0
+        while True:
+            rows = self.query_records(table_name, after_seq_no=after_seq_no)
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            after_seq_no = rows[-1]['iSeqNo']
+    
+    def get_all_records(self, table_name: str) -> List[Dict]:
+        """取得資料表的所有記錄（伺服器端資料表自資料庫分頁讀取）"""
+        if self.is_server_side(table_name):
+            return list(self.iter_server_records(table_name))
+        return self.get_store(table_name).to_list()
+    
+    def _query_conditions(self, connection, table_name: str, keyword: str,
+                          filters: Optional[Dict[str, str]]) -> Tuple[List[str], List]:
+        """將全域搜尋與單一欄位篩選轉為 WHERE 條件與參數"""
+        columns = TABLE_DEFINITIONS[table_name]['columns']
+        conditions, params = [], []
+        
+        if keyword:
+            fields = columns[1:]
+            parts = []
+            fulltext_fields = self._get_fulltext_columns(connection, table_name)
+            if fulltext_fields and len(keyword.strip()) >= FULLTEXT_MIN_LENGTH:
+                # 以片語方式比對（ngram 解析器會將中日韓文字切成二元組）
+                parts.append(f"MATCH({', '.join(fulltext_fields)}) AGAINST (%s IN BOOLEAN MODE)")
+                params.append('"' + keyword.replace('"', ' ').strip() + '"')
+                fields = [field for field in fields if field not in fulltext_fields]
+            for field in fields:
+                parts.append(f"{field} LIKE %s")
+                params.append(like_pattern(keyword))
+            conditions.append("(" + " OR ".join(parts) + ")")
+        
+        for field, value in (filters or {}).items():
+            # 欄位名稱直接組入 SQL，只接受資料表定義中的欄位
+            if value.strip() and field in columns:
+                conditions.append(f"{field} LIKE %s")
+                params.append(like_pattern(value))
+        
+        return conditions, params
+    
+    def _get_fulltext_columns(self, connection, table_name: str) -> List[str]:
+        """
+        取得可用於全域搜尋的 FULLTEXT 索引欄位（結果會快取）
+        
+        只使用涵蓋資料表所有可搜尋欄位中最多欄位的索引；
+        設定 FullTextSearch 為 false 或查無索引時回傳空清單，改以 LIKE 查詢。
+        """
+        if table_name in self._fulltext_columns:
+            return self._fulltext_columns[table_name]
+        
+        columns = []
+        if self.config.get('FullTextSearch', True):
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT' "
+                "ORDER BY INDEX_NAME, SEQ_IN_INDEX", (table_name,))
+            indexes = {}
+            for index_name, column_name in cursor.fetchall():
+                indexes.setdefault(index_name, []).append(column_name)
+            cursor.close()
             
-            # 獲取新插入的序號
-            new_id = cursor.lastrowid
+            # MATCH() 的欄位必須與某個 FULLTEXT 索引完全相同
+            searchable = set(TABLE_DEFINITIONS[table_name]['columns'][1:])
+            for index_columns in indexes.values():
+                if set(index_columns) <= searchable and len(index_columns) > len(columns):
+                    columns = index_columns
+        
+        self._fulltext_columns[table_name] = columns
+        return columns
+    
+    # 通用 CRUD 操作（依 TABLE_DEFINITIONS 產生 SQL 並同步本地快取）
+    
+    def _record_values(self, table_name: str, data: Dict) -> Dict:
+        """依資料表定義取出可寫入欄位的值（缺少的欄位使用預設值）"""
+        definition = TABLE_DEFINITIONS[table_name]
+        defaults = definition.get('defaults', {})
+        return {field: data.get(field, defaults.get(field, '')) for field in definition['columns'][1:]}
+    
+    def _secrets_pending_message(self, table_name: str) -> str:
+        """從快照載入的記錄缺少機密欄位時，拒絕更新的說明（避免以空值覆寫資料庫中的密碼）"""
+        definition = TABLE_DEFINITIONS[table_name]
+        return (f"{definition['label']}的機密欄位（{'、'.join(definition['secret_columns'])}）"
+                f"尚未自資料庫載入，請於同步完成後再更新")
+    
+    def _insert_sql(self, table_name: str) -> str:
+        """產生新增記錄的 INSERT 語句（欄位順序與 _record_values 相同）"""
+        fields = TABLE_DEFINITIONS[table_name]['columns'][1:]
+        return (f"INSERT INTO {table_name} ({', '.join(fields)}) "
+                f"VALUES ({', '.join(['%s'] * len(fields))})")
+    
+    def _insert_record(self, table_name: str, data: Dict) -> Tuple[bool, str]:
+        """新增單筆記錄（離線時改寫入日誌）"""
+        definition = TABLE_DEFINITIONS[table_name]
+        label = definition['label']
+        values = self._record_values(table_name, data)
+        if self._should_journal():
+            return self._journal_write('insert', table_name, None, values)
+        committing = False
+        try:
+            sql = self._insert_sql(table_name)
+            
+            with self._write_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(sql, tuple(values.values()))
+                committing = True
+                connection.commit()
+                
+                # 獲取新插入的序號
+                new_id = cursor.lastrowid
+                cursor.close()
             
             # 更新本地快取
-            new_record = {
-                'iSeqNo': new_id,
-                'cmd': data.get('cmd', ''),
-                'example': data.get('example', ''),
-                'remark1': data.get('remark1', ''),
-                'Classification': data.get('Classification', '')
-            }
-            self.cmd_tools_data.append(new_record)
+            new_record = {'iSeqNo': new_id}
+            new_record.update(values)
+            self._cache_add(table_name, new_record)
             
-            cursor.close()
-            return True, "命令工具新增成功"
+            return True, f"{label}新增成功"
             
         except Exception as e:
-            return False, f"新增命令工具失敗: {e}"
+            if committing and is_connection_error(e):
+                return False, self._commit_unknown_message(f"新增{label}")
+            if self._can_journal(e):
+                return self._journal_write('insert', table_name, None, values)
+            return False, f"新增{label}失敗: {e}"
     
-    def update_cmd_tool(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
-        """更新命令工具記錄"""
+    def _update_record(self, table_name: str, seq_no: int, data: Dict) -> Tuple[bool, str]:
+        """更新單筆記錄（離線時改寫入日誌）"""
+        definition = TABLE_DEFINITIONS[table_name]
+        label = definition['label']
+        seq_no = self.seq_aliases.get(seq_no, seq_no)
+        if table_name in self.secrets_pending:
+            return False, self._secrets_pending_message(table_name)
+        values = self._record_values(table_name, data)
+        if self._should_journal():
+            return self._journal_write('update', table_name, seq_no, values)
         try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                UPDATE CmdTools SET cmd=%s, example=%s, remark1=%s, Classification=%s
-                WHERE iSeqNo=%s
-            """
-            values = (
-                data.get('cmd', ''),
-                data.get('example', ''),
-                data.get('remark1', ''),
-                data.get('Classification', ''),
-                seq_no
-            )
+            assignments = ", ".join(f"{field}=%s" for field in values)
+            sql = f"UPDATE {table_name} SET {assignments} WHERE iSeqNo=%s"
             
-            cursor.execute(sql, values)
-            self.connection.commit()
-            cursor.close()
+            with self._write_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(sql, tuple(values.values()) + (seq_no,))
+                connection.commit()
+                cursor.close()
             
             # 更新本地快取
-            for record in self.cmd_tools_data:
-                if record['iSeqNo'] == seq_no:
-                    record.update({
-                        'cmd': data.get('cmd', ''),
-                        'example': data.get('example', ''),
-                        'remark1': data.get('remark1', ''),
-                        'Classification': data.get('Classification', '')
-                    })
-                    break
-            
-            return True, "命令工具更新成功"
+            self._cache_update(table_name, seq_no, values)
+            
+            return True, f"{label}更新成功"
             
         except Exception as e:
-            return False, f"更新命令工具失敗: {e}"
+            if self._can_journal(e):
+                return self._journal_write('update', table_name, seq_no, values)
+            return False, f"更新{label}失敗: {e}"
     
-    def delete_cmd_tool(self, seq_no: int) -> Tuple[bool, str]:
-        """刪除命令工具記錄"""
+    def _delete_record(self, table_name: str, seq_no: int) -> Tuple[bool, str]:
+        """刪除單筆記錄（離線時改寫入日誌）"""
+        definition = TABLE_DEFINITIONS[table_name]
+        label = definition['label']
+        seq_no = self.seq_aliases.get(seq_no, seq_no)
+        if self._should_journal():
+            return self._journal_write('delete', table_name, seq_no)
         try:
-            cursor = self.connection.cursor()
-            
-            sql = "DELETE FROM CmdTools WHERE iSeqNo = %s"
-            cursor.execute(sql, (seq_no,))
-            
-            if cursor.rowcount == 0:
+            with self._write_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"DELETE FROM {table_name} WHERE iSeqNo = %s", (seq_no,))
+                
+                if cursor.rowcount == 0:
+                    cursor.close()
+                    return False, f"找不到序號 {seq_no} 的記錄"
+                
+                connection.commit()
                 cursor.close()
-                return False, f"找不到序號 {seq_no} 的記錄"
-            
-            self.connection.commit()
-            cursor.close()
             
             # 更新本地快取
-            self.cmd_tools_data = [record for record in self.cmd_tools_data 
-                                 if record['iSeqNo'] != seq_no]
+            self._cache_remove(table_name, seq_no)
             
-            return True, "命令工具刪除成功"
+            return True, f"{label}刪除成功"
             
         except Exception as e:
-            return False, f"刪除命令工具失敗: {e}"
+            if self._can_journal(e):
+                return self._journal_write('delete', table_name, seq_no)
+            return False, f"刪除{label}失敗: {e}"
     
-    # PromptTools CRUD 操作
+    # 批次 CRUD 操作（整批在單一交易中寫入，本地快取一次更新）
     
-    def add_prompt_tool(self, data: Dict) -> Tuple[bool, str]:
-        """新增提示工具記錄"""
+    def _write_batch_size(self) -> int:
+        """批次寫入時每個 executemany 的筆數"""
+        return int(self.config.get('BatchWriteSize', BATCH_WRITE_SIZE)) or BATCH_WRITE_SIZE
+    
+    def add_many(self, table_name: str, rows: List[Dict]) -> Tuple[bool, str]:
+        """
+        批次新增記錄（單一交易，離線時改寫入日誌）
+        
+        mysql.connector 會將 executemany 的 INSERT 改寫為多列 VALUES，lastrowid 為該批第一筆的序號；
+        其餘序號依 auto_increment_increment 推算後讀回比對，
+        序號不連續時（例如其他連線同時新增）整批改為在同一交易中逐筆新增。
+        
+        Args:
+            table_name: 資料表名稱
+            rows: 要新增的記錄（缺少的欄位使用預設值）
+        """
+        label = TABLE_DEFINITIONS[table_name]['label']
+        values_list = [self._record_values(table_name, row) for row in rows]
+        if not values_list:
+            return False, f"沒有要新增的{label}"
+        if self._should_journal():
+            return self._journal_writes('insert', table_name, [(None, values) for values in values_list])
+        committing = False
         try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                INSERT INTO PromptTools (Prompt, Prompt_Eng, Classification) 
-                VALUES (%s, %s, %s)
-            """
-            values = (
-                data.get('Prompt', ''),
-                data.get('Prompt_Eng', ''),
-                data.get('Classification', '')
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            
-            # 獲取新插入的序號
-            new_id = cursor.lastrowid
-            
-            # 更新本地快取
-            new_record = {
-                'iSeqNo': new_id,
-                'Prompt': data.get('Prompt', ''),
-                'Prompt_Eng': data.get('Prompt_Eng', ''),
-                'Classification': data.get('Classification', '')
-            }
-            self.prompt_tools_data.append(new_record)
-            
-            cursor.close()
-            return True, "提示工具新增成功"
+            with self._write_connection() as connection:
+                connection.start_transaction()
+                try:
+                    cursor = connection.cursor()
+                    seq_nos = self._insert_consecutive(cursor, table_name, values_list)
+                    if seq_nos is None:
+                        connection.rollback()
+                        connection.start_transaction()
+                        sql = self._insert_sql(table_name)
+                        seq_nos = []
+                        for values in values_list:
+                            cursor.execute(sql, tuple(values.values()))
+                            seq_nos.append(cursor.lastrowid)
+                    cursor.close()
+                    committing = True
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            
+            self._cache_add_many(table_name, [dict(values, iSeqNo=seq_no)
+                                              for seq_no, values in zip(seq_nos, values_list)])
+            return True, f"已新增 {len(seq_nos)} 筆{label}"
             
         except Exception as e:
-            return False, f"新增提示工具失敗: {e}"
+            if committing and is_connection_error(e):
+                return False, self._commit_unknown_message(f"批次新增{label}")
+            if self._can_journal(e):
+                return self._journal_writes('insert', table_name, [(None, values) for values in values_list])
+            return False, f"批次新增{label}失敗: {e}"
     
-    def update_prompt_tool(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
-        """更新提示工具記錄"""
+    def _insert_consecutive(self, cursor, table_name: str, values_list: List[Dict]) -> Optional[List[int]]:
+        """
+        以 executemany 分批新增並推算各筆序號
+        
+        Returns:
+            各筆記錄的序號；推算的序號與讀回的內容不符時回傳 None（呼叫端需回復交易）
+        """
+        cursor.execute("SELECT @@auto_increment_increment")
+        step = int(cursor.fetchone()[0])
+        columns = TABLE_DEFINITIONS[table_name]['columns']
+        sql = self._insert_sql(table_name)
+        batch_size = self._write_batch_size()
+        
+        seq_nos = []
+        for start in range(0, len(values_list), batch_size):
+            chunk = values_list[start:start + batch_size]
+            cursor.executemany(sql, [tuple(values.values()) for values in chunk])
+            chunk_seq_nos = [cursor.lastrowid + i * step for i in range(len(chunk))]
+            
+            placeholders = ", ".join(["%s"] * len(chunk_seq_nos))
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} WHERE iSeqNo IN ({placeholders})",
+                           tuple(chunk_seq_nos))
+            server_rows = {row[0]: row[1:] for row in cursor.fetchall()}
+            for seq_no, values in zip(chunk_seq_nos, chunk):
+                row = server_rows.get(seq_no)
+                if row is None or any(str(value if value is not None else '') != str(expected)
+                                      for value, expected in zip(row, values.values())):
+                    return None
+            seq_nos.extend(chunk_seq_nos)
+        return seq_nos
+    
+    def update_many(self, table_name: str, changes: Dict[int, Dict]) -> Tuple[bool, str]:
+        """
+        批次更新記錄（單一交易，以 executemany 寫入；離線時改寫入日誌）
+        
+        Args:
+            table_name: 資料表名稱
+            changes: {序號: 要更新的欄位值}；未提供的欄位沿用快取中的值，
+                不在本地快取的記錄（伺服器端資料表）只更新提供的欄位
+        """
+        label = TABLE_DEFINITIONS[table_name]['label']
+        if table_name in self.secrets_pending:
+            return False, self._secrets_pending_message(table_name)
+        items = self._merge_changes(table_name, changes)
+        if not items:
+            return False, f"沒有要更新的{label}"
+        if self._should_journal():
+            return self._journal_writes('update', table_name, items)
         try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                UPDATE PromptTools SET Prompt=%s, Prompt_Eng=%s, Classification=%s 
-                WHERE iSeqNo=%s
-            """
-            values = (
-                data.get('Prompt', ''),
-                data.get('Prompt_Eng', ''),
-                data.get('Classification', ''),
-                seq_no
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            cursor.close()
-            
-            # 更新本地快取
-            for record in self.prompt_tools_data:
-                if record['iSeqNo'] == seq_no:
-                    record.update({
-                        'Prompt': data.get('Prompt', ''),
-                        'Prompt_Eng': data.get('Prompt_Eng', ''),
-                        'Classification': data.get('Classification', '')
-                    })
-                    break
-            
-            return True, "提示工具更新成功"
+            # 依更新的欄位分組，每組一個 UPDATE 語句（一般只有一組）
+            groups = {}
+            for seq_no, values in items:
+                groups.setdefault(tuple(values), []).append((seq_no, values))
+            batch_size = self._write_batch_size()
+            
+            with self._write_connection() as connection:
+                connection.start_transaction()
+                try:
+                    cursor = connection.cursor()
+                    for fields, group in groups.items():
+                        assignments = ", ".join(f"{field}=%s" for field in fields)
+                        sql = f"UPDATE {table_name} SET {assignments} WHERE iSeqNo=%s"
+                        for start in range(0, len(group), batch_size):
+                            cursor.executemany(sql, [tuple(values.values()) + (seq_no,)
+                                                     for seq_no, values in group[start:start + batch_size]])
+                    cursor.close()
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            
+            self._cache_update_many(table_name, items)
+            return True, f"已更新 {len(items)} 筆{label}"
             
         except Exception as e:
-            return False, f"更新提示工具失敗: {e}"
+            if self._can_journal(e):
+                return self._journal_writes('update', table_name, items)
+            return False, f"批次更新{label}失敗: {e}"
     
-    def delete_prompt_tool(self, seq_no: int) -> Tuple[bool, str]:
-        """刪除提示工具記錄"""
+    def _merge_changes(self, table_name: str, changes: Dict[int, Dict]) -> List[Tuple[int, Dict]]:
+        """
+        在快取鎖內將每筆變更與快取中的記錄合併，避免只提供部分欄位時其餘欄位被清空
+        
+        Returns:
+            [(序號, 要寫入的欄位值)]（沒有可寫入欄位的變更不列出）
+        """
+        fields = TABLE_DEFINITIONS[table_name]['columns'][1:]
+        items = []
+        with self.cache_lock:
+            store = None if table_name in self.server_side_tables else self.get_store(table_name)
+            for seq_no, data in changes.items():
+                seq_no = self.seq_aliases.get(seq_no, seq_no)
+                record = store.get(seq_no) if store is not None else None
+                if record is not None:
+                    merged = record.copy()
+                    merged.update(data)
+                    values = self._record_values(table_name, merged)
+                else:
+                    values = {field: data[field] for field in fields if field in data}
+                if values:
+                    items.append((seq_no, values))
+        return items
+    
+    def delete_many(self, table_name: str, seq_nos: Iterable[int]) -> Tuple[bool, str]:
+        """
+        批次刪除記錄（單一交易，以 IN 條件分批刪除；離線時改寫入日誌）
+        
+        Args:
+            table_name: 資料表名稱
+            seq_nos: 要刪除的記錄序號
+        """
+        label = TABLE_DEFINITIONS[table_name]['label']
+        seq_nos = list(dict.fromkeys(self.seq_aliases.get(seq_no, seq_no) for seq_no in seq_nos))
+        if not seq_nos:
+            return False, f"沒有要刪除的{label}"
+        if self._should_journal():
+            return self._journal_writes('delete', table_name, [(seq_no, None) for seq_no in seq_nos])
         try:
-            cursor = self.connection.cursor()
+            batch_size = self._write_batch_size()
+            deleted = 0
+            
+            with self._write_connection() as connection:
+                connection.start_transaction()
+                try:
+                    cursor = connection.cursor()
+                    for start in range(0, len(seq_nos), batch_size):
+                        chunk = seq_nos[start:start + batch_size]
+                        placeholders = ", ".join(["%s"] * len(chunk))
+                        cursor.execute(f"DELETE FROM {table_name} WHERE iSeqNo IN ({placeholders})", tuple(chunk))
+                        deleted += cursor.rowcount
+                    cursor.close()
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            
+            # 資料庫中已不存在的記錄同樣自快取移除
+            self._cache_remove_many(table_name, seq_nos)
+            message = f"已刪除 {deleted} 筆{label}"
+            if deleted < len(seq_nos):
+                message += f"（{len(seq_nos) - deleted} 筆已不存在於資料庫）"
+            return True, message
             
-            sql = "DELETE FROM PromptTools WHERE iSeqNo = %s"
-            cursor.execute(sql, (seq_no,))
+        except Exception as e:
+            if self._can_journal(e):
+                return self._journal_writes('delete', table_name, [(seq_no, None) for seq_no in seq_nos])
+            return False, f"批次刪除{label}失敗: {e}"
+    
+    # 離線寫入日誌
+    
+    def has_pending_writes(self) -> bool:
+        """是否有尚未重送到資料庫的離線變更"""
+        return self.journal is not None and len(self.journal) > 0
+    
+    def pending_write_count(self) -> int:
+        """尚未重送的離線變更筆數"""
+        return len(self.journal) if self.journal is not None else 0
+    
+    def _should_journal(self) -> bool:
+        """寫入是否直接進入日誌（已知離線，或仍有較早的變更未重送，需維持順序）"""
+        return self.journal is not None and (self.offline or len(self.journal) > 0)
+    
+    @staticmethod
+    def _commit_unknown_message(action: str) -> str:
+        """
+        送出 COMMIT 後連線中斷的說明：交易可能已寫入資料庫，
+        新增不可改寫入日誌（重送時會重複新增），請使用者重新整理後確認
+        """
+        return f"{action}時與資料庫的連線中斷，無法確認是否已寫入，請重新整理資料後確認"
+    
+    def _can_journal(self, error: Exception) -> bool:
+        """寫入失敗時是否改寫入日誌（只有無法連線時；新增須在送出 COMMIT 前失敗）"""
+        if self.journal is None or not is_connection_error(error):
+            return False
+        self.offline = True
+        return True
+    
+    def _journal_write(self, op: str, table_name: str, seq_no: Optional[int],
+                       values: Optional[Dict] = None) -> Tuple[bool, str]:
+        """將變更寫入日誌並立即套用到本地快取"""
+        label = TABLE_DEFINITIONS[table_name]['label']
+        action = {'insert': '新增', 'update': '更新', 'delete': '刪除'}[op]
+        if table_name in self.server_side_tables:
+            return False, f"{label}使用伺服器端查詢，無法在離線時{action}"
+        
+        # 背景重送會在 cache_lock 中更新日誌序號與 seq_aliases，
+        # 配置暫時序號到套用快取之間須持有同一把鎖，避免與重送中的序號衝突
+        with self.cache_lock:
+            store = self.get_store(table_name)
+            base = None
+            if op != 'insert':
+                seq_no = self.seq_aliases.get(seq_no, seq_no)
+                record = store.get(seq_no)
+                if record is None:
+                    return False, f"找不到序號 {seq_no} 的記錄"
+                # 暫時序號的記錄尚未寫入資料庫，不需比對衝突
+                if seq_no > 0:
+                    # 從快照載入的記錄不含機密欄位，這些欄位不列入衝突比對
+                    skipped = (TABLE_DEFINITIONS[table_name].get('secret_columns', [])
+                               if table_name in self.secrets_pending else [])
+                    base = {field: record.get(field, '') for field in TABLE_DEFINITIONS[table_name]['columns'][1:]
+                            if field not in skipped}
             
-            if cursor.rowcount == 0:
+            try:
+                if op == 'insert':
+                    # 已重送的暫時序號仍可能被畫面引用，不重複使用
+                    seq_no = min(self.journal.next_temp_seq_no(), min(self.seq_aliases, default=0) - 1)
+                self.journal.append(op, table_name, seq_no, values, base)
+            except OSError as e:
+                return False, f"{action}{label}失敗，無法寫入離線日誌: {e}"
+            
+            if op == 'insert':
+                self._cache_add(table_name, dict(values, iSeqNo=seq_no))
+            elif op == 'update':
+                self._cache_update(table_name, seq_no, values)
+            else:
+                self._cache_remove(table_name, seq_no)
+        return True, f"{label}{action}成功（離線，將於恢復連線後同步到資料庫）"
+    
+    def _journal_writes(self, op: str, table_name: str,
+                        items: List[Tuple[Optional[int], Optional[Dict]]]) -> Tuple[bool, str]:
+        """將批次變更逐筆寫入日誌（遇到失敗即停止，已寫入的變更保留）"""
+        label = TABLE_DEFINITIONS[table_name]['label']
+        action = {'insert': '新增', 'update': '更新', 'delete': '刪除'}[op]
+        for count, (seq_no, values) in enumerate(items):
+            success, message = self._journal_write(op, table_name, seq_no, values)
+            if not success:
+                if count:
+                    message += f"（已離線{action} {count} 筆）"
+                return False, message
+        return True, f"已{action} {len(items)} 筆{label}（離線，將於恢復連線後同步到資料庫）"
+    
+    def _overlay_journal(self, tables: Iterable[str]):
+        """將尚未重送的變更套用到剛載入的快取（重新載入後仍看得到離線編輯）"""
+        if not self.has_pending_writes():
+            return
+        tables = set(tables)
+        for entry in self.journal.entries():
+            table_name = entry['table']
+            if table_name not in tables or table_name in self.server_side_tables:
+                continue
+            store = self.get_store(table_name)
+            seq_no = self.seq_aliases.get(entry['seq_no'], entry['seq_no'])
+            if entry['op'] == 'insert':
+                if store.get(seq_no) is None:
+                    store.add(dict(entry['values'], iSeqNo=seq_no))
+            elif entry['op'] == 'update':
+                store.update(seq_no, entry['values'])
+            else:
+                store.remove(seq_no)
+            if entry['op'] == 'delete':
+                self.search_indexes[table_name].remove(seq_no)
+            elif store.get(seq_no) is not None:
+                self.search_indexes[table_name].add(store.get(seq_no))
+    
+    def replay_journal(self, progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Tuple[bool, str]:
+        """
+        將離線日誌分批重送到資料庫（每批一個交易，可在背景執行緒呼叫）
+        
+        更新與刪除會先以 SELECT ... FOR UPDATE 讀取資料庫目前的內容，與寫入日誌時的快取內容比對；
+        記錄已被他人修改（或更新的記錄已被刪除）時略過該變更，以資料庫內容為準，
+        說明記錄在 last_replay_issues。重送後應再進行一次同步，以資料庫內容更新快取。
+        
+        Returns:
+            (是否全部重送完成, 訊息)；無法連線時保留尚未重送的日誌
+        """
+        with self._replay_lock:
+            return self._replay_journal(progress_callback)
+    
+    def _replay_journal(self, progress_callback: Optional[Callable[[str, int, int], None]]) -> Tuple[bool, str]:
+        """重送日誌（呼叫端需持有 _replay_lock）"""
+        if not self.has_pending_writes():
+            # 與重送成功相同：恢復連線後的寫入直接送到資料庫
+            self.offline = False
+            self.last_replay_issues = []
+            return True, "沒有待同步的離線變更"
+        
+        entries = self.journal.entries()
+        batch_size = int(self.config.get('ReplayBatchSize', REPLAY_BATCH_SIZE)) or REPLAY_BATCH_SIZE
+        issues = []
+        applied = 0
+        
+        for start in range(0, len(entries), batch_size):
+            batch = entries[start:start + batch_size]
+            try:
+                seq_map, batch_issues = self._replay_batch(batch)
+            except Exception as e:
+                if is_connection_error(e):
+                    self.offline = True
+                    self.last_replay_issues = issues
+                    return False, f"無法連線到資料庫，已同步 {applied} 筆，{len(entries) - start} 筆離線變更待同步"
+                # SQL 錯誤：改為逐筆重送，只略過無法寫入的變更
+                seq_map, batch_issues = {}, []
+                for entry in batch:
+                    entry = self._remap_entries([entry], seq_map)[0]
+                    try:
+                        entry_map, entry_issues = self._replay_batch([entry])
+                    except Exception as entry_error:
+                        if is_connection_error(entry_error):
+                            self.offline = True
+                            self.last_replay_issues = issues + batch_issues
+                            return False, f"無法連線到資料庫，已同步 {applied} 筆離線變更"
+                        entry_map, entry_issues = {}, [f"{self._describe_entry(entry)}：無法寫入（{entry_error}）"]
+                    seq_map.update(entry_map)
+                    batch_issues.extend(entry_issues)
+                    # 已處理的變更立即移出日誌，後續日誌改用資料庫序號
+                    with self.cache_lock:
+                        self.journal.discard_through(entry['id'], entry_map)
+                        self._apply_seq_map(entry['table'], entry_map)
+                    entries = self._remap_entries(entries, entry_map)
+            else:
+                # 日誌與快取的序號在同一次鎖定中更新，離線寫入不會配置到重送中的暫時序號
+                with self.cache_lock:
+                    self.journal.discard_through(batch[-1]['id'], seq_map)
+                    for table_name in {entry['table'] for entry in batch}:
+                        self._apply_seq_map(table_name, seq_map)
+                entries = self._remap_entries(entries, seq_map)
+            
+            issues.extend(batch_issues)
+            applied += len(batch) - len(batch_issues)
+            if progress_callback:
+                progress_callback(f"正在同步離線變更：{start + len(batch)} / {len(entries)}",
+                                  start + len(batch), len(entries))
+        
+        self.offline = False
+        self.last_replay_issues = issues
+        message = f"已同步 {applied} 筆離線變更"
+        if issues:
+            message += f"，{len(issues)} 筆因衝突或錯誤略過（以資料庫內容為準）"
+        return True, message
+    
+    @staticmethod
+    def _remap_entries(entries: List[Dict], seq_map: Dict[int, int]) -> List[Dict]:
+        """將日誌中的暫時序號換成資料庫序號"""
+        if not seq_map:
+            return entries
+        return [dict(entry, seq_no=seq_map[entry['seq_no']]) if entry['seq_no'] in seq_map else entry
+                for entry in entries]
+    
+    def _describe_entry(self, entry: Dict) -> str:
+        """日誌項目的簡短說明"""
+        action = {'insert': '新增', 'update': '更新', 'delete': '刪除'}[entry['op']]
+        label = TABLE_DEFINITIONS[entry['table']]['label']
+        return f"{action}{label}（序號 {entry['seq_no']}）"
+    
+    def _replay_batch(self, batch: List[Dict]) -> Tuple[Dict[int, int], List[str]]:
+        """
+        在單一交易中重送一批日誌
+        
+        Returns:
+            (暫時序號 -> 資料庫序號, 因衝突略過的變更說明)
+        """
+        seq_map = {}
+        issues = []
+        
+        with self._write_connection() as connection:
+            connection.start_transaction()
+            try:
+                conflicted = self._find_conflicts(connection, batch)
+                cursor = connection.cursor()
+                # 連續的相同操作合併執行：更新以 executemany、刪除以 IN 一次完成
+                for (table_name, op), group in groupby(batch, key=lambda entry: (entry['table'], entry['op'])):
+                    group = list(group)
+                    fields = TABLE_DEFINITIONS[table_name]['columns'][1:]
+                    if op == 'insert':
+                        # 逐筆新增以取得各自的 AUTO_INCREMENT 序號
+                        sql = self._insert_sql(table_name)
+                        for entry in group:
+                            values = self._record_values(table_name, entry['values'])
+                            cursor.execute(sql, tuple(values.values()))
+                            seq_map[entry['seq_no']] = cursor.lastrowid
+                        continue
+                    
+                    targets = []
+                    for entry in group:
+                        seq_no = seq_map.get(entry['seq_no'], entry['seq_no'])
+                        if (table_name, seq_no) in conflicted:
+                            issues.append(f"{self._describe_entry(entry)}：{conflicted[(table_name, seq_no)]}")
+                        elif seq_no > 0:
+                            targets.append((seq_no, entry))
+                        else:
+                            # 暫時序號沒有對應的資料庫序號：離線新增的記錄未能寫入資料庫
+                            issues.append(f"{self._describe_entry(entry)}：對應的新增失敗，無法套用")
+                    if not targets:
+                        continue
+                    if op == 'update':
+                        assignments = ", ".join(f"{field}=%s" for field in fields)
+                        cursor.executemany(
+                            f"UPDATE {table_name} SET {assignments} WHERE iSeqNo=%s",
+                            [tuple(self._record_values(table_name, entry['values']).values()) + (seq_no,)
+                             for seq_no, entry in targets])
+                    else:
+                        placeholders = ", ".join(["%s"] * len(targets))
+                        cursor.execute(f"DELETE FROM {table_name} WHERE iSeqNo IN ({placeholders})",
+                                       tuple(seq_no for seq_no, _ in targets))
                 cursor.close()
-                return False, f"找不到序號 {seq_no} 的記錄"
-            
-            self.connection.commit()
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        
+        return seq_map, issues
+    
+    def _find_conflicts(self, connection, batch: List[Dict]) -> Dict[Tuple[str, int], str]:
+        """
+        比對資料庫目前內容與寫入日誌時的快取內容（同一記錄只比對批次中的第一筆變更）
+        
+        Returns:
+            {(資料表名稱, 序號): 衝突原因}
+        """
+        bases = {}  # (資料表名稱, 序號) -> (操作, 寫入日誌時的欄位值)
+        for entry in batch:
+            key = (entry['table'], entry['seq_no'])
+            if entry['op'] != 'insert' and entry['base'] is not None and key not in bases:
+                bases[key] = (entry['op'], entry['base'])
+        
+        conflicts = {}
+        for table_name, keys in groupby(sorted(bases), key=itemgetter(0)):
+            seq_nos = [seq_no for _, seq_no in keys]
+            columns = TABLE_DEFINITIONS[table_name]['columns']
+            placeholders = ", ".join(["%s"] * len(seq_nos))
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} "
+                           f"WHERE iSeqNo IN ({placeholders}) FOR UPDATE", tuple(seq_nos))
+            server_rows = {row['iSeqNo']: row for row in cursor.fetchall()}
             cursor.close()
             
-            # 更新本地快取
-            self.prompt_tools_data = [record for record in self.prompt_tools_data 
-                                    if record['iSeqNo'] != seq_no]
-            
-            return True, "提示工具刪除成功"
-            
-        except Exception as e:
-            return False, f"刪除提示工具失敗: {e}"
+            for seq_no in seq_nos:
+                op, base = bases[(table_name, seq_no)]
+                row = server_rows.get(seq_no)
+                if row is None:
+                    if op == 'update':
+                        conflicts[(table_name, seq_no)] = "記錄已在資料庫中刪除"
+                    continue  # 要刪除的記錄已不存在，不需處理
+                if any(str(row[field] if row[field] is not None else '') != str(base[field])
+                       for field in columns[1:] if field in base):
+                    conflicts[(table_name, seq_no)] = "記錄已在資料庫中被修改"
+        return conflicts
+    
+    def _apply_seq_map(self, table_name: str, seq_map: Dict[int, int]):
+        """重送新增後，將快取中暫時序號的記錄改為資料庫序號"""
+        if not seq_map:
+            return
+        with self.cache_lock:
+            self.seq_aliases.update(seq_map)
+            store = self.get_store(table_name)
+            index = self.search_indexes[table_name]
+            records = []
+            for temp_seq_no, seq_no in seq_map.items():
+                record = store.remove(temp_seq_no)
+                if record is None:
+                    continue
+                index.remove(temp_seq_no)
+                record['iSeqNo'] = seq_no
+                records.append(record)
+            store.upsert_many(records)
+            for record in records:
+                index.add(store.get(record['iSeqNo']))
+            self.data_version += 1
+    
+    # CmdTools CRUD 操作
+    
+    def add_cmd_tool(self, data: Dict) -> Tuple[bool, str]:
+        """新增命令工具記錄"""
+        return self._insert_record('CmdTools', data)
+    
+    def update_cmd_tool(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
+        """更新命令工具記錄"""
+        return self._update_record('CmdTools', seq_no, data)
+    
+    def delete_cmd_tool(self, seq_no: int) -> Tuple[bool, str]:
+        """刪除命令工具記錄"""
+        return self._delete_record('CmdTools', seq_no)
+    
+    # PromptTools CRUD 操作
+    
+    def add_prompt_tool(self, data: Dict) -> Tuple[bool, str]:
+        """新增提示工具記錄"""
+        return self._insert_record('PromptTools', data)
+    
+    def update_prompt_tool(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
+        """更新提示工具記錄"""
+        return self._update_record('PromptTools', seq_no, data)
+    
+    def delete_prompt_tool(self, seq_no: int) -> Tuple[bool, str]:
+        """刪除提示工具記錄"""
+        return self._delete_record('PromptTools', seq_no)
     
     # 資料篩選功能
     
     def filter_cmd_tools(self, filters: Dict[str, str]) -> List[Dict]:
         """篩選命令工具資料"""
-        filtered_data = self.cmd_tools_data.copy()
-        
-        for field, keyword in filters.items():
-            if keyword.strip():  # 非空搜尋關鍵字
-                keyword_lower = keyword.lower()
-                filtered_data = [
-                    record for record in filtered_data
-                    if keyword_lower in str(record.get(field, "")).lower()
-                ]
-        
-        return filtered_data
+        return self.filter_records('CmdTools', filters)
     
     def filter_prompt_tools(self, filters: Dict[str, str]) -> List[Dict]:
         """篩選提示工具資料"""
-        filtered_data = self.prompt_tools_data.copy()
-        
-        for field, keyword in filters.items():
-            if keyword.strip():  # 非空搜尋關鍵字
-                keyword_lower = keyword.lower()
-                filtered_data = [
-                    record for record in filtered_data
-                    if keyword_lower in str(record.get(field, "")).lower()
-                ]
-        
-        return filtered_data
+        return self.filter_records('PromptTools', filters)
     
     # WinProgram CRUD 操作
     
     def add_win_program(self, data: Dict) -> Tuple[bool, str]:
         """新增 Windows 程式記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                INSERT INTO WinProgram (remark1, ProgramPathAndName, ClickEndRun)
-                VALUES (%s, %s, %s)
-            """
-            values = (
-                data.get('remark1', ''),
-                data.get('ProgramPathAndName', ''),
-                data.get('ClickEndRun', 0)
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            
-            # 獲取新插入的序號
-            new_id = cursor.lastrowid
-            
-            # 更新本地快取
-            new_record = {
-                'iSeqNo': new_id,
-                'remark1': data.get('remark1', ''),
-                'ProgramPathAndName': data.get('ProgramPathAndName', ''),
-                'ClickEndRun': data.get('ClickEndRun', 0)
-            }
-            self.win_program_data.append(new_record)
-            
-            cursor.close()
-            return True, "Windows 程式新增成功"
-            
-        except Exception as e:
-            return False, f"新增 Windows 程式失敗: {e}"
+        return self._insert_record('WinProgram', data)
     
     def update_win_program(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
         """更新 Windows 程式記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                UPDATE WinProgram SET remark1=%s, ProgramPathAndName=%s, ClickEndRun=%s
-                WHERE iSeqNo=%s
-            """
-            values = (
-                data.get('remark1', ''),
-                data.get('ProgramPathAndName', ''),
-                data.get('ClickEndRun', 0),
-                seq_no
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            cursor.close()
-            
-            # 更新本地快取
-            for record in self.win_program_data:
-                if record['iSeqNo'] == seq_no:
-                    record.update({
-                        'remark1': data.get('remark1', ''),
-                        'ProgramPathAndName': data.get('ProgramPathAndName', ''),
-                        'ClickEndRun': data.get('ClickEndRun', 0)
-                    })
-                    break
-            
-            return True, "Windows 程式更新成功"
-            
-        except Exception as e:
-            return False, f"更新 Windows 程式失敗: {e}"
+        return self._update_record('WinProgram', seq_no, data)
     
     def delete_win_program(self, seq_no: int) -> Tuple[bool, str]:
         """刪除 Windows 程式記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = "DELETE FROM WinProgram WHERE iSeqNo = %s"
-            cursor.execute(sql, (seq_no,))
-            
-            if cursor.rowcount == 0:
-                cursor.close()
-                return False, f"找不到序號 {seq_no} 的記錄"
-            
-            self.connection.commit()
-            cursor.close()
-            
-            # 更新本地快取
-            self.win_program_data = [record for record in self.win_program_data
-                                   if record['iSeqNo'] != seq_no]
-            
-            return True, "Windows 程式刪除成功"
-            
-        except Exception as e:
-            return False, f"刪除 Windows 程式失敗: {e}"
+        return self._delete_record('WinProgram', seq_no)
     
     # WebSite CRUD 操作
     
     def add_web_site(self, data: Dict) -> Tuple[bool, str]:
         """新增網站記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                INSERT INTO WebSite (Remark, Classification, Website, account, account_webid, password, password_webid)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                data.get('Remark', ''),
-                data.get('Classification', ''),
-                data.get('Website', ''),
-                data.get('account', ''),
-                data.get('account_webid', ''),
-                data.get('password', ''),
-                data.get('password_webid', '')
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            
-            # 獲取新插入的序號
-            new_id = cursor.lastrowid
-            
-            # 更新本地快取
-            new_record = {
-                'iSeqNo': new_id,
-                'Remark': data.get('Remark', ''),
-                'Classification': data.get('Classification', ''),
-                'Website': data.get('Website', ''),
-                'account': data.get('account', ''),
-                'account_webid': data.get('account_webid', ''),
-                'password': data.get('password', ''),
-                'password_webid': data.get('password_webid', '')
-            }
-            self.web_site_data.append(new_record)
-            
-            cursor.close()
-            return True, "網站新增成功"
-            
-        except Exception as e:
-            return False, f"新增網站失敗: {e}"
+        return self._insert_record('WebSite', data)
     
     def update_web_site(self, seq_no: int, data: Dict) -> Tuple[bool, str]:
         """更新網站記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = """
-                UPDATE WebSite SET Remark=%s, Classification=%s, Website=%s, account=%s, account_webid=%s, password=%s, password_webid=%s
-                WHERE iSeqNo=%s
-            """
-            values = (
-                data.get('Remark', ''),
-                data.get('Classification', ''),
-                data.get('Website', ''),
-                data.get('account', ''),
-                data.get('account_webid', ''),
-                data.get('password', ''),
-                data.get('password_webid', ''),
-                seq_no
-            )
-            
-            cursor.execute(sql, values)
-            self.connection.commit()
-            cursor.close()
-            
-            # 更新本地快取
-            for record in self.web_site_data:
-                if record['iSeqNo'] == seq_no:
-                    record.update({
-                        'Remark': data.get('Remark', ''),
-                        'Classification': data.get('Classification', ''),
-                        'Website': data.get('Website', ''),
-                        'account': data.get('account', ''),
-                        'account_webid': data.get('account_webid', ''),
-                        'password': data.get('password', ''),
-                        'password_webid': data.get('password_webid', '')
-                    })
-                    break
-            
-            return True, "網站更新成功"
-            
-        except Exception as e:
-            return False, f"更新網站失敗: {e}"
+        return self._update_record('WebSite', seq_no, data)
     
     def delete_web_site(self, seq_no: int) -> Tuple[bool, str]:
         """刪除網站記錄"""
-        try:
-            cursor = self.connection.cursor()
-            
-            sql = "DELETE FROM WebSite WHERE iSeqNo = %s"
-            cursor.execute(sql, (seq_no,))
-            
-            if cursor.rowcount == 0:
-                cursor.close()
-                return False, f"找不到序號 {seq_no} 的記錄"
-            
-            self.connection.commit()
-            cursor.close()
-            
-            # 更新本地快取
-            self.web_site_data = [record for record in self.web_site_data
-                                if record['iSeqNo'] != seq_no]
-            
-            return True, "網站刪除成功"
-            
-        except Exception as e:
-            return False, f"刪除網站失敗: {e}"
+        return self._delete_record('WebSite', seq_no)
     
     # 資料篩選功能擴展
     
     def filter_win_program(self, filters: Dict[str, str]) -> List[Dict]:
         """篩選 Windows 程式資料"""
-        filtered_data = self.win_program_data.copy()
-        
-        for field, keyword in filters.items():
-            if keyword.strip():  # 非空搜尋關鍵字
-                keyword_lower = keyword.lower()
-                filtered_data = [
-                    record for record in filtered_data
-                    if keyword_lower in str(record.get(field, "")).lower()
-                ]
-        
-        return filtered_data
+        return self.filter_records('WinProgram', filters)
     
     def filter_web_site(self, filters: Dict[str, str]) -> List[Dict]:
         """篩選網站資料"""
-        filtered_data = self.web_site_data.copy()
-        
-        for field, keyword in filters.items():
-            if keyword.strip():  # 非空搜尋關鍵字
-                keyword_lower = keyword.lower()
-                filtered_data = [
-                    record for record in filtered_data
-                    if keyword_lower in str(record.get(field, "")).lower()
-                ]
-        
-        return filtered_data
+        return self.filter_records('WebSite', filters)
     
     # 匯出功能
      
@@ -595,15 +1668,17 @@ class DatabaseManager:
             "table_name": table_name,
             "total_records": total_count,
             "filtered_records": filtered_count,
-            "data": data
+            "data": list(data)
         }
          
-        return json.dumps(export_data, ensure_ascii=False, indent=2)
+        return json.dumps(export_data, ensure_ascii=False, indent=2, default=record_to_json)
     
-    def export_all_database(self, file_path: str):
+    def export_all_database(self, file_path: str,
+                            progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                            framing: Optional[str] = None):
         """
-        匯出整個資料庫到單一 JSON 檔案。
-        結構：
+        以串流方式匯出整個資料庫到單一備份檔（直接讀取資料庫，不需先載入本地快取）。
+        結構（compact，每筆記錄一行，可直接匯入）：
         {
           "export_time": "...",
           "tables": {
@@ -613,159 +1688,206 @@ class DatabaseManager:
             "WebSite": [...]
           }
         }
+        NDJSON 則為每行一個 JSON 值：檔頭、{"__table__": 資料表名稱} 區段標記與記錄，
+        最後一行為記錄各資料表筆數與 SHA-256 的 manifest。
+        副檔名為 .gz / .zst 時以 gzip / zstd 壓縮（例如 .ndjson.gz）。
+        
+        Args:
+            file_path: 備份檔路徑
+            progress_callback: 每寫入一批記錄後呼叫 (進度說明, 已完成資料表數, 資料表總數)
+            framing: 'compact' 或 'ndjson'（預設依副檔名，.ndjson 與 .ndjson.gz 等為 NDJSON）
         """
         from datetime import datetime
     
-        if not self.connection or not self.connection.is_connected():
+        if not self.is_connected():
             if not self.connect():
                 return False, "無法連線到資料庫，匯出失敗"
     
-        try:
-            # 確保最新資料
-            load_ok, load_msg = self.load_all_data()
-            if not load_ok:
-                return False, f"載入資料失敗：{load_msg}"
-    
-            export_payload = {
-                "export_time": datetime.now().isoformat(),
-                "tables": {
-                    "CmdTools": self.cmd_tools_data,
-                    "PromptTools": self.prompt_tools_data,
-                    "WinProgram": self.win_program_data,
-                    "WebSite": self.web_site_data,
-                }
-            }
+        framing = framing or framing_for_path(file_path)
+        # 先寫入暫存檔，完成後才取代目標檔案，匯出失敗時不會留下不完整的備份
+        temp_path = file_path + ".tmp"
+        total = len(TABLE_DEFINITIONS)
     
+        try:
             # 建立目錄（若需要）
             os.makedirs(os.path.dirname(file_path), exist_ok=True) if os.path.dirname(file_path) else None
     
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(export_payload, f, ensure_ascii=False, indent=2)
+            with self._connection() as connection, \
+                    open_backup_for_write(temp_path, compression_for_path(file_path)) as f:
+                # 以一致性快照讀取，各資料表內容對應同一時間點
+                connection.start_transaction(consistent_snapshot=True, readonly=True)
+                try:
+                    writer = BackupWriter(f, framing)
+                    writer.begin(datetime.now().isoformat())
+                    for index, (table_name, definition) in enumerate(TABLE_DEFINITIONS.items()):
+                        writer.begin_table(table_name)
+                        cursor = connection.cursor(dictionary=True, buffered=False)
+                        try:
+                            cursor.execute(f"SELECT {', '.join(definition['columns'])} FROM {table_name} "
+                                           f"ORDER BY iSeqNo")
+                            for batch in self._iter_row_batches(cursor):
+                                writer.write_rows(batch)
+                                if progress_callback:
+                                    progress_callback(
+                                        f"正在匯出{definition['label']}：已寫入 {writer.table_rows} 筆"
+                                        f"（{format_bytes(writer.bytes_written)}）", index, total)
+                        except Exception:
+                            # 例如磁碟已滿：捨棄未讀取的結果，連線才能歸還連線池
+                            self._abandon_cursor(connection, cursor)
+                            raise
+                        cursor.close()
+                        writer.end_table()
+                    writer.finish()
+                finally:
+                    # 唯讀交易，結束即可（連線已中斷時交易已結束，保留原本的錯誤）
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
     
+            os.replace(temp_path, file_path)
+            if progress_callback:
+                progress_callback(f"匯出完成（{format_bytes(os.path.getsize(file_path))}）", total, total)
             return True, "整個資料庫匯出成功"
     
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             return False, f"匯出整個資料庫時發生錯誤: {e}"
     
-    def import_from_json_file(self, file_path: str):
+    def _discard_local_changes(self) -> int:
+        """
+        資料庫內容整批取代後，捨棄尚未重送的離線變更與增量同步狀態（兩者都對應取代前的資料）
+        
+        Returns:
+            捨棄的離線變更筆數
+        """
+        with self._replay_lock, self.cache_lock:
+            discarded = self.pending_write_count()
+            if discarded:
+                self.journal.discard_through(self.journal.entries()[-1]['id'])
+            self.seq_aliases.clear()
+            self.offline = False
+            self.sync_state.clear()
+            self._clear_staged()
+            self.data_version += 1
+        return discarded
+    
+    def _bulk_insert(self, cursor, table_name: str, rows: Iterable[Dict]) -> Tuple[int, float]:
+        """
+        以 executemany 批次插入記錄（mysql.connector 會將 INSERT 改寫為多列 VALUES，一批只需一次往返）
+        
+        Returns:
+            (插入筆數, 耗時秒數)
+        """
+        defaults = TABLE_DEFINITIONS[table_name].get('defaults', {})
+        sql = self._insert_sql(table_name)
+        batch_size = int(self.config.get('ImportBatchSize', IMPORT_BATCH_SIZE)) or IMPORT_BATCH_SIZE
+        
+        start = time.perf_counter()
+        rows = iter(rows)
+        count = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            params = []
+            for row in batch:
+                values = self._record_values(table_name, row)
+                # 預設值為整數的欄位（例如 ClickEndRun）轉為整數
+                for field, default in defaults.items():
+                    if isinstance(default, int):
+                        values[field] = int(values[field] or default)
+                params.append(tuple(values.values()))
+            cursor.executemany(sql, params)
+            count += len(batch)
+        return count, time.perf_counter() - start
+    
+    def import_from_json_file(self, file_path: str,
+                              progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                              reload_cache: bool = True):
         """
         從 JSON 檔匯入整個資料庫。
         規則：
         - 僅支援本函式輸出的結構或相容格式：
           { "tables": { "CmdTools": [...], "PromptTools": [...], "WinProgram": [...], "WebSite": [...] } }
-        - 先 TRUNCATE 這四張表，再重新插入 JSON 資料。
-        - 若任一步驟失敗，整體 ROLLBACK。
+        - 以串流方式逐筆讀取記錄，不將整個檔案載入記憶體；
+          先完整讀過一次確認格式正確，才在同一交易中以 DELETE 清空這四張表並再次讀取，
+          以多列 INSERT 批次插入 JSON 資料（每批 ImportBatchSize 筆）。
+        - 若任一步驟失敗，整體 ROLLBACK（不使用 TRUNCATE，因其會隱含提交交易而無法還原）；
+          因此匯入記錄的序號接續原本的 AUTO_INCREMENT，不會從 1 開始。
+        - 匯入成功後捨棄尚未重送的離線變更與增量同步狀態（對應的是匯入前的資料），
+          之後的重新載入為完整載入。
         - 注意：此操作具破壞性，請在 UI 端先提醒使用者備份。
+        
+        Args:
+            file_path: 備份檔路徑
+            progress_callback: 讀取檔案時呼叫 (進度說明, 已讀取位元組數, 檔案總位元組數)
+            reload_cache: 匯入後是否立即重新載入本地快取（由 GUI 另行載入時傳入 False）
         """
         if not os.path.exists(file_path):
             return False, f"找不到指定檔案: {file_path}"
     
-        if not self.connection or not self.connection.is_connected():
+        if not self.is_connected():
             if not self.connect():
                 return False, "無法連線到資料庫，匯入失敗"
     
+        def phase_progress(phase: str):
+            if progress_callback is None:
+                return None
+            return lambda bytes_read, total_bytes: progress_callback(
+                f"{phase} {format_bytes(bytes_read)} / {format_bytes(total_bytes)}", bytes_read, total_bytes)
+    
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = json.load(f)
+            # 先確認整個檔案可以解析，避免在長時間的交易中途才發現格式錯誤
+            scan_backup(file_path, phase_progress("正在驗證備份檔"))
     
-            # 兼容格式判斷
-            if "tables" in content and isinstance(content["tables"], dict):
-                tables = content["tables"]
-            else:
-                # 若沒有 tables，就視為不支援的格式
-                return False, "JSON 格式不正確，缺少 'tables' 區塊"
+            stats = {table_name: (0, 0.0) for table_name in TABLE_DEFINITIONS}
+            with self._connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    # 使用交易保護
+                    connection.start_transaction()
     
-            cmdtools_rows = tables.get("CmdTools", [])
-            prompt_rows = tables.get("PromptTools", [])
-            win_rows = tables.get("WinProgram", [])
-            web_rows = tables.get("WebSite", [])
+                    # 清空既有資料（DELETE 可隨交易還原）
+                    for table_name in TABLE_DEFINITIONS:
+                        cursor.execute(f"DELETE FROM {table_name}")
     
-            cursor = self.connection.cursor()
-            try:
-                # 使用交易保護
-                self.connection.start_transaction()
-    
-                # 清空既有資料
-                cursor.execute("TRUNCATE TABLE CmdTools")
-                cursor.execute("TRUNCATE TABLE PromptTools")
-                cursor.execute("TRUNCATE TABLE WinProgram")
-                cursor.execute("TRUNCATE TABLE WebSite")
-    
-                # 匯入 CmdTools
-                for row in cmdtools_rows:
-                    cursor.execute(
-                        """
-                        INSERT INTO CmdTools (cmd, example, remark1, Classification)
-                        VALUES (%s, %s, %s, %s)
-                        """,
-                        (
-                            row.get("cmd", ""),
-                            row.get("example", ""),
-                            row.get("remark1", ""),
-                            row.get("Classification", ""),
-                        ),
-                    )
-    
-                # 匯入 PromptTools
-                for row in prompt_rows:
-                    cursor.execute(
-                        """
-                        INSERT INTO PromptTools (Prompt, Prompt_Eng, Classification)
-                        VALUES (%s, %s, %s)
-                        """,
-                        (
-                            row.get("Prompt", ""),
-                            row.get("Prompt_Eng", ""),
-                            row.get("Classification", ""),
-                        ),
-                    )
-    
-                # 匯入 WinProgram
-                for row in win_rows:
-                    cursor.execute(
-                        """
-                        INSERT INTO WinProgram (remark1, ProgramPathAndName, ClickEndRun)
-                        VALUES (%s, %s, %s)
-                        """,
-                        (
-                            row.get("remark1", ""),
-                            row.get("ProgramPathAndName", ""),
-                            int(row.get("ClickEndRun", 0) or 0),
-                        ),
-                    )
-    
-                # 匯入 WebSite
-                for row in web_rows:
-                    cursor.execute(
-                        """
-                        INSERT INTO WebSite
-                        (Remark, Classification, Website, account, account_webid, password, password_webid)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            row.get("Remark", ""),
-                            row.get("Classification", ""),
-                            row.get("Website", ""),
-                            row.get("account", ""),
-                            row.get("account_webid", ""),
-                            row.get("password", ""),
-                            row.get("password_webid", ""),
-                        ),
-                    )
-    
-                # 提交交易
-                self.connection.commit()
-                cursor.close()
+                    # 逐筆讀取並以多列 INSERT 批次匯入各資料表
+                    rows = iter_backup_rows(file_path, phase_progress("正在匯入資料"))
+                    for table_name, group in groupby(rows, key=itemgetter(0)):
+                        if table_name not in TABLE_DEFINITIONS:
+                            continue
+                        count, seconds = self._bulk_insert(cursor, table_name, map(itemgetter(1), group))
+                        previous_count, previous_seconds = stats[table_name]
+                        stats[table_name] = (previous_count + count, previous_seconds + seconds)
     
-                # 重新載入快取
-                self.load_all_data()
+                    # 提交交易
+                    connection.commit()
+                    cursor.close()
     
-                return True, "從 JSON 匯入資料庫成功"
+                except Exception as e:
+                    connection.rollback()
+                    cursor.close()
+                    return False, f"匯入資料時發生錯誤，已還原變更: {e}"
     
-            except Exception as e:
-                self.connection.rollback()
-                cursor.close()
-                return False, f"匯入資料時發生錯誤，已還原變更: {e}"
+            self.last_import_stats = stats
+            discarded = self._discard_local_changes()
+    
+            # 重新載入快取（連線已歸還連線池，可並行載入）
+            if reload_cache:
+                self.load_all_data()
+    
+            details = "\n".join(
+                f"{TABLE_DEFINITIONS[table_name]['label']}: {rows} 筆，{format_rate(rows, seconds)}"
+                for table_name, (rows, seconds) in stats.items()
+            )
+            message = f"從 JSON 匯入資料庫成功\n{details}"
+            if discarded:
+                message += f"\n已捨棄 {discarded} 筆匯入前尚未同步的離線變更"
+            return True, message
     
+        except BackupFormatError as e:
+            return False, str(e)
         except Exception as e:
             return False, f"讀取或解析 JSON 檔案時發生錯誤: {e}"
\ No newline at end of file
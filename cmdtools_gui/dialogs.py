@@ -371,4 +371,60 @@ class ConfirmDialog(QDialog):
         
         layout.addLayout(button_layout)
         
-        self.setLayout(layout)
\ No newline at end of file
+        self.setLayout(layout)
+
+
+class ClassificationDialog(QDialog):
+    """批次修改分類對話框"""
+    
+    def __init__(self, parent=None, count=0, classifications=None, current=""):
+        """
+        初始化批次修改分類對話框
+        
+        Args:
+            parent: 父視窗
+            count: 選取的記錄筆數
+            classifications: 既有的分類（供下拉選擇，也可直接輸入新分類）
+            current: 預設顯示的分類
+        """
+        super().__init__(parent)
+        self.init_ui(count, classifications or [], current)
+    
+    def init_ui(self, count, classifications, current):
+        """初始化 UI"""
+        self.setWindowTitle("修改分類")
+        self.setModal(True)
+        self.resize(320, 120)
+        
+        layout = QVBoxLayout()
+        
+        message_label = QLabel(f"將選取的 {count} 筆記錄改為以下分類：")
+        message_label.setWordWrap(True)
+        layout.addWidget(message_label)
+        
+        self.classification_combo = QComboBox()
+        self.classification_combo.setEditable(True)
+        self.classification_combo.addItems(classifications)
+        self.classification_combo.setEditText(current)
+        layout.addWidget(self.classification_combo)
+        
+        # 按鈕區域
+        button_layout = QHBoxLayout()
+        
+        self.ok_button = QPushButton("確定")
+        self.cancel_button = QPushButton("取消")
+        
+        self.ok_button.clicked.connect(self.accept)
+        self.cancel_button.clicked.connect(self.reject)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(self.cancel_button)
+        
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+    
+    def get_classification(self) -> str:
+        """取得輸入的分類"""
+        return self.classification_combo.currentText().strip()
@@ -5,8 +5,10 @@
 """
 
 import os
+import re
 import sys
 import logging
+import time
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -17,9 +19,12 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent
 from PyQt5.QtGui import QIcon, QFont
 
-from .database import DatabaseManager
+from .backup_io import BACKUP_EXPORT_FILTERS, BACKUP_EXTENSIONS
+from .database import DatabaseManager, TABLE_DEFINITIONS
+from .data_loader import BackupThread, DataLoadThread
+from .search_worker import GLOBAL_SCOPE, SearchThread, SearchCostTracker
 from .table_widget import TableTabWidget
-from .dialogs import EditRecordDialog, ExportDialog, ConfirmDialog
+from .dialogs import EditRecordDialog, ExportDialog, ConfirmDialog, ClassificationDialog
 
 
 class MainWindow(QMainWindow):
@@ -32,6 +37,18 @@ class MainWindow(QMainWindow):
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self._do_global_search)
         self.current_search_text = ""
+        self.search_cost = SearchCostTracker()  # 依搜尋耗時調整搜尋框延遲
+        self.tab_search_cost = SearchCostTracker()  # 分頁搜尋框（只搜尋單一資料表）的搜尋耗時
+        self.tab_search_timers = {}  # 資料表名稱 -> 分頁搜尋框的延遲計時器
+        self.tab_search_text = {}  # 資料表名稱 -> 分頁搜尋框待搜尋的關鍵字
+        self.load_thread = None  # 背景資料載入執行緒
+        self.search_thread = None  # 背景全域搜尋執行緒
+        self.backup_thread = None  # 背景備份匯入 / 匯出執行緒
+        self.snapshot_thread = None  # 背景儲存本機快照的執行緒
+        self.background_sync = False  # 背景同步中（啟動時已顯示本機快照，或恢復連線後重送離線變更），不跳出訊息視窗
+        self.replay_thread = None  # 背景重送離線變更的執行緒
+        self.replay_timer = QTimer(self)  # 有離線變更時定期嘗試重送
+        self.replay_timer.timeout.connect(self.retry_pending_writes)
         
         # 初始化日誌記錄器
         self.init_logger()
@@ -94,6 +111,26 @@ class MainWindow(QMainWindow):
                 self.hide()
         super().changeEvent(event)
     
+    def closeEvent(self, event):
+        """關閉視窗前等待背景執行緒結束並關閉連線池"""
+        if self.search_thread:
+            self.search_thread.stop()
+            self.search_thread.wait()
+        if self.load_thread and self.load_thread.isRunning():
+            self.load_thread.wait()
+        if self.backup_thread and self.backup_thread.isRunning():
+            self.backup_thread.wait()
+        if self.snapshot_thread and self.snapshot_thread.isRunning():
+            self.snapshot_thread.wait()
+        if self.replay_thread and self.replay_thread.isRunning():
+            self.replay_thread.wait()
+        if self.db_manager:
+            # 保存關閉前的編輯，下次啟動時直接顯示
+            if self.db_manager.snapshot_dirty():
+                self.db_manager.save_snapshot()
+            self.db_manager.disconnect()
+        super().closeEvent(event)
+    
     def init_logger(self):
         """初始化日誌記錄器"""
         # 創建日誌目錄（如果不存在）
@@ -224,8 +261,23 @@ class MainWindow(QMainWindow):
         self.web_site_tab.set_data_callback(self.on_data_operation)
         self.tab_widget.addTab(self.web_site_tab, "網站管理")
         
+        # 伺服器端查詢讀取下一頁後更新記錄數量
+        for tab in (self.cmd_tab, self.prompt_tab, self.win_program_tab, self.web_site_tab):
+            tab.table_widget.page_fetched.connect(self.update_data_status)
+        
+        # 分頁搜尋框與全域搜尋相同，延遲後交由背景搜尋執行緒合併處理
+        for table_name, definition in TABLE_DEFINITIONS.items():
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda name=table_name: self._do_tab_search(name))
+            self.tab_search_timers[table_name] = timer
+            self.get_tab(definition['table_type']).set_search_scheduler(
+                lambda keyword, name=table_name: self.schedule_tab_search(name, keyword)
+            )
+        
         # 連接分頁切換事件
         self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        self.update_active_tab()
         
         layout.addWidget(self.tab_widget)
         
@@ -352,6 +404,10 @@ class MainWindow(QMainWindow):
         self.data_label = QLabel("資料載入中...")
         self.status_bar.addWidget(self.data_label)
         
+        # 搜尋耗時標籤
+        self.search_latency_label = QLabel("")
+        self.status_bar.addWidget(self.search_latency_label)
+        
         # 進度條
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -419,64 +475,357 @@ class MainWindow(QMainWindow):
             self.show_error_message(f"初始化資料庫失敗: {e}")
     
     def connect_database(self):
-        """連線資料庫"""
+        """連線資料庫（連線與載入在背景執行緒中進行）"""
         try:
             self.db_manager = DatabaseManager()
-            
-            if self.db_manager.connect():
-                self.update_connection_status("已連線", True)
-                self.load_all_data()
-            else:
-                self.update_connection_status("連線失敗", False)
-                self.show_error_message("無法連線到資料庫，請檢查連線設定")
+            self.setup_search_providers()
+            self.start_search_thread()
+            # 先顯示本機快照，再於背景與資料庫同步
+            self.background_sync = self.load_snapshot()
+            replay_interval = float(self.db_manager.config.get('ReplayInterval', 30))
+            if replay_interval > 0:
+                self.replay_timer.start(int(replay_interval * 1000))
+            self.load_all_data(incremental=self.background_sync)
                 
         except Exception as e:
             self.update_connection_status("連線錯誤", False)
             self.show_error_message(f"資料庫連線錯誤: {e}")
-        finally:
             self.progress_bar.setVisible(False)
     
-    def load_all_data(self):
-        """載入所有資料"""
+    def load_snapshot(self):
+        """載入本機快照並顯示（沒有可用的快照時回傳 False）"""
+        start = time.perf_counter()
+        success, message = self.db_manager.load_snapshot()
+        if not success:
+            self.logger.info(f"未使用本機快照: {message}")
+            return False
+        
+        self.setup_page_providers()
+        self.show_cached_data()
+        self.logger.info(f"{message}，耗時 {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+    
+    def save_snapshot(self):
+        """在背景儲存本機快照（快取未變動或已在儲存時略過）"""
+        if not self.db_manager or not self.db_manager.snapshot_dirty():
+            return
+        if self.snapshot_thread and self.snapshot_thread.isRunning():
+            return
+        
+        self.snapshot_thread = BackupThread(lambda progress: self.db_manager.save_snapshot(), self)
+        self.snapshot_thread.operation_finished.connect(self.on_snapshot_saved)
+        self.snapshot_thread.start()
+    
+    def on_snapshot_saved(self, success, message):
+        """本機快照儲存完成"""
+        if success:
+            self.logger.info(message)
+        else:
+            self.logger.warning(message)
+    
+    def finish_background_sync(self, success, message):
+        """
+        背景同步結束：成功時只更新狀態列；
+        無法連線時不跳出錯誤視窗，繼續顯示本機資料
+        """
+        self.background_sync = False
+        if success:
+            self.update_status("已與資料庫同步")
+        else:
+            # 之後的編輯直接寫入離線日誌，不必每次等待連線逾時
+            self.db_manager.offline = self.db_manager.journal is not None
+            self.update_connection_status("離線（顯示本機資料）", False)
+            if self.db_manager.has_pending_writes():
+                self.update_offline_status()
+            self.update_status(f"無法與資料庫同步，目前顯示本機資料: {message}")
+            self.logger.warning(f"背景同步失敗: {message}")
+    
+    def retry_pending_writes(self):
+        """
+        定期重送離線變更（不停用編輯按鈕；重送期間的編輯會接在日誌之後）
+        
+        離線但沒有待同步的變更時同樣執行：清除離線狀態並在背景同步，確認是否已恢復連線
+        """
+        if not self.db_manager or self.is_busy():
+            return
+        if not (self.db_manager.has_pending_writes() or self.db_manager.offline):
+            return
+        if self.replay_thread and self.replay_thread.isRunning():
+            return
+        
+        self.replay_thread = BackupThread(self.db_manager.replay_journal, self)
+        self.replay_thread.operation_finished.connect(self.on_retry_finished)
+        self.replay_thread.start()
+    
+    def on_retry_finished(self, success, message):
+        """定期重送結束：成功後在背景同步，以資料庫內容更新快取"""
+        self.on_replay_finished(success, message)
+        if success and not (self.load_thread and self.load_thread.isRunning()):
+            self.background_sync = True
+            self.load_all_data(incremental=True)
+    
+    def on_replay_finished(self, success, message):
+        """離線變更重送結束：更新畫面上的序號，並列出因衝突略過的變更"""
+        if success:
+            self.logger.info(message)
+            self.show_cached_data()
+            self.update_status(message)
+        else:
+            self.logger.warning(message)
+        
+        issues = self.db_manager.last_replay_issues
+        if issues:
+            self.db_manager.last_replay_issues = []
+            for issue in issues:
+                self.logger.warning(f"離線變更略過: {issue}")
+            details = "\n".join(issues[:20]) + (f"\n...（共 {len(issues)} 筆）" if len(issues) > 20 else "")
+            QMessageBox.warning(self, "離線變更衝突", f"以下離線變更未寫入資料庫，已保留資料庫中的內容：\n{details}")
+        self.update_offline_status()
+    
+    def update_offline_status(self):
+        """依離線變更筆數更新連線狀態"""
         if not self.db_manager:
             return
+        pending = self.db_manager.pending_write_count()
+        if self.db_manager.offline:
+            self.update_connection_status(f"離線（{pending} 筆變更待同步）", False)
+        elif pending:
+            self.update_connection_status(f"已連線（{pending} 筆變更待同步）", True)
+    
+    def mark_online(self):
+        """載入或同步成功：沒有待重送的變更時恢復直接寫入資料庫"""
+        if not self.db_manager.has_pending_writes():
+            self.db_manager.offline = False
+        self.update_offline_status()
+    
+    def show_cached_data(self):
+        """以本地快取更新四個分頁"""
+        self.cmd_tab.set_data(self.db_manager.cmd_tools_data)
+        self.prompt_tab.set_data(self.db_manager.prompt_tools_data)
+        self.win_program_tab.set_data(self.db_manager.win_program_data)
+        self.web_site_tab.set_data(self.db_manager.web_site_data)
+        self.update_data_status()
+    
+    def load_all_data(self, incremental=False):
+        """
+        載入所有資料（背景執行，不阻塞 GUI）
+        
+        Args:
+            incremental: 是否只同步自上次載入後變動的記錄
+        """
+        if not self.db_manager:
+            return
+        
+        # 已有載入作業進行中時不重複啟動
+        if self.load_thread and self.load_thread.isRunning():
+            return
+        
+        self.update_status("已顯示本機快照，正在與資料庫同步..." if self.background_sync else "正在載入資料...")
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # 連線完成前為不確定進度
+        self.set_loading_state(True)
+        
+        self.load_thread = DataLoadThread(self.db_manager, self, incremental=incremental)
+        self.load_thread.connection_checked.connect(self.on_connection_checked)
+        self.load_thread.progress_changed.connect(self.on_load_progress)
+        self.load_thread.rows_loaded.connect(self.on_rows_loaded)
+        self.load_thread.load_finished.connect(self.on_load_finished)
+        self.load_thread.sync_finished.connect(self.on_sync_finished)
+        self.load_thread.replay_finished.connect(self.on_replay_finished)
+        self.load_thread.start()
+    
+    def on_connection_checked(self, connected):
+        """背景執行緒回報連線結果"""
+        if connected:
+            self.update_connection_status("已連線", True)
+        else:
+            self.update_connection_status("連線失敗", False)
+    
+    def on_load_progress(self, percent, message):
+        """背景執行緒回報載入進度"""
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+        self.update_status(message)
+    
+    def on_rows_loaded(self, table_name, rows, loaded):
+        """背景載入讀取到一批記錄：顯示已讀取筆數，表格尚無資料時先顯示第一批記錄"""
+        definition = TABLE_DEFINITIONS[table_name]
+        self.update_status(f"正在載入{definition['label']}：已讀取 {loaded} 筆")
+        
+        tab = self.get_tab(definition['table_type'])
+        if (tab and loaded == len(rows) and not tab.is_server_side()
+                and not len(self.db_manager.get_store(table_name))):
+            # 載入完成後 on_load_finished 會以完整資料取代
+            tab.set_data(rows)
+    
+    def on_load_finished(self, success, message, results):
+        """背景載入完成，將結果套用到快取與表格"""
+        self.progress_bar.setVisible(False)
+        self.set_loading_state(False)
+        
+        if not success:
+            if self.background_sync:
+                self.finish_background_sync(False, message)
+            else:
+                self.show_error_message(message)
+            return
         
         try:
-            self.update_status("正在載入資料...")
+            self.update_connection_status("已連線", True)
+            self.mark_online()
+            self.db_manager.apply_loaded_data(results)
+            self.log_load_timings()
+            self.setup_page_providers()
             
-            # 載入資料
-            success, message = self.db_manager.load_all_data()
+            # 設定資料到表格
+            self.show_cached_data()
+            self.update_status("資料載入完成")
             
-            if success:
-                # 設定資料到表格
-                self.cmd_tab.set_data(self.db_manager.cmd_tools_data)
-                self.prompt_tab.set_data(self.db_manager.prompt_tools_data)
-                self.win_program_tab.set_data(self.db_manager.win_program_data)
-                self.web_site_tab.set_data(self.db_manager.web_site_data)
-                
-                self.update_status("資料載入完成")
-                self.update_data_status()
-                
-                QMessageBox.information(self, "載入成功", message)
+            if self.background_sync:
+                self.finish_background_sync(True, message)
             else:
-                self.show_error_message(message)
+                QMessageBox.information(self, "載入成功", message)
+            self.save_snapshot()
                 
         except Exception as e:
             self.show_error_message(f"載入資料時發生錯誤: {e}")
     
+    def on_sync_finished(self, success, message, deltas):
+        """增量同步完成，只更新有變動的資料表"""
+        self.progress_bar.setVisible(False)
+        self.set_loading_state(False)
+        
+        if not success:
+            if self.background_sync:
+                self.finish_background_sync(False, message)
+            else:
+                self.show_error_message(message)
+            return
+        
+        try:
+            self.update_connection_status("已連線", True)
+            self.mark_online()
+            changed_tables = self.db_manager.apply_deltas(deltas)
+            
+            for table_name, changed_seq_nos in changed_tables.items():
+                definition = TABLE_DEFINITIONS[table_name]
+                tab = self.get_tab(definition['table_type'])
+                if tab:
+                    tab.apply_delta(getattr(self.db_manager, definition['attr']), changed_seq_nos)
+            self.search_hidden_tabs()
+            
+            inserted = sum(len(delta['inserted']) for delta in deltas.values())
+            updated = sum(len(delta['updated']) for delta in deltas.values())
+            deleted = sum(len(delta['deleted']) for delta in deltas.values())
+            
+            self.update_status("資料同步完成")
+            self.update_data_status()
+            
+            if self.background_sync:
+                self.finish_background_sync(True, message)
+                self.logger.info(f"啟動同步: 新增 {inserted} 筆、更新 {updated} 筆、刪除 {deleted} 筆")
+            else:
+                QMessageBox.information(
+                    self,
+                    "同步成功",
+                    f"{message}\n新增 {inserted} 筆、更新 {updated} 筆、刪除 {deleted} 筆"
+                )
+            self.save_snapshot()
+            
+        except Exception as e:
+            self.show_error_message(f"同步資料時發生錯誤: {e}")
+    
+    def log_load_timings(self):
+        """記錄各資料表載入耗時、快取記憶體用量與連線池統計（診斷用）"""
+        timings = self.db_manager.get_load_timings()
+        if timings:
+            details = ", ".join(f"{table_name} {seconds * 1000:.0f} ms"
+                                for table_name, seconds in timings.items())
+            self.logger.info(f"資料載入耗時: {details}")
+        
+        report = self.db_manager.memory_report()
+        details = ", ".join(
+            f"{table_name} {info['records']} 筆 {info['bytes'] / 1024:.0f} KB"
+            f"{'（精簡）' if info['compact'] else ''}"
+            for table_name, info in report.items()
+        )
+        self.logger.info(f"快取記憶體用量: {details}")
+        
+        metrics = self.db_manager.get_pool_metrics()
+        if metrics:
+            self.logger.info(
+                f"連線池: 大小 {metrics['pool_size']}, 取得次數 {metrics['checkouts']}, "
+                f"平均等待 {metrics['avg_wait_ms']:.1f} ms, 最長等待 {metrics['max_wait_ms']:.1f} ms, "
+                f"失敗 {metrics['failures']}"
+            )
+    
+    def log_import_stats(self):
+        """記錄各資料表匯入筆數與速度（診斷用）"""
+        stats = self.db_manager.last_import_stats
+        if stats:
+            details = ", ".join(f"{table_name} {rows} 筆 {seconds * 1000:.0f} ms"
+                                for table_name, (rows, seconds) in stats.items())
+            self.logger.info(f"資料匯入耗時: {details}")
+    
+    def set_loading_state(self, loading):
+        """載入期間停用會使用資料庫連線的按鈕"""
+        for button in (self.add_btn, self.edit_btn, self.delete_btn,
+                       self.refresh_btn, self.update_db_btn,
+                       self.export_all_btn, self.import_btn):
+            button.setEnabled(not loading)
+    
     def on_global_search_changed(self, text):
         """全域搜尋文字變化"""
         self.current_search_text = text
-        # 延遲搜尋，避免頻繁查詢
+        # 延遲搜尋，避免頻繁查詢（延遲時間依最近的搜尋耗時調整）
         self.search_timer.stop()
-        self.search_timer.start(500)  # 500ms 延遲
+        delay = self.search_cost.debounce_ms()
+        if delay <= 0:
+            self._do_global_search()
+        else:
+            self.search_timer.start(delay)
     
     def _do_global_search(self):
         """執行全域搜尋（由計時器觸發）"""
         self.apply_global_search(self.current_search_text)
     
+    def schedule_tab_search(self, table_name, keyword):
+        """分頁搜尋框文字變化：延遲後搜尋（連續輸入時只搜尋最後的關鍵字）"""
+        self.tab_search_text[table_name] = keyword
+        timer = self.tab_search_timers[table_name]
+        timer.stop()
+        delay = self.tab_search_cost.debounce_ms()
+        if delay <= 0:
+            self._do_tab_search(table_name)
+        else:
+            timer.start(delay)
+    
+    def _do_tab_search(self, table_name):
+        """執行分頁搜尋（由計時器觸發；有背景搜尋執行緒時在背景搜尋）"""
+        keyword = self.tab_search_text.get(table_name, "")
+        if self.search_thread and self.search_thread.isRunning():
+            self.search_thread.submit(keyword, [table_name], scope=table_name)
+            return
+        
+        tab = self.get_tab(TABLE_DEFINITIONS[table_name]['table_type'])
+        start = time.perf_counter()
+        tab.apply_field_search(keyword)
+        self.tab_search_cost.record((time.perf_counter() - start) * 1000)
+        self.update_data_status()
+    
+    def start_search_thread(self):
+        """啟動背景全域搜尋執行緒"""
+        self.search_thread = SearchThread(self.db_manager, self)
+        self.search_thread.search_finished.connect(self.on_search_finished)
+        self.search_thread.start()
+    
     def apply_global_search(self, keyword):
-        """套用全域搜尋"""
+        """套用全域搜尋（有背景搜尋執行緒時在背景搜尋，完成後由 on_search_finished 套用）"""
+        if self.search_thread and self.search_thread.isRunning():
+            self.search_thread.submit(keyword, list(TABLE_DEFINITIONS))
+            return
+        
+        start = time.perf_counter()
         if self.cmd_tab:
             self.cmd_tab.apply_global_filter(keyword)
         if self.prompt_tab:
@@ -486,8 +835,44 @@ class MainWindow(QMainWindow):
         if self.web_site_tab:
             self.web_site_tab.apply_global_filter(keyword)
         
+        self.update_search_latency((time.perf_counter() - start) * 1000)
+        self.update_data_status()
+    
+    def on_search_finished(self, generation, scope, keyword, results, data_version, elapsed_ms):
+        """背景搜尋完成：每張資料表只套用最新一次的搜尋結果"""
+        label = "全域搜尋" if scope == GLOBAL_SCOPE else f"{scope} 分頁搜尋"
+        if data_version < 0:
+            self.logger.warning(f"{label}失敗: {keyword}")
+            return
+        
+        results = {table_name: records for table_name, records in results.items()
+                   if self.search_thread.is_current(generation, table_name)}
+        if not results:
+            return
+        
+        if data_version != self.db_manager.data_version:
+            # 搜尋期間資料有變動，以最新資料重新搜尋
+            self.search_thread.submit(keyword, list(results), scope=scope)
+            return
+        
+        for table_name, records in results.items():
+            tab = self.get_tab(TABLE_DEFINITIONS[table_name]['table_type'])
+            if tab:
+                tab.apply_search_results(keyword, records, data_version)
+        
+        if scope == GLOBAL_SCOPE:
+            self.update_search_latency(elapsed_ms)
+        else:
+            self.tab_search_cost.record(elapsed_ms)
         self.update_data_status()
     
+    def update_search_latency(self, elapsed_ms):
+        """記錄搜尋耗時並顯示於狀態列"""
+        self.search_cost.record(elapsed_ms)
+        self.search_latency_label.setText(
+            f"搜尋耗時: {elapsed_ms:.1f} ms（輸入延遲 {self.search_cost.debounce_ms()} ms）"
+        )
+    
     def on_global_search_clicked(self):
         """全域搜尋按鈕點擊"""
         keyword = self.global_search_input.text()
@@ -510,8 +895,16 @@ class MainWindow(QMainWindow):
     
     def on_tab_changed(self, index):
         """分頁切換事件"""
+        self.update_active_tab()
         self.update_data_status()
     
+    def update_active_tab(self):
+        """只有目前顯示的分頁即時繪製，其餘分頁延遲到切換時才更新"""
+        current_tab = self.tab_widget.currentWidget()
+        for tab in (self.cmd_tab, self.prompt_tab, self.win_program_tab, self.web_site_tab):
+            if tab:
+                tab.set_active(tab is current_tab)
+    
     def on_data_operation(self, operation, table_type, record=None):
         """處理資料操作"""
         if operation == 'edit':
@@ -537,6 +930,11 @@ class MainWindow(QMainWindow):
         if not current_tab:
             return
         
+        records = self.get_current_tab_records()
+        if len(records) > 1:
+            self.edit_classification(current_tab, records)
+            return
+        
         record = self.get_current_tab_record()
         if not record:
             QMessageBox.warning(self, "警告", "請先選擇要編輯的記錄")
@@ -559,12 +957,51 @@ class MainWindow(QMainWindow):
             data = dialog.get_data()
             self.execute_update_record(table_type, record.get('iSeqNo'), data)
     
+    def edit_classification(self, table_type, records):
+        """批次修改選取記錄的分類"""
+        table_name = self.get_table_name(table_type)
+        definition = TABLE_DEFINITIONS[table_name]
+        if 'Classification' not in definition['columns']:
+            QMessageBox.warning(self, "警告", f"{definition['label']}沒有分類欄位，一次只能編輯一筆記錄")
+            return
+        
+        # 既有分類供下拉選擇；選取的記錄分類都相同時預設顯示該分類
+        selected = {str(record.get('Classification', '')) for record in records}
+        # 背景重送日誌會在 cache_lock 中調整快取，先在鎖內複製記錄清單
+        with self.db_manager.cache_lock:
+            cached = self.db_manager.get_store(table_name).to_list()
+        existing = {str(record.get('Classification', '')) for record in cached}
+        classifications = sorted(value for value in existing | selected if value)
+        current = next(iter(selected)) if len(selected) == 1 else ""
+        
+        dialog = ClassificationDialog(self, len(records), classifications, current)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        classification = dialog.get_classification()
+        
+        self.log_operation("批次修改分類", table_type, data={'count': len(records), 'Classification': classification})
+        changes = {record['iSeqNo']: {'Classification': classification} for record in records}
+        self.execute_update_records(table_type, changes)
+    
     def on_delete_record(self):
         """刪除記錄"""
         current_tab = self.get_current_tab_type()
         if not current_tab:
             return
         
+        records = self.get_current_tab_records()
+        if len(records) > 1:
+            seq_nos = [record['iSeqNo'] for record in records]
+            self.log_operation("批次刪除", current_tab, data={'count': len(seq_nos)})
+            confirm_dialog = ConfirmDialog(
+                self,
+                "確認刪除",
+                f"確定要刪除選取的 {len(seq_nos)} 筆記錄嗎？"
+            )
+            if confirm_dialog.exec_() == QDialog.Accepted:
+                self.execute_delete_records(current_tab, seq_nos)
+            return
+        
         record = self.get_current_tab_record()
         if not record:
             QMessageBox.warning(self, "警告", "請先選擇要刪除的記錄")
@@ -595,14 +1032,14 @@ class MainWindow(QMainWindow):
             self.execute_export(current_tab, settings)
     
     def on_refresh_data(self):
-        """刷新資料"""
+        """刷新資料（只同步變動的記錄）"""
         if self.db_manager:
-            self.load_all_data()
+            self.load_all_data(incremental=True)
     
     def on_update_database(self):
-        """更新資料庫"""
+        """更新資料庫（只同步變動的記錄）"""
         if self.db_manager:
-            self.load_all_data()
+            self.load_all_data(incremental=True)
     
     def on_export_all_database(self):
         """匯出整個資料庫"""
@@ -610,16 +1047,17 @@ class MainWindow(QMainWindow):
             return
         
         # 從匯出對話框獲取文件路徑
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "匯出整個資料庫",
             f"cmdtools_database_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            "JSON 檔案 (*.json);;所有檔案 (*)"
+            ";;".join(BACKUP_EXPORT_FILTERS + ["所有檔案 (*)"])
         )
         
         if file_path:
-            if not file_path.endswith('.json'):
-                file_path += '.json'
+            if not file_path.endswith(BACKUP_EXTENSIONS):
+                extension = re.search(r'\(\*(\.[^ )]+)\)', selected_filter)
+                file_path += extension.group(1) if extension else '.json'
             self.execute_export_all_database(file_path)
     
     def on_import_database(self):
@@ -632,61 +1070,94 @@ class MainWindow(QMainWindow):
             self,
             "選擇要匯入的JSON檔案",
             "",
-            "JSON 檔案 (*.json);;所有檔案 (*)"
+            f"備份檔案 ({' '.join('*' + ext for ext in BACKUP_EXTENSIONS)});;所有檔案 (*)"
         )
         
         if file_path:
             self.execute_import_database(file_path)
     
     def execute_export_all_database(self, file_path):
-        """執行匯出整個資料庫"""
-        try:
-            self.update_status("正在匯出整個資料庫...")
-            
-            # 記錄日誌
-            self.log_operation("匯出整個資料庫", "all", data={'file_path': file_path})
-            
-            # 執行匯出
-            success, message = self.db_manager.export_all_database(file_path)
-            
-            if success:
-                QMessageBox.information(
-                    self,
-                    "匯出成功",
-                    f"整個資料庫已成功匯出至:\n{file_path}"
-                )
-                self.update_status("資料庫匯出完成")
-            else:
-                self.show_error_message(message)
-                
-        except Exception as e:
-            self.show_error_message(f"匯出整個資料庫時發生錯誤: {e}")
+        """執行匯出整個資料庫（在背景執行緒中自資料庫串流寫入檔案）"""
+        if self.is_busy():
+            return
+        
+        self.update_status("正在匯出整個資料庫...")
+        
+        # 記錄日誌
+        self.log_operation("匯出整個資料庫", "all", data={'file_path': file_path})
+        
+        # 執行匯出
+        self.start_backup_thread(
+            lambda progress: self.db_manager.export_all_database(file_path, progress),
+            lambda success, message: self.on_export_all_finished(success, message, file_path)
+        )
+    
+    def on_export_all_finished(self, success, message, file_path):
+        """背景匯出完成"""
+        self.progress_bar.setVisible(False)
+        self.set_loading_state(False)
+        
+        if success:
+            QMessageBox.information(
+                self,
+                "匯出成功",
+                f"整個資料庫已成功匯出至:\n{file_path}"
+            )
+            self.update_status("資料庫匯出完成")
+        else:
+            self.show_error_message(message)
     
     def execute_import_database(self, file_path):
-        """執行從JSON檔匯入資料庫"""
-        try:
-            self.update_status("正在匯入資料庫...")
-            
-            # 記錄日誌
-            self.log_operation("從JSON檔匯入資料庫", "all", data={'file_path': file_path})
-            
-            # 執行匯入
-            success, message = self.db_manager.import_from_json_file(file_path)
-            
-            if success:
-                QMessageBox.information(
-                    self,
-                    "匯入成功",
-                    message
-                )
-                # 重新載入資料
-                self.load_all_data()
-                self.update_status("資料庫匯入完成")
-            else:
-                self.show_error_message(message)
-                
-        except Exception as e:
-            self.show_error_message(f"匯入資料庫時發生錯誤: {e}")
+        """執行從JSON檔匯入資料庫（在背景執行緒中串流讀取檔案並批次寫入）"""
+        if self.is_busy():
+            return
+        
+        self.update_status("正在匯入資料庫...")
+        
+        # 記錄日誌
+        self.log_operation("從JSON檔匯入資料庫", "all", data={'file_path': file_path})
+        
+        # 執行匯入（完成後由 on_import_finished 重新載入資料）
+        self.start_backup_thread(
+            lambda progress: self.db_manager.import_from_json_file(file_path, progress, reload_cache=False),
+            self.on_import_finished
+        )
+    
+    def on_import_finished(self, success, message):
+        """背景匯入完成"""
+        self.progress_bar.setVisible(False)
+        self.set_loading_state(False)
+        
+        if success:
+            self.log_import_stats()
+            QMessageBox.information(
+                self,
+                "匯入成功",
+                message
+            )
+            # 重新載入資料
+            self.load_all_data()
+            self.update_status("資料庫匯入完成")
+        else:
+            self.show_error_message(message)
+    
+    def is_busy(self):
+        """是否有載入或備份作業進行中"""
+        return bool((self.load_thread and self.load_thread.isRunning())
+                    or (self.backup_thread and self.backup_thread.isRunning())
+                    or (self.replay_thread and self.replay_thread.isRunning()))
+    
+    def start_backup_thread(self, operation, finished_slot):
+        """在背景執行備份作業，期間停用會使用資料庫連線的按鈕並顯示進度"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.set_loading_state(True)
+        
+        self.backup_thread = BackupThread(operation, self)
+        self.backup_thread.progress_changed.connect(self.on_load_progress)
+        self.backup_thread.operation_finished.connect(finished_slot)
+        self.backup_thread.start()
     
     def execute_add_record(self, table_type, data):
         """執行新增記錄"""
@@ -707,6 +1178,7 @@ class MainWindow(QMainWindow):
             
             if success:
                 self.update_tab_data(table_type)
+                self.update_offline_status()
                 QMessageBox.information(self, "成功", message)
             else:
                 self.show_error_message(message)
@@ -733,6 +1205,7 @@ class MainWindow(QMainWindow):
             
             if success:
                 self.update_tab_data(table_type)
+                self.update_offline_status()
                 QMessageBox.information(self, "成功", message)
             else:
                 self.show_error_message(message)
@@ -759,6 +1232,7 @@ class MainWindow(QMainWindow):
             
             if success:
                 self.update_tab_data(table_type)
+                self.update_offline_status()
                 QMessageBox.information(self, "成功", message)
             else:
                 self.show_error_message(message)
@@ -766,31 +1240,68 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.show_error_message(f"刪除記錄時發生錯誤: {e}")
     
+    def execute_update_records(self, table_type, changes):
+        """執行批次更新記錄（單一交易，表格只更新一次）"""
+        if not self.db_manager:
+            return
+        
+        try:
+            success, message = self.db_manager.update_many(self.get_table_name(table_type), changes)
+            self.finish_batch_operation(table_type, list(changes), success, message)
+        except Exception as e:
+            self.show_error_message(f"批次更新記錄時發生錯誤: {e}")
+    
+    def execute_delete_records(self, table_type, seq_nos):
+        """執行批次刪除記錄（單一交易，表格只更新一次）"""
+        if not self.db_manager:
+            return
+        
+        try:
+            success, message = self.db_manager.delete_many(self.get_table_name(table_type), seq_nos)
+            self.finish_batch_operation(table_type, seq_nos, success, message)
+        except Exception as e:
+            self.show_error_message(f"批次刪除記錄時發生錯誤: {e}")
+    
+    def finish_batch_operation(self, table_type, seq_nos, success, message):
+        """批次操作完成：以增量方式更新表格一次（保留目前的搜尋條件）"""
+        if not success:
+            self.show_error_message(message)
+            return
+        
+        tab = self.get_tab(table_type)
+        if tab:
+            table_name = self.get_table_name(table_type)
+            tab.apply_delta(getattr(self.db_manager, TABLE_DEFINITIONS[table_name]['attr']), seq_nos)
+        self.search_hidden_tabs()
+        self.update_data_status()
+        self.update_offline_status()
+        QMessageBox.information(self, "成功", message)
+    
     def execute_export(self, table_type, settings):
         """執行匯出"""
         try:
             if table_type == 'cmd':
-                data = self.db_manager.cmd_tools_data
+                data = self.db_manager.get_all_records('CmdTools')
                 total_count = len(data)
                 filtered_count = self.cmd_tab.get_record_count_info()['current']
                 # 獲取篩選後資料
                 if settings['export_filtered']:
                     data = self.cmd_tab.table_widget.filtered_data
             elif table_type == 'prompt':
-                data = self.db_manager.prompt_tools_data
+                data = self.db_manager.get_all_records('PromptTools')
                 total_count = len(data)
                 filtered_count = self.prompt_tab.get_record_count_info()['current']
                 # 獲取篩選後資料
                 if settings['export_filtered']:
                     data = self.prompt_tab.table_widget.filtered_data
             elif table_type == 'winprogram':
-                data = self.db_manager.win_program_data
+                data = self.db_manager.get_all_records('WinProgram')
                 total_count = len(data)
                 filtered_count = self.win_program_tab.get_record_count_info()['current']
                 if settings['export_filtered']:
                     data = self.win_program_tab.table_widget.filtered_data
             elif table_type == 'website':
-                data = self.db_manager.web_site_data
+                data = self.db_manager.get_all_records('WebSite')
                 total_count = len(data)
                 filtered_count = self.web_site_tab.get_record_count_info()['current']
                 if settings['export_filtered']:
@@ -832,8 +1343,45 @@ class MainWindow(QMainWindow):
         elif table_type == 'website':
             self.web_site_tab.set_data(self.db_manager.web_site_data)
         
+        self.search_hidden_tabs()
         self.update_data_status()
     
+    def setup_search_providers(self):
+        """讓各分頁的全域搜尋改用 DatabaseManager 的搜尋索引"""
+        for table_name, definition in TABLE_DEFINITIONS.items():
+            tab = self.get_tab(definition['table_type'])
+            if tab:
+                tab.set_search_provider(
+                    lambda keyword, name=table_name: self.db_manager.search_records(name, keyword),
+                    lambda filters, name=table_name: self.db_manager.filter_records(name, filters),
+                    lambda: self.db_manager.data_version
+                )
+    
+    def setup_page_providers(self):
+        """資料量過大、未載入快取的資料表改為伺服器端分頁查詢"""
+        for table_name, definition in TABLE_DEFINITIONS.items():
+            tab = self.get_tab(definition['table_type'])
+            if not tab:
+                continue
+            if self.db_manager.is_server_side(table_name):
+                tab.set_page_provider(
+                    lambda keyword, after_seq_no, name=table_name:
+                        self.db_manager.query_records(name, keyword, after_seq_no=after_seq_no),
+                    self.db_manager.page_size
+                )
+                self.logger.info(f"{table_name} 共 {self.db_manager.get_total_count(table_name)} 筆，使用伺服器端查詢")
+            else:
+                tab.set_page_provider(None)
+    
+    def get_tab(self, table_type):
+        """依表格類型取得分頁"""
+        return {
+            'cmd': self.cmd_tab,
+            'prompt': self.prompt_tab,
+            'winprogram': self.win_program_tab,
+            'website': self.web_site_tab,
+        }.get(table_type)
+    
     def get_current_tab_type(self):
         """取得目前分頁類型"""
         current_index = self.tab_widget.currentIndex()
@@ -847,6 +1395,16 @@ class MainWindow(QMainWindow):
             return 'website'
         return None
     
+    def get_table_name(self, table_type):
+        """依表格類型取得資料表名稱"""
+        return next(name for name, definition in TABLE_DEFINITIONS.items()
+                    if definition['table_type'] == table_type)
+    
+    def get_current_tab_records(self):
+        """取得目前分頁所有選中的記錄"""
+        tab = self.get_tab(self.get_current_tab_type())
+        return tab.get_selected_records() if tab else []
+    
     def get_current_tab_record(self):
         """取得目前分頁選中的記錄"""
         current_tab = self.get_current_tab_type()
@@ -869,20 +1427,77 @@ class MainWindow(QMainWindow):
             self.connection_label.setText(f"連線狀態: {message}")
             self.connection_label.setStyleSheet("color: red;")
     
+    def get_record_count_info(self, table_type):
+        """
+        取得分頁的記錄數量資訊
+        
+        顯示中的分頁直接使用表格的數量；隱藏的分頁使用背景搜尋的結果，
+        尚無有效結果時顯示 ?（由 search_hidden_tabs 在背景搜尋）；
+        伺服器端查詢的資料表為已讀取的筆數，總數為資料庫記錄數
+        """
+        tab = self.get_tab(table_type)
+        if not tab:
+            return {'current': 0, 'total': 0}
+        if not self.db_manager:
+            return tab.get_record_count_info()
+        
+        table_name = self.get_table_name(table_type)
+        if self.db_manager.is_server_side(table_name):
+            total = self.db_manager.get_total_count(table_name)
+            if tab.is_dirty and tab.get_pending_results() is None:
+                if tab.get_current_keyword().strip():
+                    # 隱藏分頁尚未查詢，不為了統計數字查詢資料庫
+                    return {'current': '?', 'total': total}
+                page_size = self.db_manager.page_size
+                return {'current': min(total, page_size), 'total': total, 'more': total > page_size}
+            info = tab.get_record_count_info()
+            info['total'] = total
+            return info
+        if tab.is_active or not tab.is_dirty:
+            return tab.get_record_count_info()
+        
+        total = len(self.db_manager.get_store(table_name))
+        keyword = tab.get_current_keyword()
+        if not keyword.strip():
+            return {'current': total, 'total': total}
+        pending_results = tab.get_pending_results()
+        if pending_results is not None:
+            return {'current': len(pending_results), 'total': total}
+        # 背景搜尋（search_hidden_tabs）完成後 on_search_finished 會保留結果並更新統計
+        return {'current': '?', 'total': total}
+    
+    def search_hidden_tabs(self):
+        """資料變動後，在背景重新搜尋有關鍵字但沒有有效搜尋結果的隱藏分頁（不在 GUI 執行緒搜尋）"""
+        if not self.db_manager or not self.search_thread or not self.search_thread.isRunning():
+            return
+        for table_name, definition in TABLE_DEFINITIONS.items():
+            tab = self.get_tab(definition['table_type'])
+            if not tab or tab.is_active or not tab.is_dirty or self.db_manager.is_server_side(table_name):
+                continue
+            keyword = tab.get_current_keyword()
+            if keyword.strip() and tab.get_pending_results() is None:
+                self.search_thread.submit(keyword, [table_name], scope=table_name)
+    
     def update_data_status(self):
         """更新資料統計"""
-        cmd_info = self.cmd_tab.get_record_count_info() if self.cmd_tab else {'current': 0, 'total': 0}
-        prompt_info = self.prompt_tab.get_record_count_info() if self.prompt_tab else {'current': 0, 'total': 0}
-        win_program_info = self.win_program_tab.get_record_count_info() if self.win_program_tab else {'current': 0, 'total': 0}
-        web_site_info = self.web_site_tab.get_record_count_info() if self.web_site_tab else {'current': 0, 'total': 0}
+        cmd_info = self.get_record_count_info('cmd')
+        prompt_info = self.get_record_count_info('prompt')
+        win_program_info = self.get_record_count_info('winprogram')
+        web_site_info = self.get_record_count_info('website')
         
         self.data_label.setText(
-            f"命令工具: {cmd_info['current']}/{cmd_info['total']} | "
-            f"提示工具: {prompt_info['current']}/{prompt_info['total']} | "
-            f"Windows 程式: {win_program_info['current']}/{win_program_info['total']} | "
-            f"網站管理: {web_site_info['current']}/{web_site_info['total']}"
+            f"命令工具: {self.format_count(cmd_info)} | "
+            f"提示工具: {self.format_count(prompt_info)} | "
+            f"Windows 程式: {self.format_count(win_program_info)} | "
+            f"網站管理: {self.format_count(web_site_info)}"
         )
     
+    @staticmethod
+    def format_count(info):
+        """格式化記錄數量（伺服器端還有未讀取的符合記錄時加上 +）"""
+        more = '+' if info.get('more') else ''
+        return f"{info['current']}{more}/{info['total']}"
+    
     def update_status(self, message):
         """更新狀態列訊息"""
         self.status_bar.showMessage(message, 3000)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+記錄集合模組
+以 iSeqNo 為索引保存單一資料表的本地快取，提供 O(1) 查詢、更新與刪除，
+並可選擇以 __slots__ 精簡記錄取代 dict 以降低記憶體用量
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+# 長度不超過此值的字串會被 intern，讓重複的分類、備註等值共用同一物件
+INTERN_MAX_LENGTH = 64
+
+
+class CompactRecord(Mapping):
+    """
+    以 __slots__ 保存欄位值的精簡記錄
+
+    每張資料表由 make_record_class() 產生對應子類別，欄位名稱只存在類別上，
+    不再每列重複保存 dict 的雜湊表。提供 get()、[]、items()、copy()、update()
+    等與 dict 相容的介面，既有呼叫端（表格、編輯對話框）無需修改。
+    """
+
+    __slots__ = ()
+    _fields: tuple = ()
+    _field_set: frozenset = frozenset()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactRecord':
+        """由 dict 建立精簡記錄（缺少的欄位為空字串）"""
+        record = cls.__new__(cls)
+        for field in cls._fields:
+            setattr(record, field, _compact_value(data.get(field, "")))
+        return record
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._field_set:
+            raise KeyError(key)
+        setattr(self, key, _compact_value(value))
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def update(self, values: Dict):
+        """更新欄位值（與 dict.update 相同用法）"""
+        for key, value in values.items():
+            self[key] = value
+
+    def copy(self) -> Dict:
+        """轉為一般 dict"""
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.copy()!r})"
+
+
+def make_record_class(table_name: str, fields: Sequence[str]) -> Type[CompactRecord]:
+    """為指定資料表產生精簡記錄類別"""
+    return type(f"{table_name}Record", (CompactRecord,), {
+        '__slots__': tuple(fields),
+        '_fields': tuple(fields),
+        '_field_set': frozenset(fields),
+    })
+
+
+def record_to_json(value):
+    """json.dump 的 default 參數：將精簡記錄轉為 dict"""
+    if isinstance(value, CompactRecord):
+        return value.copy()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _compact_value(value):
+    """短字串 intern 以共用重複值"""
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+class RecordStore:
+    """
+    以 iSeqNo 為索引的記錄集合
+
+    內部使用 dict（保留插入順序）作為 iSeqNo -> 記錄 的索引，
+    因此查詢、更新與刪除皆為 O(1)，且迭代順序維持 iSeqNo 遞增。
+    為了相容既有呼叫端，支援 len()、迭代、copy() 與以位置存取（store[0]、store[-1]）。
+    """
+
+    def __init__(self, records: Iterable[Dict] = (), record_class: Optional[Type[CompactRecord]] = None):
+        """
+        初始化記錄集合
+
+        Args:
+            records: 依 iSeqNo 排序的記錄
+            record_class: 精簡記錄類別（None 表示直接保存 dict）
+        """
+        self.record_class = record_class
+        self._records: Dict[int, Dict] = {}
+        self.reset(records)
+
+    def _convert(self, record: Dict) -> Dict:
+        """依設定將記錄轉為精簡記錄"""
+        if self.record_class is None or isinstance(record, self.record_class):
+            return record
+        return self.record_class.from_dict(record)
+
+    def reset(self, records: Iterable[Dict]):
+        """以新的記錄取代全部內容"""
+        self._records = {record['iSeqNo']: self._convert(record) for record in records}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._records.values())
+
+    def __contains__(self, seq_no) -> bool:
+        return seq_no in self._records
+
+    def __getitem__(self, index):
+        """以位置存取記錄（首尾為 O(1)，其餘為 O(n)）"""
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index == 0 and self._records:
+            return next(iter(self._records.values()))
+        if index == -1 and self._records:
+            return next(reversed(self._records.values()))
+        return self.to_list()[index]
+
+    def __repr__(self) -> str:
+        return f"RecordStore({len(self._records)} records)"
+
+    def get(self, seq_no: int) -> Optional[Dict]:
+        """依序號取得記錄"""
+        return self._records.get(seq_no)
+
+    def add(self, record: Dict):
+        """加入記錄（新記錄的序號應大於現有序號，否則請改用 upsert_many）"""
+        self._records[record['iSeqNo']] = self._convert(record)
+
+    def update(self, seq_no: int, values: Dict) -> bool:
+        """更新記錄欄位，找不到記錄時回傳 False"""
+        record = self._records.get(seq_no)
+        if record is None:
+            return False
+        record.update(values)
+        return True
+
+    def remove(self, seq_no: int) -> Optional[Dict]:
+        """刪除記錄，回傳被刪除的記錄"""
+        return self._records.pop(seq_no, None)
+
+    def remove_many(self, seq_nos: Iterable[int]):
+        """刪除多筆記錄"""
+        for seq_no in seq_nos:
+            self._records.pop(seq_no, None)
+
+    def upsert_many(self, records: Iterable[Dict]):
+        """新增或更新多筆記錄，必要時重新依序號排序（只排序一次）"""
+        last_seq_no = next(reversed(self._records), None)
+        needs_sort = False
+        for record in records:
+            seq_no = record['iSeqNo']
+            existing = self._records.get(seq_no)
+            if existing is not None:
+                existing.update(record)
+                continue
+            if last_seq_no is not None and seq_no < last_seq_no:
+                needs_sort = True
+            self._records[seq_no] = self._convert(record)
+            last_seq_no = max(seq_no, last_seq_no) if last_seq_no is not None else seq_no
+
+        if needs_sort:
+            self._records = dict(sorted(self._records.items()))
+
+    def memory_usage(self) -> int:
+        """估算記錄集合佔用的位元組數（共用的值物件只計算一次）"""
+        total = sys.getsizeof(self._records)
+        seen = set()
+        for record in self._records.values():
+            total += sys.getsizeof(record)
+            for value in record.values():
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+        return total
+
+    def seq_nos(self) -> List[int]:
+        """取得所有序號"""
+        return list(self._records)
+
+    def to_list(self) -> List[Dict]:
+        """轉為記錄清單（記錄本身不複製）"""
+        return list(self._records.values())
+
+    def copy(self) -> List[Dict]:
+        """與 list.copy() 相容：回傳淺複製的記錄清單"""
+        return self.to_list()
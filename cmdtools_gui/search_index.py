@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+全文搜尋索引模組
+為每張資料表保存預先正規化的搜尋字串，並建立倒排索引（英數字詞 + 中日韓文字二元組），
+讓全域搜尋只需檢查候選記錄，而不必掃描所有記錄
+"""
+
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# 中日韓文字範圍（平假名、片假名、CJK 統一漢字與擴充 A、韓文、相容漢字）
+CJK_CHARS = '぀-ヿ㐀-䶿一-鿿가-힯豈-﫿'
+
+# 斷詞：連續的英數字（不含 CJK）為一個詞，連續的 CJK 文字另外切成一段
+WORD_PATTERN = re.compile(f'[^\\W{CJK_CHARS}]+')
+CJK_RUN_PATTERN = re.compile(f'[{CJK_CHARS}]+')
+TOKEN_PATTERN = re.compile(f'[^\\W{CJK_CHARS}]+|[{CJK_CHARS}]+')
+CJK_PATTERN = re.compile(f'[{CJK_CHARS}]')
+
+# 保留最近幾次搜尋結果（刪除字元回到先前的關鍵字時可直接沿用）
+SEARCH_CACHE_SIZE = 8
+
+# 單一英數字片段可能符合的記錄超過此比例時視為沒有鑑別度，改為直接逐筆比對
+UNSELECTIVE_RATIO = 0.5
+
+# 搜尋字串中的欄位分隔字元（使用者無法輸入，因此關鍵字不會跨欄位比對成功）
+FIELD_SEPARATOR = '\x1f'
+
+_EMPTY = frozenset()
+
+
+def normalize_text(value) -> str:
+    """搜尋用的正規化（與既有搜尋相同使用 str().lower()）"""
+    text = str(value)
+    lowered = text.lower()
+    # 內容本來就是小寫時沿用原字串，不另外佔用記憶體
+    return text if lowered == text else lowered
+
+
+def tokenize(text: str) -> Tuple[Set[str], Set[str]]:
+    """
+    將已正規化的文字切成索引詞
+
+    英數字以整個詞為單位；CJK 文字切成二元組（n-gram），
+    單獨出現的一個 CJK 字則以單字為單位。
+
+    Returns:
+        (英數字詞集合, CJK 索引詞集合)
+    """
+    words = set(WORD_PATTERN.findall(text))
+    cjk_tokens = set()
+    for run in CJK_RUN_PATTERN.findall(text):
+        if len(run) > 1:
+            cjk_tokens.update(map(str.__add__, run, run[1:]))
+        else:
+            cjk_tokens.add(run)
+    return words, cjk_tokens
+
+
+class SearchIndex:
+    """
+    單一資料表的搜尋索引
+
+    每筆記錄保存一份預先轉為小寫、以 \\x1f 串接各欄位的搜尋字串（全域搜尋用）
+    與各欄位轉為小寫後的值（單一欄位篩選用），搜尋時不必每次重新 str().lower()。
+    啟用倒排索引時，查詢先以索引找出候選記錄，再以子字串比對確認，
+    因此搜尋結果與逐筆 `keyword in str(value).lower()` 掃描完全一致。
+
+    連續輸入時新關鍵字通常包含先前的關鍵字（例如 "doc" -> "dock"），
+    此時只需在先前的結果中再篩選；資料變動後快取即失效。
+    """
+
+    def __init__(self, fields: Sequence[str], inverted: bool = True):
+        """
+        初始化搜尋索引
+
+        Args:
+            fields: 參與搜尋的欄位
+            inverted: 是否建立倒排索引（False 時只保存搜尋字串，查詢為逐筆比對）
+        """
+        self.fields = list(fields)
+        self.inverted = inverted
+        self._field_positions = {field: position for position, field in enumerate(self.fields)}
+        self._texts: Dict[int, str] = {}  # iSeqNo -> 正規化搜尋字串
+        self._values: Dict[int, Tuple[str, ...]] = {}  # iSeqNo -> 各欄位轉為小寫後的值
+        self._word_postings: Dict[str, Set[int]] = {}  # 英數字詞 -> iSeqNo 集合
+        self._cjk_postings: Dict[str, Set[int]] = {}  # CJK 二元組/單字 -> iSeqNo 集合
+        self._search_cache: 'OrderedDict[str, List[Dict]]' = OrderedDict()  # 最近的搜尋: 關鍵字 -> 結果
+
+    def record_text(self, record: Dict) -> str:
+        """取得記錄的正規化搜尋文字（以 \\x1f 分隔各欄位）"""
+        return FIELD_SEPARATOR.join(normalize_text(record.get(field, "")) for field in self.fields)
+
+    def build(self, records: Iterable[Dict]):
+        """重建整個索引"""
+        self._texts = {}
+        self._values = {}
+        self._search_cache.clear()
+        self._word_postings = {}
+        self._cjk_postings = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: Dict):
+        """將記錄加入索引（已存在時以新內容取代）"""
+        seq_no = record['iSeqNo']
+        if seq_no in self._texts:
+            self.remove(seq_no)
+        self._search_cache.clear()
+
+        values = tuple(normalize_text(record.get(field, "")) for field in self.fields)
+        text = FIELD_SEPARATOR.join(values)
+        self._texts[seq_no] = text
+        self._values[seq_no] = values
+
+        if self.inverted:
+            words, cjk_tokens = tokenize(text)
+            for postings, tokens in ((self._word_postings, words), (self._cjk_postings, cjk_tokens)):
+                for token in tokens:
+                    seq_nos = postings.get(token)
+                    if seq_nos is None:
+                        postings[token] = {seq_no}
+                    else:
+                        seq_nos.add(seq_no)
+
+    def remove(self, seq_no: int):
+        """將記錄自索引移除"""
+        text = self._texts.pop(seq_no, None)
+        self._values.pop(seq_no, None)
+        self._search_cache.clear()
+        if text is None or not self.inverted:
+            return
+
+        words, cjk_tokens = tokenize(text)
+        for postings, tokens in ((self._word_postings, words), (self._cjk_postings, cjk_tokens)):
+            for token in tokens:
+                seq_nos = postings.get(token)
+                if seq_nos is not None:
+                    seq_nos.discard(seq_no)
+                    if not seq_nos:
+                        del postings[token]
+
+    def candidates(self, keyword_lower: str) -> Optional[Set[int]]:
+        """
+        找出可能包含關鍵字的記錄序號
+
+        Returns:
+            候選序號集合；關鍵字不含任何可索引文字（例如只有標點符號）
+            或沒有鑑別度（例如單一英文字母）時回傳 None
+        """
+        result = None
+        # 較長的片段通常較有鑑別度，先處理可更早縮小候選範圍
+        for piece in sorted(TOKEN_PATTERN.findall(keyword_lower), key=len, reverse=True):
+            matched = self._piece_candidates(piece)
+            if matched is None:
+                continue
+            result = set(matched) if result is None else result & matched
+            if not result:
+                return set()
+        return result
+
+    def _piece_candidates(self, piece: str) -> Optional[Set[int]]:
+        """找出包含單一查詢片段的記錄序號（符合的記錄過多時回傳 None）"""
+        if CJK_PATTERN.match(piece):
+            if len(piece) > 1:
+                # 記錄中必須包含片段的每一個二元組
+                bigrams = [piece[i:i + 2] for i in range(len(piece) - 1)]
+                postings = sorted((self._cjk_postings.get(bigram, _EMPTY) for bigram in bigrams), key=len)
+                matched = set(postings[0])
+                for seq_nos in postings[1:]:
+                    matched &= seq_nos
+                return matched
+            vocabulary = self._cjk_postings
+        else:
+            vocabulary = self._word_postings
+
+        # 片段可能只是某個詞的一部分：掃描詞彙表（遠小於記錄數）
+        limit = len(self._texts) * UNSELECTIVE_RATIO
+        matched = set()
+        for token, seq_nos in vocabulary.items():
+            if piece in token:
+                matched |= seq_nos
+                if len(matched) > limit:
+                    return None
+        return matched
+
+    def search(self, keyword: str, records) -> List[Dict]:
+        """
+        搜尋所有搜尋欄位包含關鍵字的記錄
+
+        Args:
+            keyword: 搜尋關鍵字
+            records: 資料表的 RecordStore
+
+        Returns:
+            依序號排序的符合記錄
+        """
+        keyword_lower = keyword.lower()
+        results = self._search_cache.get(keyword_lower)
+        if results is not None:
+            self._search_cache.move_to_end(keyword_lower)
+            return list(results)
+
+        results = self._narrow_cached_search(keyword_lower)
+        if results is None:
+            results = self._search(keyword_lower, records)
+
+        self._search_cache[keyword_lower] = results
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return list(results)
+
+    def clear_cache(self):
+        """清除搜尋結果快取"""
+        self._search_cache.clear()
+
+    def _narrow_cached_search(self, keyword_lower: str) -> Optional[List[Dict]]:
+        """新關鍵字包含先前的關鍵字時，由先前（最少筆）的結果再篩選；無法沿用時回傳 None"""
+        if FIELD_SEPARATOR in keyword_lower:
+            return None
+        base = None
+        for cached_keyword, cached_results in self._search_cache.items():
+            if cached_keyword in keyword_lower and (base is None or len(cached_results) < len(base)):
+                base = cached_results
+        if base is None:
+            return None
+        texts = self._texts
+        return [record for record in base if keyword_lower in texts[record['iSeqNo']]]
+
+    def _search(self, keyword_lower: str, records) -> List[Dict]:
+        """以倒排索引（或逐筆比對）搜尋"""
+        candidate_seq_nos = self.candidates(keyword_lower) if self.inverted else None
+
+        if candidate_seq_nos is None:
+            # 無法使用索引，逐筆比對搜尋字串
+            return [record for record in records if self.matches(record, keyword_lower)]
+
+        if len(candidate_seq_nos) > len(self._texts) * UNSELECTIVE_RATIO:
+            # 候選記錄很多時依原順序比對，省去排序
+            texts = self._texts
+            return [record for record in records
+                    if record['iSeqNo'] in candidate_seq_nos and keyword_lower in texts[record['iSeqNo']]]
+
+        results = []
+        for seq_no in sorted(candidate_seq_nos):
+            record = records.get(seq_no)
+            if record is not None and self.matches(record, keyword_lower):
+                results.append(record)
+        return results
+
+    def filter(self, filters: Dict[str, str], records: Iterable[Dict]) -> List[Dict]:
+        """
+        單一欄位篩選：所有非空條件的欄位都須包含對應關鍵字（不分大小寫）
+
+        Args:
+            filters: {欄位名稱: 關鍵字}
+            records: 要篩選的記錄（須已加入索引，依原順序回傳）
+        """
+        filtered_data = list(records)
+        for field, keyword in filters.items():
+            if not keyword.strip():
+                continue
+            keyword_lower = keyword.lower()
+            position = self._field_positions.get(field)
+            if position is None:
+                # 非搜尋欄位（例如 iSeqNo）
+                filtered_data = [record for record in filtered_data
+                                 if keyword_lower in normalize_text(record.get(field, ""))]
+                continue
+            values = self._values
+            filtered_data = [record for record in filtered_data
+                             if keyword_lower in values[record['iSeqNo']][position]]
+        return filtered_data
+
+    def matches(self, record: Dict, keyword_lower: str) -> bool:
+        """確認記錄的任一搜尋欄位包含關鍵字"""
+        if FIELD_SEPARATOR in keyword_lower:
+            return False
+        text = self._texts.get(record['iSeqNo'])
+        if text is None:
+            text = self.record_text(record)
+        return keyword_lower in text
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+背景搜尋模組
+在工作執行緒中執行全域搜尋與各分頁的搜尋，輸入新的關鍵字時取消尚未完成的舊搜尋，
+每張資料表只將最新一次的搜尋結果交給 GUI 執行緒，輸入時不會卡頓；
+並依量測到的搜尋耗時調整搜尋框的延遲時間
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# 搜尋框延遲（毫秒）：尚未量測時的預設值與上下限
+DEBOUNCE_DEFAULT_MS = 200
+DEBOUNCE_MIN_MS = 30
+DEBOUNCE_MAX_MS = 600
+# 平均搜尋耗時低於此值（毫秒）時不延遲，輸入後立即搜尋
+INSTANT_SEARCH_MS = 1.0
+# 延遲時間為平均搜尋耗時的倍數
+DEBOUNCE_COST_FACTOR = 3
+# 搜尋耗時指數移動平均的權重（越大越快反映最近的耗時）
+SEARCH_COST_ALPHA = 0.3
+# 全域搜尋的搜尋範圍名稱（分頁搜尋以資料表名稱為範圍）
+GLOBAL_SCOPE = ''
+
+
+class SearchCostTracker:
+    """記錄全域搜尋耗時並計算搜尋框應延遲的時間"""
+
+    def __init__(self):
+        self.average_ms: Optional[float] = None  # 搜尋耗時的指數移動平均
+        self.last_ms: Optional[float] = None  # 最近一次搜尋耗時
+
+    def record(self, elapsed_ms: float):
+        """記錄一次搜尋耗時"""
+        self.last_ms = elapsed_ms
+        if self.average_ms is None:
+            self.average_ms = elapsed_ms
+        else:
+            self.average_ms += SEARCH_COST_ALPHA * (elapsed_ms - self.average_ms)
+
+    def debounce_ms(self) -> int:
+        """依最近的搜尋耗時決定延遲（搜尋很快時立即搜尋，搜尋越慢等待越久）"""
+        if self.average_ms is None:
+            return DEBOUNCE_DEFAULT_MS
+        if self.average_ms < INSTANT_SEARCH_MS:
+            return 0
+        return int(min(DEBOUNCE_MAX_MS, max(DEBOUNCE_MIN_MS, self.average_ms * DEBOUNCE_COST_FACTOR)))
+
+
+class SearchThread(QThread):
+    """
+    背景搜尋執行緒（常駐，每個搜尋範圍只保留最新的搜尋要求）
+
+    全域搜尋的範圍為 GLOBAL_SCOPE（所有資料表），分頁搜尋的範圍為該資料表；
+    每張資料表只採用最後送出、涵蓋該資料表的搜尋，因此新的全域搜尋會取代各分頁尚未完成的搜尋，
+    之後在分頁輸入的關鍵字也會取代全域搜尋對該資料表的結果。
+    """
+
+    # 定義信號
+    # 搜尋完成: (搜尋編號, 搜尋範圍, 關鍵字, {資料表名稱: 結果}, 資料版本, 耗時毫秒)
+    search_finished = pyqtSignal(int, str, str, dict, int, float)
+
+    def __init__(self, db_manager, parent=None):
+        """
+        初始化背景搜尋執行緒
+
+        Args:
+            db_manager: DatabaseManager 實例
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._condition = threading.Condition()
+        self._generation = 0  # 最新的搜尋編號（每次 submit 遞增）
+        self._latest: Dict[str, int] = {}  # 資料表名稱 -> 最後涵蓋該資料表的搜尋編號
+        # 尚未處理的搜尋要求（依送出順序）: 搜尋範圍 -> (搜尋編號, 關鍵字, 資料表名稱清單)
+        self._requests: Dict[str, tuple] = {}
+        self._stopped = False
+
+    def submit(self, keyword: str, table_names: Sequence[str], scope: str = GLOBAL_SCOPE) -> int:
+        """
+        送出搜尋要求（取代相同資料表尚未開始或進行中的舊要求）
+
+        Args:
+            keyword: 搜尋關鍵字
+            table_names: 要搜尋的資料表
+            scope: 搜尋範圍（GLOBAL_SCOPE 或分頁的資料表名稱）
+
+        Returns:
+            此次搜尋的編號
+        """
+        with self._condition:
+            self._generation += 1
+            table_names = list(table_names)
+            for table_name in table_names:
+                self._latest[table_name] = self._generation
+            # 已被完全取代的要求不必再處理
+            for pending_scope, request in list(self._requests.items()):
+                if all(self._latest[name] != request[0] for name in request[2]):
+                    del self._requests[pending_scope]
+            self._requests.pop(scope, None)
+            self._requests[scope] = (self._generation, keyword, table_names)
+            self._condition.notify()
+            return self._generation
+
+    def stop(self):
+        """停止執行緒（進行中的搜尋會在下一張資料表前中止）"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def is_current(self, generation: int, table_name: str) -> bool:
+        """搜尋結果是否仍是該資料表最新的搜尋（未被較新的要求取代）"""
+        with self._condition:
+            return self._latest.get(table_name) == generation and not self._stopped
+
+    def _current_tables(self, generation: int, table_names: Sequence[str]) -> List[str]:
+        """搜尋要求中尚未被取代的資料表"""
+        return [name for name in table_names if self.is_current(generation, name)]
+
+    def _next_request(self) -> Optional[tuple]:
+        """等待並取出最早送出的搜尋要求（停止時回傳 None）"""
+        with self._condition:
+            while not self._requests and not self._stopped:
+                self._condition.wait()
+            if self._stopped:
+                return None
+            scope = next(iter(self._requests))
+            return (scope,) + self._requests.pop(scope)
+
+    def run(self):
+        """執行緒主體：依序處理最新的搜尋要求"""
+        while True:
+            request = self._next_request()
+            if request is None:
+                return
+
+            scope, generation, keyword, table_names = request
+            data_version = self.db_manager.data_version
+            start = time.perf_counter()
+            results: Dict[str, list] = {}
+            try:
+                for table_name in table_names:
+                    # 已有較新關鍵字的資料表不必搜尋
+                    if self.is_current(generation, table_name):
+                        results[table_name] = self.db_manager.search_records(table_name, keyword)
+                results = {name: results[name] for name in self._current_tables(generation, results)}
+                if results:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    self.search_finished.emit(generation, scope, keyword, results, data_version, elapsed_ms)
+            except Exception:
+                # 搜尋失敗時以資料版本 -1 通知 GUI 執行緒
+                if self._current_tables(generation, table_names):
+                    self.search_finished.emit(generation, scope, keyword, {}, -1, 0.0)
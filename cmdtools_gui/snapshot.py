@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+本機快照模組
+將四張資料表的本地快取與增量同步狀態存成 config.json 旁的 SQLite 檔，
+下次啟動時先載入快照立即顯示，再於背景與 MySQL 同步；
+快照含格式版本、資料庫識別與各資料表的 SHA-256，不符時不使用；
+快照檔只允許目前使用者讀寫，密碼等機密欄位由呼叫端在儲存前移除
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+# 快照格式版本（格式改變時遞增，舊版快照不再使用）
+SNAPSHOT_VERSION = 2
+# 預設快照檔名（與 config.json 位於同一目錄）
+DEFAULT_SNAPSHOT_FILE = 'cmdtools_cache.sqlite'
+
+
+class SnapshotError(ValueError):
+    """快照不存在、版本不符或校驗失敗"""
+
+
+def _dumps(record: Dict) -> str:
+    """序列化單筆記錄（精簡記錄先轉為 dict）"""
+    return json.dumps(dict(record), ensure_ascii=False, separators=(',', ':'))
+
+
+class CacheSnapshot:
+    """
+    本地快取的 SQLite 快照
+
+    每次儲存都寫入新的暫存檔，完成後才取代舊快照，寫入中斷不會留下不完整的快照。
+    每張資料表記錄筆數、記錄 JSON 的 SHA-256 與同步狀態（CHECKSUM TABLE 校驗碼、最大 iSeqNo），
+    每列另存 MySQL 計算的雜湊值，載入後可直接進行增量同步；
+    沒有同步狀態的資料表（未啟用 IncrementalSync）載入後的同步狀態為 None，需完整重新載入。
+    伺服器端查詢的資料表沒有記錄，只保存校驗碼與記錄數（同步狀態含 'server_side' 與 'row_count'）。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        初始化快照
+
+        Args:
+            file_path: 快照檔路徑
+        """
+        self.file_path = file_path
+
+    def exists(self) -> bool:
+        """快照檔是否存在"""
+        return os.path.exists(self.file_path)
+
+    def save(self, identity: str, tables: Dict[str, Tuple[Iterable[Dict], Optional[Dict]]]) -> int:
+        """
+        儲存快照（取代既有快照）
+
+        Args:
+            identity: 資料庫識別（主機、連接埠與資料庫名稱），載入時須相同
+            tables: {資料表名稱: (記錄, 同步狀態)}；同步狀態含 'checksum'、'max_seq'、'row_hashes'，
+                伺服器端資料表為 'checksum'、'server_side' 與 'row_count'，沒有同步狀態時為 None
+
+        Returns:
+            寫入的記錄總數
+        """
+        temp_path = self.file_path + '.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        total = 0
+        # 先以 0600 權限建立檔案，SQLite 沿用既有檔案的權限
+        os.close(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript("""
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE tables (
+                    name TEXT PRIMARY KEY, row_count INTEGER NOT NULL, sha256 TEXT NOT NULL,
+                    synced INTEGER NOT NULL, checksum INTEGER, max_seq INTEGER, server_rows INTEGER
+                );
+                CREATE TABLE rows (
+                    table_name TEXT NOT NULL, seq_no INTEGER NOT NULL, data TEXT NOT NULL, row_hash TEXT,
+                    PRIMARY KEY (table_name, seq_no)
+                ) WITHOUT ROWID;
+            """)
+            connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                ('version', str(SNAPSHOT_VERSION)),
+                ('identity', identity),
+                ('saved_at', datetime.now().isoformat()),
+            ])
+
+            for table_name, (records, state) in tables.items():
+                server_side = bool(state and state.get('server_side'))
+                row_hashes = state['row_hashes'] if state and not server_side else {}
+                digest = hashlib.sha256()
+                params = []
+                for record in sorted(records, key=lambda record: record['iSeqNo']):
+                    data = _dumps(record)
+                    digest.update(data.encode('utf-8') + b'\n')
+                    params.append((table_name, record['iSeqNo'], data, row_hashes.get(record['iSeqNo'])))
+                connection.executemany(
+                    "INSERT INTO rows (table_name, seq_no, data, row_hash) VALUES (?, ?, ?, ?)", params)
+                connection.execute(
+                    "INSERT INTO tables (name, row_count, sha256, synced, checksum, max_seq, server_rows) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (table_name, len(params), digest.hexdigest(), state is not None,
+                     state['checksum'] if state else None, state.get('max_seq') if state else None,
+                     state['row_count'] if server_side else None))
+                total += len(params)
+
+            connection.commit()
+        except Exception:
+            connection.close()
+            os.remove(temp_path)
+            raise
+        connection.close()
+
+        os.replace(temp_path, self.file_path)
+        return total
+
+    def load(self, identity: str) -> Tuple[Dict[str, Tuple[list, Optional[Dict]]], str]:
+        """
+        載入並驗證快照
+
+        Args:
+            identity: 目前的資料庫識別（與儲存時不同則不使用快照）
+
+        Returns:
+            ({資料表名稱: (依 iSeqNo 排序的記錄, 同步狀態或 None)}, 儲存時間)
+
+        Raises:
+            SnapshotError: 快照不存在、版本或資料庫不符、校驗失敗
+        """
+        if not self.exists():
+            raise SnapshotError("沒有本機快照")
+
+        try:
+            connection = sqlite3.connect(f"file:{self.file_path}?mode=ro", uri=True)
+        except sqlite3.Error as e:
+            raise SnapshotError(f"無法開啟本機快照: {e}") from e
+
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+            if meta.get('version') != str(SNAPSHOT_VERSION):
+                raise SnapshotError(f"本機快照版本不符: {meta.get('version')}")
+            if meta.get('identity') != identity:
+                raise SnapshotError("本機快照屬於其他資料庫")
+
+            tables = {}
+            for name, row_count, expected, synced, checksum, max_seq, server_rows in connection.execute(
+                    "SELECT name, row_count, sha256, synced, checksum, max_seq, server_rows FROM tables").fetchall():
+                digest = hashlib.sha256()
+                records = []
+                row_hashes = {}
+                for seq_no, data, row_hash in connection.execute(
+                        "SELECT seq_no, data, row_hash FROM rows WHERE table_name = ? ORDER BY seq_no", (name,)):
+                    digest.update(data.encode('utf-8') + b'\n')
+                    records.append(json.loads(data))
+                    if row_hash is not None:
+                        row_hashes[seq_no] = row_hash
+                if len(records) != row_count or digest.hexdigest() != expected:
+                    raise SnapshotError(f"本機快照校驗失敗: {name}")
+
+                if not synced:
+                    state = None
+                elif server_rows is not None:
+                    state = {'checksum': checksum, 'server_side': True, 'row_count': server_rows}
+                else:
+                    state = {'checksum': checksum, 'max_seq': max_seq, 'row_hashes': row_hashes}
+                tables[name] = (records, state)
+            return tables, meta.get('saved_at', '')
+
+        except sqlite3.Error as e:
+            raise SnapshotError(f"本機快照格式不正確: {e}") from e
+        finally:
+            connection.close()
+
+    def remove(self):
+        """刪除快照"""
+        if self.exists():
+            os.remove(self.file_path)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+表格資料模型模組
+以 QAbstractTableModel 直接顯示本地快取中的記錄，
+不為每個儲存格建立 QTableWidgetItem，繪製成本只與可見列數有關；
+伺服器端查詢模式下捲動到底部時才向資料庫讀取下一頁
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    記錄表格模型
+
+    模型只保存目前要顯示的記錄參考清單（篩選結果），記錄本身與本地快取共用；
+    篩選時只需替換這份清單並發出 layoutChanged。
+    """
+
+    def __init__(self, fields: Sequence[str], headers: Sequence[str], parent=None):
+        """
+        初始化表格模型
+
+        Args:
+            fields: 各欄對應的記錄欄位
+            headers: 各欄標題
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.fields = list(fields)
+        self.headers = list(headers)
+        self._records: List[Dict] = []
+        # 分頁模式：讀取下一頁的函式 (上一頁最後的 iSeqNo) -> 記錄清單
+        self._fetch_page: Optional[Callable[[int], List[Dict]]] = None
+        self._page_size = 0
+        self._has_more = False
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.fields)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return str(self._records[index.row()].get(self.fields[index.column()], ''))
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more and self._fetch_page is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """讀取下一頁並附加在最後（讀取失敗時停止分頁）"""
+        if not self.canFetchMore(parent):
+            return
+        after_seq_no = self._records[-1]['iSeqNo'] if self._records else 0
+        try:
+            page = self._fetch_page(after_seq_no)
+        except Exception:
+            self._has_more = False
+            return
+
+        self._has_more = len(page) >= self._page_size
+        if page:
+            start = len(self._records)
+            self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+            self._records.extend(page)
+            self.endInsertRows()
+
+    def has_more(self) -> bool:
+        """分頁模式下是否還有尚未讀取的記錄"""
+        return self._has_more
+
+    def records(self) -> List[Dict]:
+        """取得目前顯示的記錄"""
+        return self._records
+
+    def record_at(self, row: int) -> Optional[Dict]:
+        """取得指定列的記錄"""
+        if 0 <= row < len(self._records):
+            return self._records[row]
+        return None
+
+    def set_records(self, records: List[Dict]):
+        """
+        替換顯示的記錄清單
+
+        以 layoutChanged 通知檢視更新，並依 iSeqNo 將選取狀態等持久索引對應到新位置，
+        篩選後仍顯示的記錄會保持選取。
+        """
+        self.layoutAboutToBeChanged.emit()
+
+        self._fetch_page = None
+        self._has_more = False
+        old_records = self._records
+        self._records = records
+
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_rows = {record['iSeqNo']: row for row, record in enumerate(records)}
+            new_indexes = []
+            for index in persistent:
+                row = new_rows.get(old_records[index.row()]['iSeqNo']) if index.row() < len(old_records) else None
+                new_indexes.append(QModelIndex() if row is None else self.index(row, index.column()))
+            self.changePersistentIndexList(persistent, new_indexes)
+
+        self.layoutChanged.emit()
+
+    def set_paged_records(self, first_page: List[Dict], fetch_page: Callable[[int], List[Dict]], page_size: int):
+        """
+        以分頁模式顯示記錄：先顯示第一頁，檢視捲動到底部時再以 fetch_page 讀取下一頁
+
+        Args:
+            first_page: 第一頁記錄（之後讀取的頁面會附加在這份清單）
+            fetch_page: (上一頁最後的 iSeqNo) -> 下一頁記錄
+            page_size: 每頁筆數（讀到不足一頁時視為已到最後）
+        """
+        self.set_records(first_page)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._has_more = len(first_page) >= page_size
+
+    def refresh_records(self, seq_nos: Sequence[int]):
+        """通知檢視重新繪製指定記錄（記錄內容就地修改後呼叫）"""
+        targets = set(seq_nos)
+        rows = [row for row, record in enumerate(self._records) if record['iSeqNo'] in targets]
+        if rows:
+            last_column = len(self.fields) - 1
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), last_column))
@@ -5,12 +5,12 @@
 """
 
 from PyQt5.QtWidgets import (
-    QTableWidget, QTableWidgetItem, QHeaderView, QWidget,
+    QTableView, QAbstractItemView, QHeaderView, QWidget,
     QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
     QLabel, QGroupBox, QMessageBox, QFileDialog
 )
 from PyQt5.QtCore import Qt, pyqtSignal
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 import subprocess
 import os
 import platform
@@ -19,6 +19,30 @@ import urllib.parse
 import time
 import webbrowser
 
+from .column_widths import column_width_engine
+from .table_model import RecordTableModel
+
+
+# 各表格類型的顯示欄位（依欄位順序，CmdTools 已移除 remark2）
+TABLE_FIELDS = {
+    'cmd': ['iSeqNo', 'cmd', 'example', 'remark1', 'Classification'],
+    'prompt': ['iSeqNo', 'Prompt', 'Prompt_Eng', 'Classification'],
+    'winprogram': ['iSeqNo', 'remark1', 'ProgramPathAndName', 'ClickEndRun'],
+    'website': ['iSeqNo', 'Remark', 'Classification', 'Website', 'account',
+                'account_webid', 'password', 'password_webid'],
+}
+
+# 各表格類型的欄位標題
+TABLE_HEADERS = {
+    'cmd': ["序號", "命令", "範例", "備註1", "類型"],
+    'prompt': ["序號", "提示", "提示英文", "分類"],
+    'winprogram': ["序號", "備註1", "程式路徑", "點擊結束執行"],
+    'website': ["序號", "備註", "分類", "網站", "帳號", "帳號ID", "密碼", "密碼ID"],
+}
+
+# 全域搜尋時各表格類型搜尋的欄位（序號除外的所有欄位）
+SEARCHABLE_FIELDS = {table_type: fields[1:] for table_type, fields in TABLE_FIELDS.items()}
+
 
 class FilterWidget(QWidget):
     """簡化後的單一搜尋框篩選控制項組件"""
@@ -80,12 +104,13 @@ class FilterWidget(QWidget):
         self.search_callback = callback
 
 
-class DataTableWidget(QTableWidget):
-    """資料表格組件"""
+class DataTableWidget(QTableView):
+    """資料表格組件（以 RecordTableModel 顯示記錄）"""
     
     # 定義信號
     item_double_clicked = pyqtSignal(int, str)  # 雙擊事件: (行號, 表格類型)
     selection_changed = pyqtSignal()  # 選擇變化事件
+    page_fetched = pyqtSignal()  # 伺服器端查詢模式讀取下一頁完成
     
     def __init__(self, parent=None, table_type="cmd"):
         """
@@ -99,60 +124,55 @@ class DataTableWidget(QTableWidget):
         self.table_type = table_type
         self.original_data = []  # 原始資料
         self.filtered_data = []  # 篩選後資料
+        self.current_keyword = ""  # 目前套用的搜尋關鍵字
+        self.search_provider = None  # 全域搜尋函式 (keyword) -> 記錄清單，例如以搜尋索引查詢
+        self.filter_provider = None  # 單一欄位篩選函式 (filters) -> 記錄清單
+        self.page_provider = None  # 伺服器端分頁查詢 (keyword, after_seq_no) -> 一頁記錄；設定時不使用本地資料
+        self.page_size = 0
+        self.applied_column_widths = None  # 目前套用的欄寬（未改變時不重新設定）
+        self.table_model = RecordTableModel(
+            TABLE_FIELDS.get(table_type, ['iSeqNo']),
+            TABLE_HEADERS.get(table_type, ["序號"]),
+            self
+        )
         
         self.init_ui()
         self.setup_connections()
     
     def init_ui(self):
         """初始化 UI"""
+        self.setModel(self.table_model)
+        
         # 設置表格基本屬性
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
-        self.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
-        self.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
-        
-        # 設置表頭
-        if self.table_type == 'cmd':
-            self.setColumnCount(5)
-            headers = ["序號", "命令", "範例", "備註1", "類型"]
-        elif self.table_type == 'prompt':
-            self.setColumnCount(4)
-            headers = ["序號", "提示", "提示英文", "分類"]
-        elif self.table_type == 'winprogram':
-            self.setColumnCount(4)
-            headers = ["序號", "備註1", "程式路徑", "點擊結束執行"]
-        elif self.table_type == 'website':
-            self.setColumnCount(8)
-            headers = ["序號", "備註", "分類", "網站", "帳號", "帳號ID", "密碼", "密碼ID"]
-        else:
-            self.setColumnCount(1)
-            headers = ["序號"]
-        
-        self.setHorizontalHeaderLabels(headers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # 可用 Ctrl/Shift 選取多筆記錄進行批次刪除或修改分類
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
         
         # 設置表頭樣式
         header = self.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
         header.setStretchLastSection(True)
         
-        # 自動調整欄寬
-        self.resizeColumnsToContents()
+        # 依表頭設定初始欄寬
+        self.update_column_widths()
         
         # 設置最小高度
         self.setMinimumHeight(300)
     
     def setup_connections(self):
         """設置信號連接"""
-        self.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.itemSelectionChanged.connect(self.on_selection_changed)
+        self.doubleClicked.connect(self.on_item_double_clicked)
+        self.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.table_model.rowsInserted.connect(lambda parent, first, last: self.page_fetched.emit())
     
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """處理雙擊事件"""
-        row = item.row()
-        self.item_double_clicked.emit(row, self.table_type)
+        self.item_double_clicked.emit(index.row(), self.table_type)
     
-    def on_selection_changed(self):
+    def on_selection_changed(self, selected=None, deselected=None):
         """處理選擇變化事件"""
         self.selection_changed.emit()
     
@@ -164,49 +184,63 @@ class DataTableWidget(QTableWidget):
             data: 資料清單
         """
         self.original_data = data.copy()
-        self.filtered_data = data.copy()
+        self.current_keyword = ""
+        self.filtered_data = self.filter_records("") if self.page_provider is not None else data.copy()
         self.update_table()
     
     def update_table(self):
-        """更新表格顯示"""
-        self.setRowCount(len(self.filtered_data))
-        
-        for row, record in enumerate(self.filtered_data):
-            if self.table_type == 'cmd':
-                # CmdTools 表格（已移除 remark2 欄位）
-                self.setItem(row, 0, QTableWidgetItem(str(record.get('iSeqNo', ''))))
-                self.setItem(row, 1, QTableWidgetItem(str(record.get('cmd', ''))))
-                self.setItem(row, 2, QTableWidgetItem(str(record.get('example', ''))))
-                self.setItem(row, 3, QTableWidgetItem(str(record.get('remark1', ''))))
-                self.setItem(row, 4, QTableWidgetItem(str(record.get('Classification', ''))))
-            elif self.table_type == 'prompt':
-                # PromptTools 表格
-                self.setItem(row, 0, QTableWidgetItem(str(record.get('iSeqNo', ''))))
-                self.setItem(row, 1, QTableWidgetItem(str(record.get('Prompt', ''))))
-                self.setItem(row, 2, QTableWidgetItem(str(record.get('Prompt_Eng', ''))))
-                self.setItem(row, 3, QTableWidgetItem(str(record.get('Classification', ''))))
-            elif self.table_type == 'winprogram':
-                # WinProgram 表格
-                self.setItem(row, 0, QTableWidgetItem(str(record.get('iSeqNo', ''))))
-                self.setItem(row, 1, QTableWidgetItem(str(record.get('remark1', ''))))
-                self.setItem(row, 2, QTableWidgetItem(str(record.get('ProgramPathAndName', ''))))
-                self.setItem(row, 3, QTableWidgetItem(str(record.get('ClickEndRun', ''))))
-            elif self.table_type == 'website':
-                # WebSite 表格
-                self.setItem(row, 0, QTableWidgetItem(str(record.get('iSeqNo', ''))))
-                self.setItem(row, 1, QTableWidgetItem(str(record.get('Remark', ''))))
-                self.setItem(row, 2, QTableWidgetItem(str(record.get('Classification', ''))))
-                self.setItem(row, 3, QTableWidgetItem(str(record.get('Website', ''))))
-                self.setItem(row, 4, QTableWidgetItem(str(record.get('account', ''))))
-                self.setItem(row, 5, QTableWidgetItem(str(record.get('account_webid', ''))))
-                self.setItem(row, 6, QTableWidgetItem(str(record.get('password', ''))))
-                self.setItem(row, 7, QTableWidgetItem(str(record.get('password_webid', ''))))
+        """更新表格顯示（只替換模型的記錄清單，由檢視繪製可見列）"""
+        self.show_filtered_data()
         
         # 更新表格標題
         self.update_table_title()
         
-        # 自動調整欄寬
-        self.resizeColumnsToContents()
+        # 調整欄寬（抽樣量測並快取，不量測所有儲存格）
+        self.update_column_widths()
+    
+    def show_filtered_data(self):
+        """將篩選結果交給模型（伺服器端查詢模式下捲動到底部時再讀取下一頁）"""
+        if self.page_provider is None:
+            self.table_model.set_records(self.filtered_data)
+            return
+        keyword = self.current_keyword
+        self.table_model.set_paged_records(
+            self.filtered_data,
+            lambda after_seq_no: self.page_provider(keyword, after_seq_no),
+            self.page_size
+        )
+    
+    def update_column_widths(self):
+        """依完整資料的抽樣估算並套用欄寬（資料規模未改變時沿用快取）"""
+        widths = column_width_engine.get_widths(
+            self.table_type,
+            self.original_data if self.page_provider is None else self.filtered_data,
+            self.table_model.fields,
+            self.table_model.headers,
+            self.fontMetrics(),
+            self.horizontalHeader().fontMetrics()
+        )
+        if widths == self.applied_column_widths:
+            # 保留使用者手動調整的欄寬
+            return
+        for column, width in enumerate(widths):
+            self.setColumnWidth(column, width)
+        self.applied_column_widths = widths
+    
+    def apply_delta(self, data: List[Dict], changed_seq_nos: List[int]):
+        """
+        資料部分變動時更新表格（記錄已就地更新，只需重新篩選並通知檢視）
+        
+        Args:
+            data: 更新後的完整資料清單
+            changed_seq_nos: 新增、修改或刪除的記錄序號
+        """
+        self.original_data = data.copy()
+        self.filtered_data = self.filter_records(self.current_keyword)
+        self.show_filtered_data()
+        self.table_model.refresh_records(changed_seq_nos)
+        self.update_table_title()
+        self.update_column_widths()
     
     def update_table_title(self):
         """更新表格標題"""
@@ -219,6 +253,16 @@ class DataTableWidget(QTableWidget):
         Args:
             filters: 篩選條件字典
         """
+        if self.filter_provider is not None:
+            self.filtered_data = list(self.filter_provider(filters))
+            if self.page_provider is not None:
+                # 伺服器端查詢模式只顯示符合篩選條件的第一頁
+                self.table_model.set_records(self.filtered_data)
+                self.update_table_title()
+                return
+            self.update_table()
+            return
+        
         self.filtered_data = self.original_data.copy()
         
         for field, keyword in filters.items():
@@ -239,51 +283,103 @@ class DataTableWidget(QTableWidget):
             keyword: 搜尋關鍵字
             table_type: 表格類型（用於判斷搜尋範圍）
         """
+        self.current_keyword = keyword
+        self.filtered_data = self.filter_records(keyword)
+        self.update_table()
+    
+    def set_search_provider(self, provider: Optional[Callable[[str], List[Dict]]],
+                            filter_provider: Optional[Callable[[Dict[str, str]], List[Dict]]] = None):
+        """
+        設定搜尋函式（結果須與原始資料一致）；None 表示逐筆掃描
+        
+        Args:
+            provider: 傳入關鍵字、回傳符合記錄的全域搜尋函式
+            filter_provider: 傳入 {欄位: 關鍵字}、回傳符合記錄的單一欄位篩選函式
+        """
+        self.search_provider = provider
+        self.filter_provider = filter_provider
+    
+    def set_page_provider(self, provider: Optional[Callable[[str, int], List[Dict]]], page_size: int = 0):
+        """
+        設定伺服器端分頁查詢（None 表示使用本地資料）
+        
+        Args:
+            provider: 傳入 (關鍵字, 上一頁最後的 iSeqNo)、回傳下一頁記錄的查詢函式
+            page_size: 每頁筆數
+        """
+        self.page_provider = provider
+        self.page_size = page_size
+    
+    def is_server_side(self) -> bool:
+        """是否為伺服器端查詢模式"""
+        return self.page_provider is not None
+    
+    def apply_search_results(self, keyword: str, records: List[Dict]):
+        """
+        套用已完成的全域搜尋結果（例如背景搜尋執行緒的結果）
+        
+        Args:
+            keyword: 搜尋關鍵字
+            records: 符合的記錄
+        """
+        self.current_keyword = keyword
+        self.filtered_data = list(records)
+        self.update_table()
+    
+    def filter_records(self, keyword: str) -> List[Dict]:
+        """依關鍵字篩選原始資料（搜尋所有可搜尋欄位；伺服器端查詢模式回傳第一頁）"""
+        if self.page_provider is not None:
+            return list(self.page_provider(keyword, 0))
+        
         if not keyword.strip():
             # 關鍵字為空時顯示所有資料
-            self.filtered_data = self.original_data.copy()
-        else:
-            keyword_lower = keyword.lower()
-            
-            if self.table_type == 'cmd':
-                # CmdTools 全域搜尋：搜尋所有欄位（已移除 remark2）
-                searchable_fields = ['cmd', 'example', 'remark1', 'Classification']
-            elif self.table_type == 'prompt':
-                # PromptTools 全域搜尋：搜尋所有欄位
-                searchable_fields = ['Prompt', 'Prompt_Eng', 'Classification']
-            elif self.table_type == 'winprogram':
-                # WinProgram 全域搜尋：搜尋所有欄位
-                searchable_fields = ['remark1', 'ProgramPathAndName', 'ClickEndRun']
-            elif self.table_type == 'website':
-                # WebSite 全域搜尋：搜尋所有欄位
-                searchable_fields = ['Remark', 'Classification', 'Website', 'account', 'account_webid', 'password', 'password_webid']
-            else:
-                searchable_fields = []
-            
-            self.filtered_data = [
-                record for record in self.original_data
-                if any(keyword_lower in str(record.get(field, "")).lower()
-                      for field in searchable_fields)
-            ]
+            return self.original_data.copy()
         
-        self.update_table()
+        if self.search_provider is not None:
+            return list(self.search_provider(keyword))
+        
+        keyword_lower = keyword.lower()
+        searchable_fields = SEARCHABLE_FIELDS.get(self.table_type, [])
+        
+        return [
+            record for record in self.original_data
+            if any(keyword_lower in str(record.get(field, "")).lower()
+                  for field in searchable_fields)
+        ]
+    
+    def currentRow(self) -> int:
+        """取得目前選中的列（與 QTableWidget.currentRow 相容，優先使用已選取的列）"""
+        selected_rows = self.selectionModel().selectedRows()
+        if selected_rows:
+            return selected_rows[0].row()
+        return self.currentIndex().row()
     
     def get_current_record(self) -> Dict:
         """取得目前選中的記錄"""
-        current_row = self.currentRow()
-        if 0 <= current_row < len(self.filtered_data):
-            return self.filtered_data[current_row].copy()
-        return {}
+        record = self.table_model.record_at(self.currentRow())
+        return record.copy() if record is not None else {}
     
     def get_selected_seq_no(self) -> int:
         """取得選中記錄的序號"""
         record = self.get_current_record()
         return record.get('iSeqNo', 0)
     
+    def get_selected_records(self) -> List[Dict]:
+        """取得所有選中的記錄（依顯示順序；以選取範圍計算，不逐一建立索引）"""
+        rows = set()
+        for selection_range in self.selectionModel().selection():
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        records = (self.table_model.record_at(row) for row in sorted(rows))
+        return [record.copy() for record in records if record is not None]
+    
     def get_record_count(self) -> int:
-        """取得目前顯示記錄數量"""
+        """取得目前顯示記錄數量（伺服器端查詢模式為已讀取的筆數）"""
         return len(self.filtered_data)
     
+    def has_more_records(self) -> bool:
+        """伺服器端查詢模式下是否還有尚未讀取的符合記錄"""
+        return self.table_model.has_more()
+    
     def get_total_count(self) -> int:
         """取得總記錄數量"""
         return len(self.original_data)
@@ -304,6 +400,16 @@ class TableTabWidget(QWidget):
         self.table_type = table_type
         self.data_callback = None  # 資料操作回調函數
         self.table_title_label = None
+        self.search_scheduler = None  # 搜尋框的搜尋排程（None 表示每次輸入立即篩選）
+        
+        # 延遲繪製：分頁隱藏時只記錄待套用的資料與關鍵字，切換到此分頁時才重新篩選與繪製
+        self.is_active = True
+        self.is_dirty = False
+        self.pending_data = None  # 待套用的完整資料（None 表示資料未變動）
+        self.pending_keyword = None  # 待套用的搜尋關鍵字（None 表示沿用目前關鍵字）
+        self.pending_results = None  # 待套用的背景搜尋結果（伺服器端查詢模式為第一頁；避免顯示時重新搜尋）
+        self.pending_results_version = None  # 待套用搜尋結果對應的資料版本（None 表示不檢查）
+        self.version_provider = None  # 取得目前資料版本的函式，判斷待套用的搜尋結果是否仍有效
         
         self.init_ui()
     
@@ -651,11 +757,23 @@ class TableTabWidget(QWidget):
     def on_field_search(self, keyword):
         """
         處理單一搜尋框搜尋
-        這個函數現在處理全欄位搜尋，與前端行為一致
+        這個函數現在處理全欄位搜尋，與前端行為一致；
+        設定搜尋排程後交由排程延遲合併搜尋，否則立即篩選
         """
+        if self.search_scheduler:
+            self.search_scheduler(keyword)
+        else:
+            self.apply_field_search(keyword)
+    
+    def apply_field_search(self, keyword):
+        """立即以搜尋框的關鍵字篩選表格"""
         if self.table_widget:
             self.table_widget.apply_global_filter(keyword)
     
+    def set_search_scheduler(self, scheduler: Optional[Callable[[str], None]]):
+        """設定搜尋框的搜尋排程（例如 MainWindow 的背景搜尋），None 表示每次輸入立即篩選"""
+        self.search_scheduler = scheduler
+    
     def create_export_import_buttons(self, layout):
         """創建匯出/匯入按鈕"""
         button_layout = QHBoxLayout()
@@ -759,21 +877,121 @@ class TableTabWidget(QWidget):
         if self.data_callback:
             self.data_callback('edit', self.table_type, self.table_widget.get_current_record())
     
+    def set_active(self, active: bool):
+        """設定分頁是否為目前顯示的分頁（切換為顯示時套用延遲的變動）"""
+        self.is_active = active
+        if active:
+            self.flush_pending()
+    
+    def flush_pending(self):
+        """套用分頁隱藏期間累積的資料與搜尋變動（只重新篩選與繪製一次）"""
+        if not self.is_dirty or not self.table_widget:
+            return
+        
+        if self.pending_data is not None:
+            self.table_widget.original_data = self.pending_data.copy()
+        if self.pending_keyword is not None:
+            self.table_widget.current_keyword = self.pending_keyword
+        pending_results = self.get_pending_results()
+        if pending_results is not None:
+            self.table_widget.filtered_data = pending_results
+        else:
+            self.table_widget.filtered_data = self.table_widget.filter_records(self.table_widget.current_keyword)
+        self.table_widget.update_table()
+        
+        self.is_dirty = False
+        self.pending_data = None
+        self.pending_keyword = None
+        self.pending_results = None
+        self.pending_results_version = None
+    
+    def get_pending_results(self) -> Optional[List[Dict]]:
+        """取得仍有效的待套用搜尋結果（搜尋後資料已變動時回傳 None）"""
+        if self.pending_results is None:
+            return None
+        if (self.pending_results_version is not None and self.version_provider is not None
+                and self.version_provider() != self.pending_results_version):
+            return None
+        return self.pending_results
+    
+    def get_current_keyword(self) -> str:
+        """取得目前（或待套用）的搜尋關鍵字"""
+        if self.pending_keyword is not None:
+            return self.pending_keyword
+        return self.table_widget.current_keyword if self.table_widget else ""
+    
     def set_data(self, data: List[Dict]):
         """設定表格資料"""
+        if not self.is_active:
+            # 與 DataTableWidget.set_data 相同：重設資料時清除搜尋條件
+            self.pending_data = data
+            self.pending_keyword = ""
+            self.pending_results = None
+            self.is_dirty = True
+            return
         if self.table_widget:
             self.table_widget.set_data(data)
     
+    def apply_delta(self, data: List[Dict], changed_seq_nos: List[int]):
+        """套用增量變動（就地更新表格）"""
+        if not self.is_active:
+            self.pending_data = data
+            self.pending_results = None
+            self.is_dirty = True
+            return
+        if self.table_widget:
+            self.table_widget.apply_delta(data, changed_seq_nos)
+    
+    def set_search_provider(self, provider: Optional[Callable[[str], List[Dict]]],
+                            filter_provider: Optional[Callable[[Dict[str, str]], List[Dict]]] = None,
+                            version_provider: Optional[Callable[[], int]] = None):
+        """設定搜尋函式（例如 DatabaseManager 的搜尋索引）與取得目前資料版本的函式"""
+        self.version_provider = version_provider
+        if self.table_widget:
+            self.table_widget.set_search_provider(provider, filter_provider)
+    
+    def set_page_provider(self, provider: Optional[Callable[[str, int], List[Dict]]], page_size: int = 0):
+        """設定伺服器端分頁查詢（None 表示使用本地資料）"""
+        if self.table_widget:
+            self.table_widget.set_page_provider(provider, page_size)
+    
+    def is_server_side(self) -> bool:
+        """是否為伺服器端查詢模式"""
+        return bool(self.table_widget and self.table_widget.is_server_side())
+    
     def apply_global_filter(self, keyword: str):
         """套用全域搜尋"""
+        if not self.is_active:
+            self.pending_keyword = keyword
+            self.pending_results = None
+            self.is_dirty = True
+            return
         if self.table_widget:
             self.table_widget.apply_global_filter(keyword)
     
+    def apply_search_results(self, keyword: str, records: List[Dict], data_version: Optional[int] = None):
+        """
+        套用背景全域搜尋的結果（分頁隱藏時保留結果，顯示時若資料版本未變動直接使用，不在 GUI 執行緒重新搜尋）
+        
+        Args:
+            keyword: 搜尋關鍵字
+            records: 符合的記錄
+            data_version: 搜尋時的資料版本
+        """
+        if not self.is_active:
+            self.apply_global_filter(keyword)
+            self.pending_results = list(records)
+            self.pending_results_version = data_version
+        elif self.table_widget:
+            self.table_widget.apply_search_results(keyword, records)
+    
     def clear_all_filters(self):
         """清除所有篩選（重置為初始狀態）"""
         if self.filter_widget:
             self.filter_widget.set_search_text("")
-        if self.table_widget:
+        if not self.is_active:
+            self.apply_global_filter("")
+        elif self.table_widget:
             # 清除搜尋時顯示所有資料
             self.table_widget.apply_global_filter("")
             self.table_widget.update_table()
@@ -793,11 +1011,26 @@ class TableTabWidget(QWidget):
             return self.table_widget.get_selected_seq_no()
         return 0
     
+    def get_selected_records(self) -> List[Dict]:
+        """取得所有選中的記錄"""
+        if self.table_widget:
+            return self.table_widget.get_selected_records()
+        return []
+    
     def get_record_count_info(self) -> Dict[str, int]:
-        """取得記錄數量資訊"""
+        """取得記錄數量資訊（more 表示伺服器端還有尚未讀取的符合記錄）"""
         if self.table_widget:
+            pending_results = self.get_pending_results()
+            if pending_results is not None:
+                return {
+                    'current': len(pending_results),
+                    'total': self.table_widget.get_total_count(),
+                    'more': (self.table_widget.page_size > 0
+                             and len(pending_results) >= self.table_widget.page_size)
+                }
             return {
                 'current': self.table_widget.get_record_count(),
-                'total': self.table_widget.get_total_count()
+                'total': self.table_widget.get_total_count(),
+                'more': self.table_widget.has_more_records()
             }
-        return {'current': 0, 'total': 0}
\ No newline at end of file
+        return {'current': 0, 'total': 0, 'more': False}
\ No newline at end of file
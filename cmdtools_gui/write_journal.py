@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+離線寫入日誌模組
+資料庫無法連線時，新增、更新、刪除先套用到本地快取並依序寫入 config.json 旁的日誌檔
+（每行一筆 JSON，寫入後立即 fsync），恢復連線後再分批重送到資料庫；
+日誌含尚未同步的欄位值（包括網站密碼），檔案只允許目前使用者讀寫
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 預設日誌檔名（與 config.json 位於同一目錄）
+DEFAULT_JOURNAL_FILE = 'cmdtools_journal.jsonl'
+
+
+def _dumps(entry: Dict) -> str:
+    """序列化單筆日誌"""
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+def _open_private(file_path: str, flags: int):
+    """以只有目前使用者可讀寫的權限（0600）開啟日誌檔供寫入"""
+    return os.fdopen(os.open(file_path, flags | os.O_WRONLY | os.O_CREAT, 0o600), 'w', encoding='utf-8')
+
+
+class WriteJournal:
+    """
+    待同步寫入的持久化日誌
+
+    每筆日誌為 {'id', 'op', 'table', 'seq_no', 'values', 'base'}：
+    - op: 'insert'、'update' 或 'delete'
+    - seq_no: 記錄序號；離線新增的記錄使用負數暫時序號，重送後對應到資料庫產生的序號
+    - base: 更新與刪除前本地快取的欄位值，重送時與資料庫目前的內容比對以偵測衝突
+
+    日誌只在尾端附加；重送完成的日誌以重寫暫存檔後取代的方式移除，
+    寫入中斷時舊日誌仍完整。可在 GUI 執行緒附加、同時在背景執行緒重送。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        初始化日誌並讀取尚未重送的項目
+
+        Args:
+            file_path: 日誌檔路徑
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._entries, complete = self._read()
+        if not complete:
+            # 上次寫入中斷：移除不完整的最後一行，之後附加的日誌才能正確解析
+            self._rewrite(self._entries)
+        elif self._entries:
+            os.chmod(self.file_path, 0o600)  # 舊版以預設權限建立的日誌檔
+        self._next_id = max((entry['id'] for entry in self._entries), default=0) + 1
+
+    def _read(self) -> Tuple[List[Dict], bool]:
+        """讀取日誌檔，回傳 (日誌, 是否完整)；最後一行寫入不完整時略過"""
+        if not os.path.exists(self.file_path):
+            return [], True
+        entries = []
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    return entries, False
+        return entries, True
+
+    def _rewrite(self, entries: List[Dict]):
+        """以暫存檔重寫整個日誌後取代原檔"""
+        temp_path = self.file_path + '.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)  # 既有的暫存檔可能是其他權限建立的
+        with _open_private(temp_path, os.O_TRUNC) as f:
+            for entry in entries:
+                f.write(_dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.file_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def entries(self) -> List[Dict]:
+        """取得目前所有待重送的日誌（複本）"""
+        with self._lock:
+            return [dict(entry) for entry in self._entries]
+
+    def next_temp_seq_no(self) -> int:
+        """取得離線新增記錄的暫時序號（負數，不與日誌中既有的暫時序號重複）"""
+        with self._lock:
+            used = [entry['seq_no'] for entry in self._entries if entry['seq_no'] < 0]
+            return min(used, default=0) - 1
+
+    def append(self, op: str, table_name: str, seq_no: int, values: Optional[Dict] = None,
+               base: Optional[Dict] = None) -> Dict:
+        """
+        附加一筆日誌並寫入磁碟（fsync 後才回傳）
+
+        Returns:
+            寫入的日誌
+        """
+        with self._lock:
+            entry = {'id': self._next_id, 'op': op, 'table': table_name, 'seq_no': seq_no,
+                     'values': values, 'base': base}
+            with _open_private(self.file_path, os.O_APPEND) as f:
+                f.write(_dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._next_id += 1
+            self._entries.append(entry)
+            return dict(entry)
+
+    def discard_through(self, last_id: int, seq_map: Optional[Dict[int, int]] = None):
+        """
+        移除 id 不大於 last_id 的日誌（已重送），並將其餘日誌的暫時序號換成資料庫序號
+
+        Args:
+            last_id: 最後一筆已重送的日誌 id
+            seq_map: 暫時序號 -> 資料庫序號
+        """
+        seq_map = seq_map or {}
+        with self._lock:
+            remaining = []
+            for entry in self._entries:
+                if entry['id'] <= last_id:
+                    continue
+                if entry['seq_no'] in seq_map:
+                    entry = dict(entry, seq_no=seq_map[entry['seq_no']])
+                remaining.append(entry)
+
+            self._rewrite(remaining)
+            self._entries = remaining
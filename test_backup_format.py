@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試備份檔格式（compact JSON / NDJSON / gzip）的讀寫、校驗與舊版備份匯入
+不需連線資料庫，可直接執行或以 pytest 執行
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from cmdtools_gui.backup_io import (BackupFormatError, BackupWriter, compression_for_path,
+                                    framing_for_path, iter_backup_rows, open_backup_for_write)
+
+TABLES = {
+    'CmdTools': [{'iSeqNo': i, 'cmd': f'echo "第 {i} 筆"', 'example': 'a\\b\n', 'REMARK1': '',
+                  'Classification': '測試'} for i in range(1, 201)],
+    'WinProgram': [{'iSeqNo': i, 'remark1': '程式', 'ProgramPathAndName': f'C:\\app{i}.exe',
+                    'ClickEndRun': i % 2} for i in range(1, 51)],
+    'WebSite': [],
+}
+
+
+def write_backup(file_path):
+    """以 BackupWriter 寫入測試資料（依副檔名決定格式與壓縮方式）"""
+    with open_backup_for_write(file_path, compression_for_path(file_path)) as f:
+        writer = BackupWriter(f, framing_for_path(file_path))
+        writer.begin('2026-01-01T00:00:00')
+        for table_name, rows in TABLES.items():
+            writer.begin_table(table_name)
+            for start in range(0, len(rows), 64):
+                writer.write_rows(rows[start:start + 64])
+            writer.end_table()
+        writer.finish()
+
+
+def read_backup(file_path):
+    """讀取備份檔，回傳 {資料表名稱: [記錄...]}"""
+    tables = {}
+    for table_name, row in iter_backup_rows(file_path):
+        tables.setdefault(table_name, []).append(row)
+    return tables
+
+
+def expect_rejected(file_path, description):
+    """確認備份檔被拒絕（拋出 BackupFormatError）"""
+    try:
+        read_backup(file_path)
+    except BackupFormatError as e:
+        print(f"[OK] {description}被拒絕: {e}")
+        return
+    raise AssertionError(f"{description}未被拒絕")
+
+
+def test_round_trip():
+    """測試各格式寫入後讀回的記錄與原始資料相同"""
+    print("正在測試備份檔讀寫...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in ('backup.json', 'backup.ndjson', 'backup.ndjson.gz', 'backup.json.gz'):
+            file_path = os.path.join(temp_dir, name)
+            write_backup(file_path)
+            tables = read_backup(file_path)
+            expected = {table_name: rows for table_name, rows in TABLES.items() if rows}
+            assert tables == expected, f"{name} 讀回的記錄與原始資料不同"
+            print(f"[OK] {name} 讀回 {sum(len(rows) for rows in tables.values())} 筆記錄")
+
+
+def test_tamper_and_truncation():
+    """測試修改內容或截斷的 NDJSON 備份會被拒絕"""
+    print("\n正在測試備份檔校驗...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'backup.ndjson')
+        write_backup(file_path)
+        with open(file_path, 'rb') as f:
+            content = f.read()
+
+        tampered = os.path.join(temp_dir, 'tampered.ndjson')
+        with open(tampered, 'wb') as f:
+            f.write(content.replace('第 100 筆'.encode('utf-8'), '第 999 筆'.encode('utf-8'), 1))
+        expect_rejected(tampered, "修改過記錄的備份")
+
+        lines = content.splitlines(keepends=True)
+        removed = os.path.join(temp_dir, 'removed.ndjson')
+        with open(removed, 'wb') as f:
+            f.writelines(lines[:10] + lines[11:])
+        expect_rejected(removed, "少了一筆記錄的備份")
+
+        truncated = os.path.join(temp_dir, 'truncated.ndjson')
+        with open(truncated, 'wb') as f:
+            f.write(content[:len(content) // 2])
+        expect_rejected(truncated, "截斷的備份")
+
+        no_manifest = os.path.join(temp_dir, 'no_manifest.ndjson')
+        with open(no_manifest, 'wb') as f:
+            f.writelines(lines[:-1])
+        expect_rejected(no_manifest, "缺少 manifest 的備份")
+
+        compressed = os.path.join(temp_dir, 'truncated.ndjson.gz')
+        with open(compressed, 'wb') as f:
+            f.write(gzip.compress(content)[:-64])
+        expect_rejected(compressed, "截斷的壓縮備份")
+
+        json_path = os.path.join(temp_dir, 'truncated.json')
+        write_backup(json_path)
+        with open(json_path, 'rb') as f:
+            json_content = f.read()
+        with open(json_path, 'wb') as f:
+            f.write(json_content[:len(json_content) // 2])
+        expect_rejected(json_path, "截斷的 JSON 備份")
+
+
+def test_legacy_import():
+    """測試舊版以 json.dump(indent=2) 匯出的備份仍可匯入"""
+    print("\n正在測試舊版備份匯入...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'legacy.json')
+        legacy = {'export_time': '2024-01-01T00:00:00', 'tables': TABLES}
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f, ensure_ascii=False, indent=2)
+        tables = read_backup(file_path)
+        assert tables == {table_name: rows for table_name, rows in TABLES.items() if rows}, \
+            "舊版備份讀回的記錄與原始資料不同"
+        print(f"[OK] 舊版備份讀回 {sum(len(rows) for rows in tables.values())} 筆記錄")
+
+        with open(file_path, 'w', encoding='utf-8-sig') as f:
+            json.dump(legacy, f, ensure_ascii=False, indent=2)
+        assert read_backup(file_path) == tables, "含 BOM 的舊版備份讀回的記錄不同"
+        print("[OK] 含 BOM 的舊版備份可匯入")
+
+
+def main():
+    """主測試函數"""
+    print("=" * 60)
+    print("備份檔格式測試")
+    print("=" * 60)
+
+    passed = True
+    for test in (test_round_trip, test_tamper_and_truncation, test_legacy_import):
+        try:
+            test()
+        except AssertionError as e:
+            print(f"[FAIL] {e}")
+            passed = False
+
+    print("\n" + "=" * 60)
+    print("[SUCCESS] 所有測試通過！" if passed else "[FAIL] 部分測試失敗，請檢查代碼實現")
+    return passed
+
+
+if __name__ == "__main__":
+    main()
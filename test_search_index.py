@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 SearchIndex 的搜尋與篩選結果與逐筆 str().lower() 掃描一致
+（含新增、刪除、更新記錄後，以及倒排索引停用時）
+不需連線資料庫，可直接執行或以 pytest 執行
+"""
+
+import random
+
+from cmdtools_gui.record_store import RecordStore, make_record_class
+from cmdtools_gui.search_index import SearchIndex
+
+FIELDS = ["cmd", "example", "REMARK1", "Classification"]
+WORDS = ["Docker", "docker-compose", "git", "GitHub", "kubectl", "ls", "ps", "SELECT", "mysql",
+         "資料庫", "備份", "資料表", "網站", "登入", "測試", "命令", "提示", "工具", "a", "B", "x1", "42",
+         "--force", "C:\\Program Files", "https://example.com/?q=1&a=2", "v1.2.3", "ÄÖÜ", "ǅ", "İ"]
+KEYWORDS = ["d", "do", "doc", "dock", "docker", "docker-", "compose", "git", "hub", "GITHUB", "l", "ls",
+            "資", "資料", "資料庫", "料表", "備份工具", "網站登入", "具", "測", "1", "42", "x1", "-", "--f",
+            "\\", "program files", "?q=", "v1.", ".2", "äö", "ǆ", "i̇", "i", " ", "s d", "zzz", "不存在", "\x1f",
+            "docker git", "sql資料"]
+
+
+def random_text(rng):
+    """產生由詞彙、空白與標點組成的欄位內容"""
+    return rng.choice([" ", "", "-", "/"]).join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+
+
+def random_record(rng, seq_no):
+    """產生一筆隨機記錄（偶爾包含非字串欄位值）"""
+    record = {'iSeqNo': seq_no}
+    for field in FIELDS:
+        record[field] = random_text(rng)
+    if rng.random() < 0.1:
+        record['REMARK1'] = rng.randint(0, 100)
+    return record
+
+
+def linear_search(store, keyword):
+    """與原本的全域搜尋相同：任一欄位 str(value).lower() 包含關鍵字"""
+    keyword_lower = keyword.lower()
+    return [record['iSeqNo'] for record in store
+            if any(keyword_lower in str(record.get(field, "")).lower() for field in FIELDS)]
+
+
+def linear_filter(store, filters):
+    """與原本的單一欄位篩選相同：所有非空條件都須包含對應關鍵字"""
+    return [record['iSeqNo'] for record in store
+            if all(keyword.lower() in str(record.get(field, "")).lower()
+                   for field, keyword in filters.items() if keyword.strip())]
+
+
+def check_index(index, store, rng, step):
+    """比對所有關鍵字（隨機順序，會用到先前的搜尋快取）與隨機篩選條件的結果"""
+    for keyword in rng.sample(KEYWORDS, len(KEYWORDS)):
+        results = [record['iSeqNo'] for record in index.search(keyword, store)]
+        assert len(results) == len(set(results)), f"{step}: '{keyword}' 的結果有重複記錄"
+        assert sorted(results) == sorted(linear_search(store, keyword)), \
+            f"{step}: '{keyword}' 的搜尋結果與逐筆掃描不同"
+
+    for _ in range(10):
+        filters = {field: rng.choice(KEYWORDS) if rng.random() < 0.5 else "" for field in FIELDS}
+        results = [record['iSeqNo'] for record in index.filter(filters, store)]
+        assert results == linear_filter(store, filters), f"{step}: 篩選 {filters} 的結果與逐筆掃描不同"
+
+
+def run_mutations(inverted, compact, seed=20240601):
+    """建立索引後反覆新增、刪除、更新記錄，每一步都與逐筆掃描比對"""
+    rng = random.Random(seed)
+    record_class = make_record_class('CmdTools', ['iSeqNo'] + FIELDS) if compact else None
+    store = RecordStore([random_record(rng, seq_no) for seq_no in range(1, 301)], record_class=record_class)
+    index = SearchIndex(FIELDS, inverted=inverted)
+    index.build(store)
+    check_index(index, store, rng, "建立索引後")
+
+    next_seq_no = 301
+    for step in range(60):
+        action = rng.choice(['add', 'remove', 'update'])
+        if action == 'add' or len(store) == 0:
+            store.add(random_record(rng, next_seq_no))
+            index.add(store.get(next_seq_no))
+            next_seq_no += 1
+        elif action == 'remove':
+            seq_no = rng.choice(store.seq_nos())
+            store.remove(seq_no)
+            index.remove(seq_no)
+        else:
+            seq_no = rng.choice(store.seq_nos())
+            values = {field: value for field, value in random_record(rng, seq_no).items()
+                      if field != 'iSeqNo' and rng.random() < 0.6}
+            store.update(seq_no, values)
+            index.add(store.get(seq_no))
+        check_index(index, store, rng, f"第 {step + 1} 次變動（{action}）後")
+
+
+def test_inverted_index():
+    """測試倒排索引的搜尋結果與逐筆掃描一致"""
+    print("正在測試倒排索引...")
+    run_mutations(inverted=True, compact=False)
+    print("[OK] 倒排索引在新增、刪除、更新後的結果與逐筆掃描一致")
+
+
+def test_compact_records():
+    """測試精簡記錄（CompactCache）搭配倒排索引的結果與逐筆掃描一致"""
+    print("\n正在測試精簡記錄...")
+    run_mutations(inverted=True, compact=True, seed=7)
+    print("[OK] 精簡記錄的搜尋與篩選結果與逐筆掃描一致")
+
+
+def test_without_inverted_index():
+    """測試停用倒排索引（SearchIndex 設為 false）時的結果與逐筆掃描一致"""
+    print("\n正在測試停用倒排索引...")
+    run_mutations(inverted=False, compact=False, seed=99)
+    print("[OK] 停用倒排索引時的結果與逐筆掃描一致")
+
+
+def main():
+    """主測試函數"""
+    print("=" * 60)
+    print("SearchIndex 搜尋結果一致性測試")
+    print("=" * 60)
+
+    passed = True
+    for test in (test_inverted_index, test_compact_records, test_without_inverted_index):
+        try:
+            test()
+        except AssertionError as e:
+            print(f"[FAIL] {e}")
+            passed = False
+
+    print("\n" + "=" * 60)
+    print("[SUCCESS] 所有測試通過！" if passed else "[FAIL] 部分測試失敗，請檢查代碼實現")
+    return passed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試離線寫入日誌：日誌附加與重新開啟、離線編輯後重送，以及 SELECT ... FOR UPDATE 偵測衝突
+以記憶體中的假資料庫連線取代 MySQL，不需連線資料庫，可直接執行或以 pytest 執行
+"""
+
+import copy
+import json
+import os
+import re
+import stat
+import tempfile
+from contextlib import contextmanager
+
+from mysql.connector.errors import OperationalError
+
+from cmdtools_gui.connection_pool import ConnectionUnavailable
+from cmdtools_gui.database import TABLE_DEFINITIONS, DatabaseManager
+from cmdtools_gui.write_journal import WriteJournal
+
+
+class FakeDatabase:
+    """記憶體中的資料庫：{資料表名稱: {iSeqNo: 記錄}}，並記錄執行過的 SQL"""
+
+    def __init__(self, tables):
+        self.tables = copy.deepcopy(tables)
+        self.statements = []
+        self.lose_commit_ack = False  # 為 True 時 COMMIT 已生效，但連線在回應前中斷
+
+
+class FakeCursor:
+    """只支援寫入與重送日誌會用到的 INSERT、UPDATE、DELETE 與以 iSeqNo 查詢的 SELECT"""
+
+    def __init__(self, database, dictionary=False):
+        self.database = database
+        self.dictionary = dictionary
+        self.lastrowid = None
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        self.database.statements.append(sql)
+        tables = self.database.tables
+        match = re.match(r"INSERT INTO (\w+) \((.*?)\) VALUES", sql)
+        if match:
+            rows = tables[match.group(1)]
+            self.lastrowid = max(rows, default=0) + 1
+            rows[self.lastrowid] = dict(zip(match.group(2).split(', '), params), iSeqNo=self.lastrowid)
+            return
+        match = re.match(r"UPDATE (\w+) SET (.*?) WHERE iSeqNo=%s", sql)
+        if match:
+            fields = [assignment.split('=')[0] for assignment in match.group(2).split(', ')]
+            row = tables[match.group(1)].get(params[-1])
+            if row is not None:
+                row.update(zip(fields, params[:-1]))
+            return
+        match = re.match(r"DELETE FROM (\w+) WHERE iSeqNo IN", sql)
+        if match:
+            for seq_no in params:
+                tables[match.group(1)].pop(seq_no, None)
+            return
+        if sql == "SELECT @@auto_increment_increment":
+            self.rows = [(1,)]
+            return
+        match = re.match(r"SELECT (.*?) FROM (\w+) WHERE iSeqNo IN \(.*\)", sql)
+        if match:
+            rows = tables[match.group(2)]
+            self.rows = [dict(rows[seq_no]) for seq_no in params if seq_no in rows]
+            if not self.dictionary:
+                columns = match.group(1).split(', ')
+                self.rows = [tuple(row[column] for column in columns) for row in self.rows]
+            return
+        raise AssertionError(f"假資料庫不支援的 SQL: {sql}")
+
+    def executemany(self, sql, seq_params):
+        # 與 mysql.connector 相同：多列 INSERT 的 lastrowid 為第一筆的序號
+        first_id = None
+        for params in seq_params:
+            self.execute(sql, params)
+            first_id = first_id or self.lastrowid
+        self.lastrowid = first_id
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """交易開始時保存資料庫內容，rollback 時還原"""
+
+    def __init__(self, database):
+        self.database = database
+        self._saved = None
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.database, dictionary)
+
+    def start_transaction(self):
+        self._saved = copy.deepcopy(self.database.tables)
+
+    def commit(self):
+        self._saved = None
+        if self.database.lose_commit_ack:
+            raise OperationalError("Lost connection to MySQL server during query")
+
+    def rollback(self):
+        if self._saved is not None:
+            self.database.tables = self._saved
+            self._saved = None
+
+
+class FakePool:
+    """取代 ConnectionPool；online 為 False 時與資料庫無法連線相同"""
+
+    def __init__(self, database):
+        self.database = database
+        self.online = True
+
+    @contextmanager
+    def connection(self, timeout=None, fail_fast=False):
+        if not self.online:
+            raise ConnectionUnavailable("無法連線到資料庫")
+        yield FakeConnection(self.database)
+
+    def close(self):
+        pass
+
+
+def cmd_record(seq_no, cmd):
+    """產生一筆命令工具記錄"""
+    return {'iSeqNo': seq_no, 'cmd': cmd, 'example': f'{cmd} --help', 'remark1': '', 'Classification': '測試'}
+
+
+def make_manager(temp_dir, records):
+    """建立使用假資料庫的 DatabaseManager（本地快取與資料庫內容相同）"""
+    config_file = os.path.join(temp_dir, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({'DataBase': 'test', 'LocalSnapshot': False, 'ReplayBatchSize': 3}, f)
+    manager = DatabaseManager(config_file)
+    database = FakeDatabase({table_name: {} for table_name in TABLE_DEFINITIONS})
+    database.tables['CmdTools'] = {record['iSeqNo']: dict(record) for record in records}
+    manager.pool = FakePool(database)
+    manager.apply_loaded_data({'CmdTools': [dict(record) for record in records]})
+    return manager, database
+
+
+def test_journal_append_and_reopen():
+    """測試日誌附加後重新開啟仍完整，且不完整的最後一行會被略過"""
+    print("正在測試日誌附加與重新開啟...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'journal.jsonl')
+        journal = WriteJournal(file_path)
+        journal.append('insert', 'CmdTools', journal.next_temp_seq_no(), {'cmd': 'a'})
+        journal.append('insert', 'CmdTools', journal.next_temp_seq_no(), {'cmd': 'b'})
+        journal.append('update', 'CmdTools', -1, {'cmd': 'a2'}, None)
+        assert [entry['seq_no'] for entry in journal.entries()] == [-1, -2, -1], "暫時序號配置不正確"
+        if os.name == 'posix':
+            assert stat.S_IMODE(os.stat(file_path).st_mode) == 0o600, "日誌檔應只允許目前使用者讀寫"
+
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write('{"id": 4, "op": "upd')  # 模擬寫入到一半中斷
+        reopened = WriteJournal(file_path)
+        assert reopened.entries() == journal.entries(), "重新開啟後的日誌內容不同"
+        entry = reopened.append('delete', 'CmdTools', 7, None, {'cmd': 'x'})
+        assert entry['id'] == 4, "重新開啟後的日誌 id 不連續"
+        assert len(WriteJournal(file_path)) == 4, "截斷後附加的日誌無法讀取"
+        print("[OK] 日誌重新開啟後完整，不完整的最後一行已略過")
+
+        reopened.discard_through(2, {-1: 101})
+        assert [(entry['id'], entry['seq_no']) for entry in WriteJournal(file_path).entries()] == \
+            [(3, 101), (4, 7)], "移除已重送的日誌或換成資料庫序號不正確"
+        print("[OK] 已重送的日誌已移除，其餘日誌的暫時序號已換成資料庫序號")
+
+
+def test_offline_writes_and_replay():
+    """測試離線時的新增、更新、刪除先套用到快取，恢復連線後重送到資料庫"""
+    print("\n正在測試離線寫入與重送...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, database = make_manager(temp_dir, [cmd_record(seq_no, f'cmd{seq_no}') for seq_no in (1, 2, 3)])
+        manager.pool.online = False
+
+        assert manager.add_cmd_tool(cmd_record(None, 'new'))[0], "離線新增失敗"
+        temp_seq_no = min(manager.cmd_tools_data.seq_nos())
+        assert temp_seq_no < 0, "離線新增的記錄應使用負數暫時序號"
+        assert manager.update_cmd_tool(temp_seq_no, cmd_record(temp_seq_no, 'new2'))[0], "離線更新新記錄失敗"
+        assert manager.update_cmd_tool(1, cmd_record(1, 'changed'))[0], "離線更新失敗"
+        assert manager.delete_cmd_tool(2)[0], "離線刪除失敗"
+        assert manager.offline and manager.pending_write_count() == 4, "離線變更應寫入日誌"
+        assert manager.search_records('CmdTools', 'new2') and not manager.cmd_tools_data.get(2), \
+            "離線變更應立即反映在快取"
+        assert database.tables['CmdTools'][1]['cmd'] == 'cmd1', "離線時不應寫入資料庫"
+        print("[OK] 離線變更已寫入日誌並套用到快取")
+
+        success, message = manager.replay_journal()
+        assert not success and manager.pending_write_count() == 4, "無法連線時應保留日誌"
+
+        manager.pool.online = True
+        success, message = manager.replay_journal()
+        assert success and not manager.last_replay_issues, f"重送失敗: {message}"
+        rows = database.tables['CmdTools']
+        assert rows[1]['cmd'] == 'changed' and 2 not in rows, "更新或刪除未重送到資料庫"
+        new_seq_no = manager.seq_aliases[temp_seq_no]
+        assert rows[new_seq_no]['cmd'] == 'new2', "離線新增與更新未重送到資料庫"
+        assert manager.cmd_tools_data.get(new_seq_no)['cmd'] == 'new2', "快取中的暫時序號未換成資料庫序號"
+        assert manager.pending_write_count() == 0 and not manager.offline, "重送後應清空日誌並恢復連線狀態"
+        print(f"[OK] {message}，暫時序號 {temp_seq_no} -> {new_seq_no}")
+
+
+def test_replay_conflicts():
+    """測試重送時以 SELECT ... FOR UPDATE 比對，他人已修改或刪除的記錄以資料庫內容為準"""
+    print("\n正在測試重送衝突...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, database = make_manager(temp_dir, [cmd_record(seq_no, f'cmd{seq_no}') for seq_no in range(1, 6)])
+        manager.pool.online = False
+        manager.update_cmd_tool(1, cmd_record(1, 'mine'))
+        manager.update_cmd_tool(2, cmd_record(2, 'mine'))
+        manager.delete_cmd_tool(3)
+        manager.update_cmd_tool(4, cmd_record(4, 'mine'))
+        manager.delete_cmd_tool(5)
+
+        # 離線期間其他人修改了 2 與 3、刪除了 4 與 5
+        rows = database.tables['CmdTools']
+        rows[2]['cmd'] = 'theirs'
+        rows[3]['remark1'] = 'theirs'
+        del rows[4], rows[5]
+
+        manager.pool.online = True
+        success, message = manager.replay_journal()
+        assert success, f"重送失敗: {message}"
+        assert any('FOR UPDATE' in sql for sql in database.statements), "重送前應以 SELECT ... FOR UPDATE 鎖定記錄"
+        assert rows[1]['cmd'] == 'mine', "沒有衝突的更新應重送"
+        assert rows[2]['cmd'] == 'theirs', "他人已修改的記錄不應被覆寫"
+        assert rows[3]['remark1'] == 'theirs', "他人已修改的記錄不應被刪除"
+        assert 4 not in rows and 5 not in rows, "已刪除的記錄不應被重新建立"
+        issues = manager.last_replay_issues
+        assert len(issues) == 3, f"應略過 3 筆衝突的變更: {issues}"
+        assert manager.pending_write_count() == 0, "衝突的變更也應移出日誌"
+        for issue in issues:
+            print(f"[OK] 略過：{issue}")
+
+
+def test_replay_failed_insert():
+    """測試離線新增無法寫入時，後續對同一筆暫時序號的更新會列為略過，而不是被無聲捨棄"""
+    print("\n正在測試離線新增寫入失敗...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, database = make_manager(temp_dir, [cmd_record(1, 'cmd1')])
+        manager.pool.online = False
+        manager.add_cmd_tool(cmd_record(None, 'new'))
+        temp_seq_no = min(manager.cmd_tools_data.seq_nos())
+        manager.update_cmd_tool(temp_seq_no, cmd_record(temp_seq_no, 'new2'))
+        manager.update_cmd_tool(1, cmd_record(1, 'changed'))
+
+        execute = FakeCursor.execute
+
+        def reject_insert(cursor, sql, params=()):
+            if sql.startswith('INSERT'):
+                raise ValueError("Data too long for column 'cmd'")
+            return execute(cursor, sql, params)
+
+        manager.pool.online = True
+        FakeCursor.execute = reject_insert
+        try:
+            success, message = manager.replay_journal()
+        finally:
+            FakeCursor.execute = execute
+        assert success, f"重送失敗: {message}"
+        assert database.tables['CmdTools'][1]['cmd'] == 'changed', "其他變更應照常重送"
+        issues = manager.last_replay_issues
+        assert len(issues) == 2 and f"序號 {temp_seq_no}" in issues[1], f"新增失敗後的更新應列為略過: {issues}"
+        for issue in issues:
+            print(f"[OK] 略過：{issue}")
+
+
+def test_insert_commit_ack_lost():
+    """測試新增的 COMMIT 已生效但連線中斷時不寫入日誌（避免重送時重複新增）"""
+    print("\n正在測試新增時 COMMIT 回應遺失...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, database = make_manager(temp_dir, [cmd_record(1, 'cmd1')])
+        database.lose_commit_ack = True
+        success, message = manager.add_cmd_tool(cmd_record(None, 'new'))
+        assert not success and manager.pending_write_count() == 0, "無法確認是否已新增時不應寫入日誌"
+        success, _ = manager.add_many('CmdTools', [cmd_record(None, 'a'), cmd_record(None, 'b')])
+        assert not success and manager.pending_write_count() == 0, "無法確認是否已批次新增時不應寫入日誌"
+        assert len(database.tables['CmdTools']) == 4, "資料庫中的記錄應只新增一次"
+        print(f"[OK] {message}")
+
+
+def main():
+    """主測試函數"""
+    print("=" * 60)
+    print("離線寫入日誌測試")
+    print("=" * 60)
+
+    passed = True
+    for test in (test_journal_append_and_reopen, test_offline_writes_and_replay, test_replay_conflicts,
+                 test_replay_failed_insert, test_insert_commit_ack_lost):
+        try:
+            test()
+        except AssertionError as e:
+            print(f"[FAIL] {e}")
+            passed = False
+
+    print("\n" + "=" * 60)
+    print("[SUCCESS] 所有測試通過！" if passed else "[FAIL] 部分測試失敗，請檢查代碼實現")
+    return passed
+
+
+if __name__ == "__main__":
+    main()